@@ -0,0 +1,39 @@
+"""incremental_evaluation_watermarks
+
+Revision ID: 5d2c9e4a7b10
+Revises: 36bb81630e7b
+Create Date: 2026-10-18 10:12:04.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2c9e4a7b10'
+down_revision: Union[str, None] = '36bb81630e7b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('evaluation_state',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('weather_watermark', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('alert_watermark', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_full_run_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.add_column('alerts', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.create_index('ix_alert_updated_at', 'alerts', ['updated_at'], unique=False)
+    op.create_index('ix_weather_created_at', 'weather_data', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_weather_created_at', table_name='weather_data')
+    op.drop_index('ix_alert_updated_at', table_name='alerts')
+    op.drop_column('alerts', 'updated_at')
+    op.drop_table('evaluation_state')
@@ -0,0 +1,36 @@
+"""alert_trigger_ledger
+
+Revision ID: 8a41f3c2d9e7
+Revises: 5d2c9e4a7b10
+Create Date: 2026-10-18 11:03:27.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a41f3c2d9e7'
+down_revision: Union[str, None] = '5d2c9e4a7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('alert_triggers',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('alert_id', sa.UUID(), nullable=False),
+    sa.Column('target_date', sa.Date(), nullable=False),
+    sa.Column('band', sa.Integer(), nullable=False),
+    sa.Column('probability', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['alert_id'], ['alerts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('alert_id', 'target_date', 'band', name='uq_alert_trigger_alert_date_band')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('alert_triggers')
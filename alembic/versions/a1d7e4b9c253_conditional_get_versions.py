@@ -0,0 +1,69 @@
+"""conditional_get_versions
+
+Revision ID: a1d7e4b9c253
+Revises: f6a3c9d2e471
+Create Date: 2026-10-18 21:14:52.118460
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1d7e4b9c253'
+down_revision: Union[str, None] = 'f6a3c9d2e471'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copia de app/models/notification_counter.py al momento de la migración
+VERSION_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION notification_counters_bump_version() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            PERFORM 1 FROM notification_counters
+            WHERE user_id IN (SELECT user_id FROM old_rows)
+            ORDER BY user_id FOR UPDATE;
+            UPDATE notification_counters SET version = version + 1
+            WHERE user_id IN (SELECT user_id FROM old_rows);
+        ELSE
+            INSERT INTO notification_counters (user_id, version)
+            SELECT DISTINCT user_id, 1 FROM new_rows
+            ORDER BY user_id
+            ON CONFLICT (user_id) DO UPDATE SET version = notification_counters.version + 1;
+        END IF;
+        RETURN NULL;
+    END $$
+    """,
+    """
+    CREATE OR REPLACE TRIGGER notification_versions_insert AFTER INSERT ON notifications
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_bump_version()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER notification_versions_update AFTER UPDATE ON notifications
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_bump_version()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER notification_versions_delete AFTER DELETE ON notifications
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_bump_version()
+    """,
+]
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.add_column('notification_counters', sa.Column('version', sa.BigInteger(), server_default='0', nullable=False))
+    for statement in VERSION_DDL:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION IF EXISTS notification_counters_bump_version() CASCADE")
+    op.drop_column('notification_counters', 'version')
+    op.drop_column('users', 'updated_at')
@@ -0,0 +1,40 @@
+"""notification_delivery_state
+
+Revision ID: a7d3e5c1f829
+Revises: f18c2a6b9d40
+Create Date: 2026-10-18 16:21:08.412736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e5c1f829'
+down_revision: Union[str, None] = 'f18c2a6b9d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('notifications', sa.Column('delivery_status', sa.String(length=20), server_default='pending', nullable=False))
+    op.add_column('notifications', sa.Column('delivery_attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('notifications', sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('notifications', sa.Column('delivered_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('notifications', sa.Column('provider_message_id', sa.String(length=100), nullable=True))
+    op.add_column('notifications', sa.Column('last_error', sa.String(length=500), nullable=True))
+    # Las notificaciones previas a la entrega por WhatsApp no se envían retroactivamente
+    op.execute("UPDATE notifications SET delivery_status = 'skipped'")
+    op.create_index('ix_notifications_delivery_pending', 'notifications', ['created_at'], unique=False, postgresql_where=sa.text("delivery_status = 'pending'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notifications_delivery_pending', table_name='notifications', postgresql_where=sa.text("delivery_status = 'pending'"))
+    op.drop_column('notifications', 'last_error')
+    op.drop_column('notifications', 'provider_message_id')
+    op.drop_column('notifications', 'delivered_at')
+    op.drop_column('notifications', 'next_attempt_at')
+    op.drop_column('notifications', 'delivery_attempts')
+    op.drop_column('notifications', 'delivery_status')
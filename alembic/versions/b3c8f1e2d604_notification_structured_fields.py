@@ -0,0 +1,88 @@
+"""notification_structured_fields
+
+Revision ID: b3c8f1e2d604
+Revises: a7d3e5c1f829
+Create Date: 2026-10-18 17:48:53.201947
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3c8f1e2d604'
+down_revision: Union[str, None] = 'a7d3e5c1f829'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 10000
+
+# Texto que generaba format_alert_message antes de guardar los datos estructurados
+MESSAGE_PATTERN = (
+    r'^⚠️ Alerta: (.+) detectada con ([0-9]+(?:\.[0-9]+)?)% de probabilidad '
+    r'\(umbral configurado: ([0-9]+(?:\.[0-9]+)?)%\) para el día ([0-9]{4}-[0-9]{2}-[0-9]{2})$'
+)
+
+# Backfill por lotes: cada UPDATE toca a lo sumo BATCH_SIZE filas, para no
+# generar una sola transacción gigante de WAL sobre tablas grandes
+BACKFILL_SQL = sa.text("""
+    UPDATE notifications AS n
+    SET event_type = m.parts[1],
+        actual_value = m.parts[2]::double precision,
+        threshold = m.parts[3]::double precision,
+        target_date = m.parts[4]::date,
+        message = NULL
+    FROM (
+        SELECT id, regexp_match(message, :pattern) AS parts
+        FROM notifications
+        WHERE event_type IS NULL AND message ~ :pattern
+        LIMIT :batch_size
+    ) AS m
+    WHERE n.id = m.id
+""")
+
+# Inverso: vuelve a escribir el texto (mismo formato que str(float) de Python)
+RESTORE_SQL = sa.text("""
+    UPDATE notifications AS n
+    SET message = '⚠️ Alerta: ' || n.event_type || ' detectada con '
+        || CASE WHEN n.actual_value = trunc(n.actual_value)
+                THEN trunc(n.actual_value)::bigint || '.0' ELSE n.actual_value::text END
+        || '% de probabilidad (umbral configurado: '
+        || CASE WHEN n.threshold = trunc(n.threshold)
+                THEN trunc(n.threshold)::bigint || '.0' ELSE n.threshold::text END
+        || '%) para el día ' || to_char(n.target_date, 'YYYY-MM-DD')
+    WHERE n.id IN (SELECT id FROM notifications WHERE message IS NULL LIMIT :batch_size)
+""")
+
+
+def _run_in_batches(statement, **params) -> None:
+    bind = op.get_bind()
+    while bind.execute(statement, {"batch_size": BATCH_SIZE, **params}).rowcount:
+        pass
+
+
+def upgrade() -> None:
+    op.add_column('notifications', sa.Column('event_type', sa.String(length=50), nullable=True))
+    op.add_column('notifications', sa.Column('actual_value', sa.Float(), nullable=True))
+    op.add_column('notifications', sa.Column('threshold', sa.Float(), nullable=True))
+    op.add_column('notifications', sa.Column('target_date', sa.Date(), nullable=True))
+    op.alter_column('notifications', 'message', existing_type=sa.String(length=500), nullable=True)
+
+    # Los mensajes con el formato del template pasan a columnas; el resto
+    # (textos que no salen del template) conserva el message original
+    _run_in_batches(BACKFILL_SQL, pattern=MESSAGE_PATTERN)
+    op.create_check_constraint(
+        'ck_notifications_has_content', 'notifications', 'message IS NOT NULL OR event_type IS NOT NULL',
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('ck_notifications_has_content', 'notifications', type_='check')
+    _run_in_batches(RESTORE_SQL)
+    op.alter_column('notifications', 'message', existing_type=sa.String(length=500), nullable=False)
+    op.drop_column('notifications', 'target_date')
+    op.drop_column('notifications', 'threshold')
+    op.drop_column('notifications', 'actual_value')
+    op.drop_column('notifications', 'event_type')
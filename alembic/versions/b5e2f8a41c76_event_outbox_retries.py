@@ -0,0 +1,30 @@
+"""event_outbox_retries
+
+Revision ID: b5e2f8a41c76
+Revises: a1d7e4b9c253
+Create Date: 2026-10-19 10:42:18.331205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e2f8a41c76'
+down_revision: Union[str, None] = 'a1d7e4b9c253'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('event_outbox', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('event_outbox', sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('event_outbox', sa.Column('last_error', sa.String(length=500), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('event_outbox', 'last_error')
+    op.drop_column('event_outbox', 'next_attempt_at')
+    op.drop_column('event_outbox', 'attempts')
@@ -0,0 +1,26 @@
+"""notification_created_at_clock
+
+Revision ID: c4f7a2d8e619
+Revises: b5e2f8a41c76
+Create Date: 2026-10-19 16:05:42.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f7a2d8e619'
+down_revision: Union[str, None] = 'b5e2f8a41c76'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column('notifications', 'created_at', server_default=sa.text('clock_timestamp()'))
+
+
+def downgrade() -> None:
+    op.alter_column('notifications', 'created_at', server_default=sa.text('now()'))
@@ -0,0 +1,39 @@
+"""keyset_pagination_indexes
+
+Revision ID: c91e4d7a2f35
+Revises: b3c8f1e2d604
+Create Date: 2026-10-18 18:36:12.554019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c91e4d7a2f35'
+down_revision: Union[str, None] = 'b3c8f1e2d604'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Índices de las claves de paginación (ver app/pagination.py)
+INDEXES = [
+    ('ix_notifications_user_created', 'notifications', ['user_id', 'created_at', 'id']),
+    ('ix_alert_user_created', 'alerts', ['user_id', 'created_at', 'id']),
+    ('ix_field_user_created', 'fields', ['user_id', 'created_at', 'id']),
+    ('ix_user_created', 'users', ['created_at', 'id']),
+    ('ix_weather_field_date', 'weather_data', ['field_id', 'target_date', 'id']),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY no bloquea las escrituras, pero no puede correr dentro de una transacción
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,26 @@
+"""notification_read_watermark
+
+Revision ID: d52a8e6c1b97
+Revises: c91e4d7a2f35
+Create Date: 2026-10-18 19:12:40.318842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd52a8e6c1b97'
+down_revision: Union[str, None] = 'c91e4d7a2f35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('notifications_read_until', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'notifications_read_until')
@@ -0,0 +1,26 @@
+"""job_lease_run_request
+
+Revision ID: e6f09a7d3b51
+Revises: c37e1b9f5a28
+Create Date: 2026-10-18 13:05:12.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6f09a7d3b51'
+down_revision: Union[str, None] = 'c37e1b9f5a28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('job_leases', sa.Column('run_requested_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('job_leases', 'run_requested_at')
@@ -0,0 +1,157 @@
+"""notification_unread_counters
+
+Revision ID: e84f2b7d6c13
+Revises: d52a8e6c1b97
+Create Date: 2026-10-18 19:48:05.907214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e84f2b7d6c13'
+down_revision: Union[str, None] = 'd52a8e6c1b97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copia de app/models/notification_counter.py al momento de la migración
+TRIGGER_DDL = [
+    # Inserts y deletes: triggers por sentencia con tablas de transición, un
+    # upsert por usuario aunque el lote tenga miles de filas
+    """
+    CREATE OR REPLACE FUNCTION notification_counters_on_insert() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO notification_counters (user_id, unread)
+        SELECT n.user_id, count(*)
+        FROM new_rows n JOIN users u ON u.id = n.user_id
+        WHERE NOT n.is_read
+          AND (u.notifications_read_until IS NULL OR n.created_at > u.notifications_read_until)
+        GROUP BY n.user_id
+        ORDER BY n.user_id
+        ON CONFLICT (user_id) DO UPDATE SET unread = notification_counters.unread + EXCLUDED.unread;
+        RETURN NULL;
+    END $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION notification_counters_on_delete() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE notification_counters c SET unread = c.unread - d.unread
+        FROM (
+            SELECT o.user_id, count(*) AS unread
+            FROM old_rows o JOIN users u ON u.id = o.user_id
+            WHERE NOT o.is_read
+              AND (u.notifications_read_until IS NULL OR o.created_at > u.notifications_read_until)
+            GROUP BY o.user_id
+        ) d
+        WHERE c.user_id = d.user_id;
+        RETURN NULL;
+    END $$
+    """,
+    # PATCH /notifications/{id}/read: una fila por vez
+    """
+    CREATE OR REPLACE FUNCTION notification_counters_on_read() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO notification_counters (user_id, unread)
+        SELECT NEW.user_id, CASE WHEN NEW.is_read THEN -1 ELSE 1 END
+        FROM users u
+        WHERE u.id = NEW.user_id
+          AND (u.notifications_read_until IS NULL OR NEW.created_at > u.notifications_read_until)
+        ON CONFLICT (user_id) DO UPDATE SET unread = notification_counters.unread + EXCLUDED.unread;
+        RETURN NULL;
+    END $$
+    """,
+    # Cambio de la marca de lectura: se recuentan las no leídas posteriores a
+    # la nueva marca sobre ix_notifications_unread (en "marcar todas", ninguna).
+    # El lock del contador espera a los inserts en curso del usuario, para que
+    # el recuento los vea.
+    """
+    CREATE OR REPLACE FUNCTION notification_counters_on_watermark() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO notification_counters (user_id) VALUES (NEW.id) ON CONFLICT (user_id) DO NOTHING;
+        PERFORM 1 FROM notification_counters WHERE user_id = NEW.id FOR UPDATE;
+        UPDATE notification_counters SET unread = (
+            SELECT count(*) FROM notifications n
+            WHERE n.user_id = NEW.id AND NOT n.is_read
+              AND (NEW.notifications_read_until IS NULL OR n.created_at > NEW.notifications_read_until)
+        )
+        WHERE user_id = NEW.id;
+        RETURN NULL;
+    END $$
+    """,
+    """
+    CREATE TRIGGER notification_counters_insert AFTER INSERT ON notifications
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_on_insert()
+    """,
+    """
+    CREATE TRIGGER notification_counters_delete AFTER DELETE ON notifications
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_on_delete()
+    """,
+    """
+    CREATE TRIGGER notification_counters_read AFTER UPDATE OF is_read ON notifications
+    FOR EACH ROW WHEN (OLD.is_read IS DISTINCT FROM NEW.is_read)
+    EXECUTE FUNCTION notification_counters_on_read()
+    """,
+    """
+    CREATE TRIGGER notification_counters_watermark AFTER UPDATE OF notifications_read_until ON users
+    FOR EACH ROW WHEN (OLD.notifications_read_until IS DISTINCT FROM NEW.notifications_read_until)
+    EXECUTE FUNCTION notification_counters_on_watermark()
+    """,
+]
+
+# Los triggers se borran junto con sus funciones
+DROP_DDL = [
+    "DROP FUNCTION IF EXISTS notification_counters_on_insert() CASCADE",
+    "DROP FUNCTION IF EXISTS notification_counters_on_delete() CASCADE",
+    "DROP FUNCTION IF EXISTS notification_counters_on_read() CASCADE",
+    "DROP FUNCTION IF EXISTS notification_counters_on_watermark() CASCADE",
+]
+
+BACKFILL_SQL = """
+INSERT INTO notification_counters (user_id, unread)
+SELECT n.user_id, count(*)
+FROM notifications n JOIN users u ON u.id = n.user_id
+WHERE NOT n.is_read
+  AND (u.notifications_read_until IS NULL OR n.created_at > u.notifications_read_until)
+GROUP BY n.user_id
+"""
+
+
+def upgrade() -> None:
+    op.create_table('notification_counters',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('unread', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # Triggers y backfill en la misma transacción: CREATE TRIGGER bloquea las
+    # escrituras en notifications hasta el commit, así no se pierde ninguna
+    for statement in TRIGGER_DDL:
+        op.execute(statement)
+    op.execute(BACKFILL_SQL)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_notifications_unread', 'notifications', ['user_id', 'created_at', 'id'],
+            unique=False, postgresql_where=sa.text('is_read = false'),
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_notifications_unread', table_name='notifications',
+            postgresql_concurrently=True, if_exists=True,
+        )
+    for statement in DROP_DDL:
+        op.execute(statement)
+    op.drop_table('notification_counters')
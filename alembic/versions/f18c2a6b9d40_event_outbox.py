@@ -0,0 +1,38 @@
+"""event_outbox
+
+Revision ID: f18c2a6b9d40
+Revises: e6f09a7d3b51
+Create Date: 2026-10-18 14:02:37.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f18c2a6b9d40'
+down_revision: Union[str, None] = 'e6f09a7d3b51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('event_outbox',
+    sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+    sa.Column('event_type', sa.String(length=100), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('delivered_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_event_outbox_delivered_at', 'event_outbox', ['delivered_at'], unique=False, postgresql_where=sa.text('delivered_at IS NOT NULL'))
+    op.create_index('ix_event_outbox_pending', 'event_outbox', ['id'], unique=False, postgresql_where=sa.text('delivered_at IS NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_event_outbox_pending', table_name='event_outbox', postgresql_where=sa.text('delivered_at IS NULL'))
+    op.drop_index('ix_event_outbox_delivered_at', table_name='event_outbox', postgresql_where=sa.text('delivered_at IS NOT NULL'))
+    op.drop_table('event_outbox')
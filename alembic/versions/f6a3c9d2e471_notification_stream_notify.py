@@ -0,0 +1,56 @@
+"""notification_stream_notify
+
+Revision ID: f6a3c9d2e471
+Revises: e84f2b7d6c13
+Create Date: 2026-10-18 20:31:17.402566
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a3c9d2e471'
+down_revision: Union[str, None] = 'e84f2b7d6c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copia de app/models/notification.py al momento de la migración
+NOTIFY_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION notifications_notify_created() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        payload text;
+    BEGIN
+        FOR payload IN
+            SELECT string_agg(user_id::text, ',')
+            FROM (
+                SELECT user_id, (row_number() OVER (ORDER BY user_id) - 1) / 100 AS chunk
+                FROM (SELECT DISTINCT user_id FROM new_rows) d
+            ) c
+            GROUP BY chunk
+        LOOP
+            PERFORM pg_notify('notifications_created', payload);
+        END LOOP;
+        RETURN NULL;
+    END $$
+    """,
+    """
+    CREATE OR REPLACE TRIGGER notifications_notify_created AFTER INSERT ON notifications
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notifications_notify_created()
+    """,
+]
+NOTIFY_DROP_DDL = ["DROP FUNCTION IF EXISTS notifications_notify_created() CASCADE"]
+
+
+def upgrade() -> None:
+    for statement in NOTIFY_DDL:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for statement in NOTIFY_DROP_DDL:
+        op.execute(statement)
@@ -6,6 +6,51 @@ class Settings(BaseSettings):
     TEST_DATABASE_URL: str = ""
     ALEMBIC_DATABASE_URL: str = ""
     EVALUATION_INTERVAL_SECONDS: int = 60
+    EVALUATION_JITTER_SECONDS: float = 1.0
+    EVALUATION_MAX_BACKOFF_SECONDS: int = 600
+    EVALUATION_BATCH_SIZE: int = 1000
+    EVALUATION_ENGINE: str = "python"
+    EVALUATION_PARTITIONS: int = 1
+    EVALUATION_MAX_CONCURRENCY: int = 4
+    EVALUATION_INCREMENTAL: bool = True
+    EVALUATION_RECONCILE_INTERVAL_SECONDS: int = 3600
+    NOTIFICATION_REFIRE_BAND_WIDTH: float = 0
+    NOTIFICATION_BATCH_MAX_SIZE: int = 5000
+    NOTIFICATION_BATCH_MAX_DELAY_SECONDS: float = 2.0
+    NOTIFICATION_BATCH_MAX_ATTEMPTS: int = 3
+    NOTIFICATION_BULK_COPY_THRESHOLD: int = 20
+    NOTIFICATION_DIGEST: str = "off"
+    NOTIFICATION_STREAM_LISTEN: bool = True
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    NOTIFICATION_STREAM_LOOKBACK_SECONDS: float = 5.0
+    EVENT_HANDLER_TIMEOUT_SECONDS: float = 0
+    EVENT_BUS_MODE: str = "direct"
+    EVENT_BUS_QUEUE_SIZE: int = 1000
+    EVENT_BUS_WORKERS: int = 4
+    EVENT_DELIVERY: str = "bus"
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+    OUTBOX_RETRY_BASE_SECONDS: float = 5.0
+    OUTBOX_RETRY_MAX_SECONDS: float = 600.0
+    OUTBOX_RETENTION_SECONDS: int = 3600
+    OUTBOX_PRUNE_INTERVAL_SECONDS: int = 300
+    OUTBOX_PRUNE_BATCH_SIZE: int = 10000
+    WHATSAPP_DELIVERY_ENABLED: bool = False
+    WHATSAPP_API_URL: str = ""
+    WHATSAPP_API_TOKEN: str = ""
+    WHATSAPP_TIMEOUT_SECONDS: float = 10.0
+    WHATSAPP_RATE_LIMIT_PER_SECOND: float = 20.0
+    WHATSAPP_RATE_LIMIT_BURST: int = 20
+    DELIVERY_CONCURRENCY: int = 10
+    DELIVERY_BATCH_SIZE: int = 200
+    DELIVERY_POLL_INTERVAL_SECONDS: float = 2.0
+    DELIVERY_MAX_ATTEMPTS: int = 5
+    DELIVERY_RETRY_BASE_SECONDS: float = 30.0
+    RUN_EVALUATION_JOB_IN_API: bool = True
+    WORKER_DB_POOL_SIZE: int = 5
+    WORKER_DB_MAX_OVERFLOW: int = 5
+    JOB_LEADER_ELECTION: bool = True
+    JOB_LEASE_TTL_SECONDS: int = 30
 
     model_config = {"env_file": ".env", "extra": "ignore"}
 
@@ -14,6 +14,25 @@ engine = create_async_engine(
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
+def configure_engine(pool_size: int, max_overflow: int):
+    """
+    Reemplaza el engine del proceso (por ejemplo en el worker de evaluación,
+    que dimensiona su propio pool). async_session se reconfigura en el lugar,
+    así que los módulos que ya lo importaron usan el engine nuevo.
+    """
+    global engine
+    engine = create_async_engine(
+        settings.DATABASE_URL,
+        echo=False,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=3600,
+        pool_pre_ping=True,
+    )
+    async_session.configure(bind=engine)
+    return engine
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -0,0 +1,47 @@
+import hashlib
+import json
+
+from fastapi import Request, Response
+from sqlalchemy import func
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+def version_columns(timestamp: InstrumentedAttribute) -> tuple:
+    """
+    Agregados que versionan una colección a partir de su created_at/updated_at:
+    count detecta altas y bajas, y la suma de los timestamps cambia con
+    cualquier alta, baja o modificación. A diferencia de max(), también cambia
+    cuando confirma tarde una transacción con un now() anterior al máximo.
+    """
+    return func.count(timestamp), func.sum(func.extract("epoch", timestamp))
+
+
+def compute_etag(request: Request, version: tuple) -> str:
+    """
+    ETag de una respuesta: la versión del recurso (por ejemplo version_columns
+    de la colección) más los query params, porque cada página o filtro es una
+    representación distinta.
+    """
+    payload = json.dumps(
+        [[str(v) for v in version], sorted(request.query_params.multi_items())],
+        separators=(",", ":"),
+    )
+    return f'"{hashlib.sha1(payload.encode()).hexdigest()[:20]}"'
+
+
+def not_modified(request: Request, response: Response, version: tuple) -> Response | None:
+    """
+    Devuelve un 304 si el If-None-Match del cliente coincide con la versión
+    actual; si no, agrega el ETag a la respuesta y devuelve None. Se llama
+    antes de cargar las filas: un 304 no consulta ni serializa nada más.
+    """
+    etag = compute_etag(request, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Comparación débil (RFC 9110): se ignora el prefijo W/ de los proxies
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
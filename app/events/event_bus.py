@@ -1,17 +1,226 @@
+import asyncio
+import contextvars
+import logging
+import time
 from collections import defaultdict
-from typing import Callable, Any
+from dataclasses import dataclass
+from typing import Callable, Any, Iterable
+
+from app.config import settings
+from app.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+INLINE = "inline"
+CONCURRENT = "concurrent"
+
+# Modos del bus
+DIRECT = "direct"
+QUEUE = "queue"
+
+
+def handler_mode(mode: str, timeout: float | None = None):
+    """
+    Decorador para que un handler declare cómo se despacha:
+
+        @handler_mode(CONCURRENT, timeout=5)
+        async def handle_whatsapp(event): ...
+    """
+    if mode not in (INLINE, CONCURRENT):
+        raise ValueError(f"Modo de handler inválido: {mode}")
+
+    def decorate(handler: Callable) -> Callable:
+        handler.dispatch_mode = mode
+        handler.dispatch_timeout = timeout
+        return handler
+
+    return decorate
+
+
+def batch_handler(handler: Callable) -> Callable:
+    """
+    Marca un handler como batch: recibe la lista de eventos de un
+    emit_many() en una sola llamada (y `[event]` en un emit()).
+    """
+    handler.dispatch_batch = True
+    return handler
+
+
+@dataclass
+class Subscription:
+    handler: Callable
+    mode: str
+    timeout: float | None
+    batch: bool = False
+
+    @property
+    def name(self) -> str:
+        return getattr(self.handler, "__name__", repr(self.handler))
+
+
+@dataclass
+class HandlerFailure:
+    handler: str
+    event: Any
+    error: BaseException
 
 
 class EventBus:
-    def __init__(self):
-        self._handlers: dict[type, list[Callable]] = defaultdict(list)
+    """
+    Observer asíncrono. Los handlers `inline` se ejecutan en orden de
+    suscripción; los `concurrent` corren a la par de ellos. Cada handler
+    tiene su propio timeout y sus errores quedan aislados: emit() no
+    propaga excepciones, las registra y devuelve la lista de fallas.
+
+    emit_many() entrega un lote de eventos: los handlers batch lo reciben
+    en una sola llamada y los de a un evento se llaman por cada ítem.
+
+    En modo `queue` (y una vez llamado start()), emit() solo encola y un pool
+    de workers despacha a los handlers. La cola es acotada: si se llena, el
+    productor espera (backpressure). join() espera a que se procese todo lo
+    encolado y stop() drena la cola antes de detener los workers. Cada
+    lote se despacha con el contexto (contextvars) de quien lo emitió, igual
+    que en modo directo.
+    """
+
+    def __init__(
+        self, default_timeout: float | None = None, mode: str | None = None,
+        queue_size: int | None = None, workers: int | None = None,
+    ):
+        self._handlers: dict[type, list[Subscription]] = defaultdict(list)
+        self.default_timeout = default_timeout or settings.EVENT_HANDLER_TIMEOUT_SECONDS or None
+        self.mode = mode or settings.EVENT_BUS_MODE
+        if self.mode not in (DIRECT, QUEUE):
+            raise ValueError(f"Modo de EventBus inválido: {self.mode}")
+        self.queue_size = queue_size or settings.EVENT_BUS_QUEUE_SIZE
+        self.workers = workers or settings.EVENT_BUS_WORKERS
+        self._queue: asyncio.Queue | None = None
+        self._consumers: list[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._consumers)
+
+    async def start(self) -> None:
+        if self.mode != QUEUE or self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.workers)]
+        logger.info(f"📬 EventBus en modo cola ({self.workers} workers, capacidad {self.queue_size})")
+
+    async def join(self) -> None:
+        if self.running:
+            await self._queue.join()
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        await self._queue.join()
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+        self._queue = None
+        logger.info("📭 Cola del EventBus drenada y workers detenidos")
+
+    def subscribe(
+        self, event_type: type, handler: Callable,
+        mode: str | None = None, timeout: float | None = None, batch: bool | None = None,
+    ):
+        # Lo declarado con @handler_mode vive en el __dict__ de la función
+        declared = getattr(handler, "__dict__", {})
+        mode = mode or declared.get("dispatch_mode", INLINE)
+        if mode not in (INLINE, CONCURRENT):
+            raise ValueError(f"Modo de handler inválido: {mode}")
+        timeout = timeout or declared.get("dispatch_timeout") or self.default_timeout
+        batch = batch if batch is not None else declared.get("dispatch_batch", False)
+        self._handlers[event_type].append(Subscription(handler, mode, timeout, batch))
+
+    async def emit(self, event: Any) -> list[HandlerFailure]:
+        if self.running:
+            await self._enqueue(type(event), [event])
+            return []
+        return await self._dispatch(type(event), [event])
+
+    async def emit_many(self, events: Iterable[Any], direct: bool = False) -> list[HandlerFailure]:
+        """
+        En modo cola las fallas se registran en los workers y se devuelve [].
+        Con direct=True los handlers corren en el llamador aunque el bus esté
+        en modo cola, para quien necesita saber si fallaron (el outbox).
+        """
+        by_type: dict[type, list] = defaultdict(list)
+        for event in events:
+            by_type[type(event)].append(event)
+
+        failures = []
+        for event_type, batch in by_type.items():
+            if self.running and not direct:
+                await self._enqueue(event_type, batch)
+            else:
+                failures.extend(await self._dispatch(event_type, batch))
+        return failures
+
+    async def _enqueue(self, event_type: type, events: list) -> None:
+        item = (time.perf_counter(), contextvars.copy_context(), event_type, events)
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            started = time.perf_counter()
+            await self._queue.put(item)
+            metrics.observe("event_bus_backpressure_seconds", time.perf_counter() - started)
+        metrics.set("event_bus_queue_depth", self._queue.qsize())
+
+    async def _consume(self) -> None:
+        while True:
+            enqueued_at, context, event_type, events = await self._queue.get()
+            try:
+                metrics.observe("event_bus_lag_seconds", time.perf_counter() - enqueued_at)
+                await asyncio.create_task(self._dispatch(event_type, events), context=context)
+            finally:
+                self._queue.task_done()
+                metrics.set("event_bus_queue_depth", self._queue.qsize())
+
+    async def _dispatch(self, event_type: type, events: list) -> list[HandlerFailure]:
+        subscriptions = self._handlers[event_type]
+        inline = [s for s in subscriptions if s.mode == INLINE]
+        concurrent = [s for s in subscriptions if s.mode == CONCURRENT]
+
+        async def deliver(subscription: Subscription) -> list:
+            if subscription.batch:
+                return [await self._call(subscription, events, event_type)]
+            # Adaptador por ítem para los handlers de a un evento
+            return [await self._call(subscription, event, event_type) for event in events]
+
+        async def run_inline() -> list:
+            return [result for s in inline for result in await deliver(s)]
+
+        if not concurrent:
+            results = await run_inline()
+        else:
+            inline_results, *concurrent_results = await asyncio.gather(
+                run_inline(), *(deliver(s) for s in concurrent)
+            )
+            results = inline_results + [r for group in concurrent_results for r in group]
 
-    def subscribe(self, event_type: type, handler: Callable):
-        self._handlers[event_type].append(handler)
+        return [failure for failure in results if failure is not None]
 
-    async def emit(self, event: Any):
-        for handler in self._handlers[type(event)]:
-            await handler(event)
+    async def _call(self, subscription: Subscription, payload: Any, event_type: type) -> HandlerFailure | None:
+        try:
+            if subscription.timeout:
+                await asyncio.wait_for(subscription.handler(payload), subscription.timeout)
+            else:
+                await subscription.handler(payload)
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                logger.error(
+                    f"❌ Handler {subscription.name} excedió el timeout de "
+                    f"{subscription.timeout}s para {event_type.__name__}"
+                )
+            else:
+                logger.error(f"❌ Error en handler {subscription.name} para {event_type.__name__}: {e}")
+            metrics.inc("event_handler_failures_total")
+            return HandlerFailure(handler=subscription.name, event=payload, error=e)
+        return None
 
 
-event_bus = EventBus()
\ No newline at end of file
+event_bus = EventBus()
@@ -11,4 +11,36 @@ class AlertTriggeredEvent:
     event_type: str
     threshold: float
     actual_value: float
-    target_date: date
\ No newline at end of file
+    target_date: date
+
+    def to_payload(self) -> dict:
+        """Representación JSON para el outbox."""
+        return {
+            "alert_id": str(self.alert_id),
+            "user_id": str(self.user_id),
+            "field_id": str(self.field_id),
+            "event_type": self.event_type,
+            "threshold": self.threshold,
+            "actual_value": self.actual_value,
+            "target_date": self.target_date.isoformat(),
+        }
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "AlertTriggeredEvent":
+        return cls(
+            alert_id=UUID(payload["alert_id"]),
+            user_id=UUID(payload["user_id"]),
+            field_id=UUID(payload["field_id"]),
+            event_type=payload["event_type"],
+            threshold=payload["threshold"],
+            actual_value=payload["actual_value"],
+            target_date=date.fromisoformat(payload["target_date"]),
+        )
+
+
+@dataclass
+class EvaluationSummaryEvent:
+    engine: str
+    matched: int
+    notified: int
+    by_event_type: dict[str, int]
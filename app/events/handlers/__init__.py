@@ -0,0 +1,11 @@
+from app.events.event_bus import EventBus
+from app.events.events import AlertTriggeredEvent, EvaluationSummaryEvent
+from app.events.handlers.log_handler import handle_alerts_triggered_log, handle_evaluation_summary_log
+from app.events.handlers.notification_handler import handle_alerts_triggered
+
+
+def register_handlers(bus: EventBus):
+    """Suscribe los handlers del Observer. Lo usan la API y el worker de evaluación."""
+    bus.subscribe(AlertTriggeredEvent, handle_alerts_triggered)
+    bus.subscribe(AlertTriggeredEvent, handle_alerts_triggered_log)
+    bus.subscribe(EvaluationSummaryEvent, handle_evaluation_summary_log)
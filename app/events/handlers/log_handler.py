@@ -1,16 +1,35 @@
 import logging
 
-from app.events.events import AlertTriggeredEvent
+from app.events.event_bus import batch_handler
+from app.events.events import AlertTriggeredEvent, EvaluationSummaryEvent
 
 logger = logging.getLogger(__name__)
 
 
 async def handle_alert_triggered_log(event: AlertTriggeredEvent):
+    await handle_alerts_triggered_log([event])
+
+
+@batch_handler
+async def handle_alerts_triggered_log(events: list[AlertTriggeredEvent]):
+    if not logger.isEnabledFor(logging.WARNING):
+        return
+    for event in events:
+        logger.warning(
+            f"🔔 Umbral superado | "
+            f"Evento: {event.event_type} | "
+            f"Campo: {event.field_id} | "
+            f"Usuario: {event.user_id} | "
+            f"Valor: {event.actual_value}% > Umbral: {event.threshold}% | "
+            f"Fecha: {event.target_date}"
+        )
+
+
+async def handle_evaluation_summary_log(event: EvaluationSummaryEvent):
+    detail = ", ".join(f"{name}: {count}" for name, count in sorted(event.by_event_type.items()))
     logger.warning(
-        f"🔔 Umbral superado | "
-        f"Evento: {event.event_type} | "
-        f"Campo: {event.field_id} | "
-        f"Usuario: {event.user_id} | "
-        f"Valor: {event.actual_value}% > Umbral: {event.threshold}% | "
-        f"Fecha: {event.target_date}"
-    )
\ No newline at end of file
+        f"🔔 Resumen de evaluación ({event.engine}) | "
+        f"Disparos: {event.matched} | "
+        f"Notificaciones nuevas: {event.notified}"
+        + (f" | {detail}" if detail else "")
+    )
@@ -1,39 +1,228 @@
+import asyncio
 import logging
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 
+from app.config import settings
 from app.database import async_session
+from app.events.event_bus import EventBus, batch_handler
 from app.events.events import AlertTriggeredEvent
+from app.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
-_pending_notifications: list[dict] = []
+
+@dataclass
+class BatcherStats:
+    flushes: int = 0
+    rows: int = 0
+    peak_batch_size: int = 0
+    last_flush_seconds: float = 0.0
+    total_flush_seconds: float = 0.0
+
+    @property
+    def avg_flush_seconds(self) -> float:
+        return self.total_flush_seconds / self.flushes if self.flushes else 0.0
+
+
+class NotificationBatcher:
+    """
+    Buffer de notificaciones pendientes, compartido por todas las
+    evaluaciones del proceso (job periódico, ingesta, outbox).
+
+    - flush() corre bajo un lock y toma el contenido del buffer antes del
+      primer await: lo que se agregue mientras se inserta queda para el
+      siguiente flush, sin pérdidas ni inserciones dobles.
+    - Se vacía solo al llegar a max_batch_size filas o cuando la fila más
+      vieja espera más de max_delay_seconds (0 deshabilita el flush por tiempo).
+    - Si el insert falla, el lote vuelve al buffer; una fila que ya falló
+      max_attempts veces se descarta (con log y métrica) para que no haga
+      fallar todos los flush siguientes. Una cancelación devuelve el lote
+      sin contar el intento.
+    """
+
+    def __init__(
+        self, max_batch_size: int | None = None, max_delay_seconds: float | None = None,
+        max_attempts: int | None = None,
+    ):
+        self.max_batch_size = max_batch_size or settings.NOTIFICATION_BATCH_MAX_SIZE
+        self.max_delay_seconds = (
+            settings.NOTIFICATION_BATCH_MAX_DELAY_SECONDS if max_delay_seconds is None else max_delay_seconds
+        )
+        self.max_attempts = max_attempts or settings.NOTIFICATION_BATCH_MAX_ATTEMPTS
+        self.stats = BatcherStats()
+        self._pending: list[dict] = []
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def pending(self) -> list[dict]:
+        return list(self._pending)
+
+    async def add_many(self, rows: list[dict]) -> None:
+        self._pending.extend(rows)
+        if len(self._pending) >= self.max_batch_size:
+            await self.flush()
+        elif self._pending and self.max_delay_seconds and self._timer is None:
+            self._timer = asyncio.create_task(self._flush_after_delay())
+
+    def clear(self) -> None:
+        self._cancel_timer()
+        self._pending.clear()
+
+    async def flush(self) -> int:
+        """
+        Inserta todas las notificaciones pendientes en un solo batch.
+        Antes pasa los disparos por el ledger (alert_triggers): solo se crean
+        notificaciones para los pares (alerta, fecha, banda) que no se habían
+        notificado antes. Devuelve la cantidad de notificaciones creadas.
+        """
+        async with self._lock:
+            self._cancel_timer()
+            if not self._pending:
+                return 0
+
+            pending, self._pending = self._pending, []
+            started = time.perf_counter()
+            try:
+                count = await self._insert(pending)
+            except Exception:
+                self._pending[:0] = self._retryable(pending)
+                raise
+            except BaseException:
+                # CancelledError (timeout del handler, apagado): el lote no se pierde
+                self._pending[:0] = pending
+                raise
+
+            elapsed = time.perf_counter() - started
+            self.stats.flushes += 1
+            self.stats.rows += count
+            self.stats.peak_batch_size = max(self.stats.peak_batch_size, len(pending))
+            self.stats.last_flush_seconds = elapsed
+            self.stats.total_flush_seconds += elapsed
+            metrics.observe("notification_flush_seconds", elapsed)
+            metrics.observe("notification_flush_batch_size", len(pending))
+
+            logger.info(f"Bulk insert: {count} notificaciones creadas ({len(pending)} disparos en el lote)")
+            return count
+
+    def _retryable(self, pending: list[dict]) -> list[dict]:
+        retry, dropped = [], 0
+        for row in pending:
+            row["flush_attempts"] = row.get("flush_attempts", 0) + 1
+            if row["flush_attempts"] < self.max_attempts:
+                retry.append(row)
+            else:
+                dropped += 1
+        if dropped:
+            metrics.inc("notification_flush_dropped_total", dropped)
+            logger.error(
+                f"❌ Se descartan {dropped} notificaciones tras {self.max_attempts} intentos de insert fallidos"
+            )
+        return retry
+
+    async def _insert(self, pending: list[dict]) -> int:
+        from app.repositories.alert_trigger_repo import AlertTriggerRepository
+        from app.repositories.notification_repo import NotificationRepository
+        from app.services.notification_digest import build_notification_rows
+        from app.services.notification_stream import notification_broker
+
+        async with async_session() as session:
+            ledger = AlertTriggerRepository(session)
+            new_triggers = await ledger.claim(pending)
+
+            # Con NOTIFICATION_DIGEST los disparos del flush se agrupan por usuario o alerta
+            rows = await build_notification_rows(session, new_triggers)
+            await NotificationRepository(session).bulk_create(rows)
+
+        # Ya confirmadas: despierta los streams de este proceso sin esperar al NOTIFY
+        notification_broker.publish(row["user_id"] for row in rows)
+        return len(rows)
+
+    async def _flush_after_delay(self) -> None:
+        await asyncio.sleep(self.max_delay_seconds)
+        # El timer ya disparó: flush() no debe cancelarlo
+        self._timer = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"❌ Error en el flush por tiempo de notificaciones: {e}")
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = None
+
+
+notification_batcher = NotificationBatcher()
+
+# Buffer de la corrida en curso (ver run_notifications); None usa el compartido
+_run_batcher: ContextVar[NotificationBatcher | None] = ContextVar("run_notification_batcher", default=None)
+
+
+@contextmanager
+def run_notifications():
+    """
+    Buffer propio de una corrida, para el digest: el batcher compartido se
+    vacía por tamaño, por tiempo y con los flush de la ingesta o el outbox,
+    y partiría los disparos de un usuario en varios digest. Dentro del bloque
+    (y en las tareas y workers del bus que arranque) los handlers encolan en
+    este buffer, que solo se inserta con flush_notifications(). Si la corrida
+    falla antes del flush, sus disparos no llegaron al ledger y se vuelven a
+    detectar en la siguiente.
+    """
+    token = _run_batcher.set(NotificationBatcher(max_batch_size=sys.maxsize, max_delay_seconds=0))
+    try:
+        yield
+    finally:
+        _run_batcher.reset(token)
+
+
+def current_batcher() -> NotificationBatcher:
+    batcher = _run_batcher.get()
+    return notification_batcher if batcher is None else batcher
+
+
+@batch_handler
+async def handle_alerts_triggered(events: list[AlertTriggeredEvent]):
+    # Arma el payload del insert del lote completo en una sola pasada
+    await current_batcher().add_many([
+        {
+            "user_id": event.user_id,
+            "alert_id": event.alert_id,
+            "field_id": event.field_id,
+            "event_type": event.event_type,
+            "threshold": event.threshold,
+            "target_date": event.target_date,
+            "actual_value": event.actual_value,
+        }
+        for event in events
+    ])
 
 
 async def handle_alert_triggered(event: AlertTriggeredEvent):
-    message = (
-        f"⚠️ Alerta: {event.event_type} detectada con "
-        f"{event.actual_value}% de probabilidad "
-        f"(umbral configurado: {event.threshold}%) "
-        f"para el día {event.target_date}"
-    )
-    _pending_notifications.append({
-        "user_id": event.user_id,
-        "alert_id": event.alert_id,
-        "message": message,
-    })
+    await handle_alerts_triggered([event])
 
 
 async def flush_notifications():
-    """Inserta todas las notificaciones pendientes en un solo batch."""
-    global _pending_notifications
-    if not _pending_notifications:
-        return 0
-
-    from app.repositories.notification_repo import NotificationRepository
-
-    async with async_session() as session:
-        repo = NotificationRepository(session)
-        await repo.bulk_create(_pending_notifications)
-        count = len(_pending_notifications)
-        _pending_notifications = []
-        logger.info(f"Bulk insert: {count} notificaciones creadas")
-        return count
\ No newline at end of file
+    return await current_batcher().flush()
+
+
+async def shutdown_notifications(bus: EventBus):
+    """
+    Al apagar el proceso: procesa los eventos que quedaron en la cola del bus
+    e inserta las notificaciones que dejaron en el batcher, que si no se
+    perderían con él.
+    """
+    await bus.stop()
+    try:
+        count = await flush_notifications()
+        logger.info(f"📤 Notificaciones pendientes insertadas al cerrar: {count}")
+    except Exception as e:
+        logger.error(f"❌ Error al insertar las notificaciones pendientes al cerrar: {e}")
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+
+from app.config import settings
+from app.database import async_session
+from app.events.event_bus import EventBus
+from app.events.events import AlertTriggeredEvent
+from app.events.handlers.notification_handler import flush_notifications
+from app.metrics import metrics
+from app.repositories.outbox_repo import OutboxRepository
+
+logger = logging.getLogger(__name__)
+
+# Eventos que pueden viajar por el outbox, por nombre de clase
+OUTBOX_EVENTS = {cls.__name__: cls for cls in (AlertTriggeredEvent,)}
+
+
+class OutboxDispatcher:
+    """
+    Drena event_outbox hacia el EventBus. Cada lote se toma con
+    FOR UPDATE SKIP LOCKED, se entrega con emit_many, se insertan sus
+    notificaciones y recién entonces se marca como entregado. La entrega
+    es at-least-once: si el proceso muere a mitad de un lote, el lote se
+    vuelve a entregar y el ledger de disparos evita notificar dos veces.
+
+    Los handlers se llaman en el dispatcher (sin pasar por la cola del bus)
+    para ver sus fallas: los eventos con algún handler fallido o vencido
+    quedan pendientes con backoff exponencial (OUTBOX_RETRY_BASE_SECONDS,
+    hasta OUTBOX_RETRY_MAX_SECONDS) y el resto del lote se marca entregado.
+    """
+
+    def __init__(self, bus: EventBus, batch_size: int | None = None, poll_interval: float | None = None):
+        self.bus = bus
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.poll_interval = poll_interval or settings.OUTBOX_POLL_INTERVAL_SECONDS
+
+    async def dispatch_once(self) -> int:
+        async with async_session() as session:
+            repo = OutboxRepository(session)
+            rows = await repo.claim_batch(self.batch_size)
+            if not rows:
+                return 0
+
+            started = time.perf_counter()
+            events = [OUTBOX_EVENTS[row.event_type].from_payload(row.payload) for row in rows]
+            failures = await self.bus.emit_many(events, direct=True)
+            await flush_notifications()
+
+            # Un handler batch falla con el lote entero; uno por evento, con su evento
+            failed_events = {
+                id(event) for failure in failures
+                for event in (failure.event if isinstance(failure.event, list) else [failure.event])
+            }
+            failed = [row.id for row, event in zip(rows, events) if id(event) in failed_events]
+            delivered = [row.id for row, event in zip(rows, events) if id(event) not in failed_events]
+            if failed:
+                error = "; ".join(sorted({f"{f.handler}: {f.error!r}" for f in failures}))
+                await repo.mark_failed(
+                    failed, error, settings.OUTBOX_RETRY_BASE_SECONDS, settings.OUTBOX_RETRY_MAX_SECONDS,
+                )
+                logger.warning(f"⚠️ Outbox: {len(failed)} eventos con handlers fallidos, se reintentan más tarde")
+                metrics.inc("outbox_failed_total", len(failed))
+            await repo.mark_delivered(delivered)
+
+        metrics.inc("outbox_delivered_total", len(delivered))
+        metrics.observe("outbox_batch_seconds", time.perf_counter() - started)
+        return len(rows)
+
+    @staticmethod
+    def check_engine() -> None:
+        """Los motores sql y numpy insertan las notificaciones sin pasar por el outbox."""
+        if settings.EVENT_DELIVERY == "outbox" and settings.EVALUATION_ENGINE != "python":
+            logger.warning(
+                f"⚠️ EVENT_DELIVERY=outbox no aplica con EVALUATION_ENGINE={settings.EVALUATION_ENGINE}: "
+                f"ese motor inserta las notificaciones en su propia transacción"
+            )
+
+    async def prune(self) -> int:
+        total = 0
+        while True:
+            async with async_session() as session:
+                deleted = await OutboxRepository(session).prune(
+                    settings.OUTBOX_RETENTION_SECONDS, settings.OUTBOX_PRUNE_BATCH_SIZE,
+                )
+            total += deleted
+            if deleted < settings.OUTBOX_PRUNE_BATCH_SIZE:
+                break
+        if total:
+            logger.info(f"🧹 Outbox: {total} eventos entregados eliminados")
+        return total
+
+    async def run_forever(self) -> None:
+        logger.info(f"📤 Dispatcher de outbox iniciado (lotes de {self.batch_size})")
+        last_prune = time.monotonic()
+        while True:
+            try:
+                delivered = await self.dispatch_once()
+                if time.monotonic() - last_prune >= settings.OUTBOX_PRUNE_INTERVAL_SECONDS:
+                    await self.prune()
+                    last_prune = time.monotonic()
+            except Exception as e:
+                delivered = 0
+                logger.error(f"❌ Error despachando el outbox: {e}")
+
+            # Lote completo: probablemente quedan más, se sigue sin esperar
+            if delivered < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
@@ -1,27 +1,125 @@
 import asyncio
 import logging
+import signal
 
 from app.config import settings
-from app.database import async_session
+from app.database import async_session, configure_engine
+from app.events.event_bus import event_bus
+from app.events.handlers import register_handlers
+from app.events.handlers.notification_handler import shutdown_notifications
+from app.events.outbox import OutboxDispatcher
+from app.jobs.leader import evaluation_leader
+from app.jobs.scheduler import JobScheduler
+from app.services.delivery_service import run_delivery_job
 from app.services.evaluation_service import EvaluationService
 
 logger = logging.getLogger(__name__)
 
+# Scheduler del proceso actual; None si el job no corre en este proceso
+evaluation_scheduler: JobScheduler | None = None
+
+
+async def evaluate_once():
+    logger.info("⏰ Job de evaluación iniciado")
+    async with async_session() as session:
+        service = EvaluationService(session)
+        if settings.EVALUATION_INCREMENTAL:
+            triggered = await service.evaluate_incremental()
+        else:
+            triggered = await service.evaluate_all()
+        logger.info(f"✅ Job finalizado. Alertas disparadas: {triggered}")
+        return triggered
+
+
+async def evaluation_tick():
+    if settings.JOB_LEADER_ELECTION and not await evaluation_leader.try_acquire():
+        logger.info("⏭️ Otro worker tiene el lease de evaluación, se saltea el tick")
+        return
+
+    await evaluate_once()
+    if settings.JOB_LEADER_ELECTION:
+        await evaluation_leader.mark_run()
+
 
 async def run_evaluation_job():
     """
     Background job que evalúa periódicamente las alertas activas
     contra los datos meteorológicos almacenados.
-    Se ejecuta cada EVALUATION_INTERVAL_SECONDS (default: 60s).
+    Se ejecuta cada EVALUATION_INTERVAL_SECONDS (default: 60s) con cadencia
+    fija, sin ejecuciones superpuestas y con backoff ante errores
+    (ver app/jobs/scheduler.py).
+    Con EVALUATION_INCREMENTAL solo se evalúan los cambios desde el último
+    tick, con una reconciliación completa periódica.
+    Con JOB_LEADER_ELECTION, de todos los procesos que corren el job solo
+    evalúa el que tiene el lease (ver app/jobs/leader.py).
+    """
+    global evaluation_scheduler
+    scheduler = JobScheduler(
+        "evaluation",
+        evaluation_tick,
+        interval_seconds=settings.EVALUATION_INTERVAL_SECONDS,
+        jitter_seconds=settings.EVALUATION_JITTER_SECONDS,
+        max_backoff_seconds=settings.EVALUATION_MAX_BACKOFF_SECONDS,
+    )
+    evaluation_scheduler = scheduler
+
+    heartbeat = None
+    if settings.JOB_LEADER_ELECTION:
+        evaluation_leader.on_run_requested = scheduler.trigger
+        heartbeat = asyncio.create_task(evaluation_leader.run_heartbeat())
+
+    try:
+        await scheduler.run_forever()
+    finally:
+        evaluation_scheduler = None
+        if heartbeat:
+            heartbeat.cancel()
+            # Una renovación en curso podría commitear después del release y
+            # volver a tomar el lease: se espera a que el heartbeat termine
+            await asyncio.gather(heartbeat, return_exceptions=True)
+            evaluation_leader.on_run_requested = None
+            # Liberar el lease permite que otro worker tome el relevo sin esperar el TTL
+            await evaluation_leader.release()
+
+
+async def main():
+    """
+    Entry point del worker de evaluación: `python -m app.jobs.evaluate_alerts`.
+    Corre el job en un proceso propio, con su propio engine y pool, para que
+    la evaluación no comparta el event loop con la API. Con
+    EVENT_DELIVERY=outbox también drena event_outbox, y con
+    WHATSAPP_DELIVERY_ENABLED envía las notificaciones pendientes.
     """
-    while True:
-        try:
-            logger.info("⏰ Job de evaluación iniciado")
-            async with async_session() as session:
-                service = EvaluationService(session)
-                triggered = await service.evaluate_all()
-                logger.info(f"✅ Job finalizado. Alertas disparadas: {triggered}")
-        except Exception as e:
-            logger.error(f"❌ Error en job de evaluación: {e}")
-
-        await asyncio.sleep(settings.EVALUATION_INTERVAL_SECONDS)
\ No newline at end of file
+    engine = configure_engine(settings.WORKER_DB_POOL_SIZE, settings.WORKER_DB_MAX_OVERFLOW)
+    register_handlers(event_bus)
+    await event_bus.start()
+
+    jobs = [run_evaluation_job()]
+    if settings.EVENT_DELIVERY == "outbox":
+        OutboxDispatcher.check_engine()
+        jobs.append(OutboxDispatcher(event_bus).run_forever())
+    if settings.WHATSAPP_DELIVERY_ENABLED:
+        jobs.append(run_delivery_job())
+    tasks = [asyncio.create_task(job) for job in jobs]
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, lambda: [t.cancel() for t in tasks])
+    logger.info("🚀 Worker de evaluación iniciado")
+
+    try:
+        await asyncio.gather(*tasks)
+    except asyncio.CancelledError:
+        logger.info("🛑 Worker de evaluación detenido")
+    finally:
+        # Si un job terminó con error, los demás siguen corriendo: se cancelan
+        # y se espera a que terminen antes de drenar el bus y cerrar el engine
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await shutdown_notifications(event_bus)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import os
+import socket
+from typing import Callable
+
+from app.config import settings
+from app.database import async_session
+from app.repositories.job_lease_repo import JobLeaseRepository
+
+logger = logging.getLogger(__name__)
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaderElection:
+    """
+    Elección de líder basada en un lease en la tabla job_leases.
+    Todos los workers intentan tomar/renovar el lease cada ttl/3 segundos:
+    el líder lo renueva y, si muere, otro worker lo toma apenas vence.
+    En cada heartbeat el líder consume los pedidos de ejecución inmediata
+    (POST /jobs/.../run) y llama a on_run_requested.
+    """
+
+    def __init__(self, name: str, holder: str | None = None, ttl_seconds: int | None = None):
+        self.name = name
+        self.holder = holder or worker_id()
+        self.ttl_seconds = ttl_seconds or settings.JOB_LEASE_TTL_SECONDS
+        self.is_leader = False
+        self.on_run_requested: Callable[[], object] | None = None
+
+    async def try_acquire(self) -> bool:
+        async with async_session() as session:
+            acquired = await JobLeaseRepository(session).try_acquire(
+                self.name, self.holder, self.ttl_seconds
+            )
+        if acquired != self.is_leader:
+            if acquired:
+                logger.info(f"👑 {self.holder} tomó el lease de '{self.name}'")
+            else:
+                logger.warning(f"{self.holder} perdió el lease de '{self.name}'")
+        self.is_leader = acquired
+        return acquired
+
+    async def mark_run(self) -> None:
+        async with async_session() as session:
+            await JobLeaseRepository(session).mark_run(self.name, self.holder)
+
+    async def request_run(self) -> None:
+        async with async_session() as session:
+            await JobLeaseRepository(session).request_run(self.name)
+
+    async def consume_run_request(self) -> bool:
+        async with async_session() as session:
+            return await JobLeaseRepository(session).consume_run_request(self.name, self.holder)
+
+    async def release(self) -> None:
+        if not self.is_leader:
+            return
+        async with async_session() as session:
+            await JobLeaseRepository(session).release(self.name, self.holder)
+        self.is_leader = False
+        logger.info(f"{self.holder} liberó el lease de '{self.name}'")
+
+    async def run_heartbeat(self) -> None:
+        while True:
+            try:
+                if await self.try_acquire() and self.on_run_requested and await self.consume_run_request():
+                    self.on_run_requested()
+            except Exception as e:
+                self.is_leader = False
+                logger.error(f"❌ Error renovando el lease de '{self.name}': {e}")
+            await asyncio.sleep(self.ttl_seconds / 3)
+
+
+evaluation_leader = LeaderElection("evaluate_alerts")
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable
+
+from app.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class JobScheduler:
+    """
+    Scheduler de cadencia fija para jobs periódicos:
+
+    - Los ticks se calculan desde el horario programado y no desde el fin de
+      la ejecución anterior, así el período no deriva si la evaluación se
+      vuelve lenta.
+    - Si al llegar un tick la ejecución anterior sigue corriendo, el tick se
+      saltea (no se acumulan ejecuciones).
+    - Cada espera suma un jitter aleatorio y, ante errores consecutivos, el
+      próximo intento se posterga con backoff exponencial.
+    - trigger() fuerza una ejecución inmediata sin correr la cadencia.
+
+    Exporta en /metrics duración, lag (demora respecto del horario esperado),
+    ejecuciones, fallas y ticks salteados con el prefijo `{name}_job_`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable],
+        interval_seconds: float,
+        jitter_seconds: float = 0.0,
+        max_backoff_seconds: float | None = None,
+    ):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.jitter_seconds = jitter_seconds
+        self.max_backoff_seconds = max_backoff_seconds or interval_seconds * 10
+        self.consecutive_failures = 0
+        self._next_run = 0.0
+        self._backoff_until = 0.0
+        self._trigger = asyncio.Event()
+        self._current: asyncio.Task | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._current is not None and not self._current.done()
+
+    def trigger(self) -> bool:
+        """Pide una ejecución inmediata. Devuelve False si ya hay una en curso."""
+        if self.is_running:
+            return False
+        self._trigger.set()
+        return True
+
+    async def run_forever(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._next_run = loop.time()
+        try:
+            while True:
+                due = max(self._next_run, self._backoff_until) + random.uniform(0, self.jitter_seconds)
+                triggered = await self._wait(due - loop.time())
+                now = loop.time()
+                if not triggered and now < self._backoff_until:
+                    # La ejecución que falló terminó después de calcular la espera
+                    continue
+
+                if triggered:
+                    lag = 0.0
+                else:
+                    lag = now - due
+                    self._advance(now)
+
+                self._start(lag)
+        finally:
+            if self.is_running:
+                # Se espera a que la ejecución en curso termine su limpieza
+                # (sesión, lease) antes de devolver el control al que apaga
+                self._current.cancel()
+                await asyncio.gather(self._current, return_exceptions=True)
+
+    def _advance(self, now: float) -> None:
+        # Cadencia fija; si se perdieron ticks (backoff, loop bloqueado) se saltan
+        self._next_run += self.interval_seconds
+        while self._next_run <= now:
+            self._next_run += self.interval_seconds
+
+    async def _wait(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._trigger.wait(), timeout=max(timeout, 0))
+        except asyncio.TimeoutError:
+            return False
+        self._trigger.clear()
+        return True
+
+    def _start(self, lag: float) -> None:
+        if self.is_running:
+            metrics.inc(f"{self.name}_job_skipped_total")
+            logger.warning(f"⏭️ Job '{self.name}' sigue en ejecución, se saltea el tick")
+            return
+
+        metrics.observe(f"{self.name}_job_lag_seconds", lag)
+        self._current = asyncio.create_task(self._run_once())
+
+    async def _run_once(self) -> None:
+        started = time.perf_counter()
+        try:
+            await self.func()
+        except Exception as e:
+            self.consecutive_failures += 1
+            backoff = min(
+                self.interval_seconds * 2 ** self.consecutive_failures,
+                self.max_backoff_seconds,
+            )
+            self._backoff_until = asyncio.get_running_loop().time() + backoff
+            metrics.inc(f"{self.name}_job_failures_total")
+            logger.error(
+                f"❌ Error en job '{self.name}' ({self.consecutive_failures} consecutivos): {e}. "
+                f"Próximo intento en {backoff:.0f}s"
+            )
+        else:
+            self.consecutive_failures = 0
+            self._backoff_until = 0.0
+            metrics.inc(f"{self.name}_job_runs_total")
+        finally:
+            metrics.observe(f"{self.name}_job_duration_seconds", time.perf_counter() - started)
+            metrics.set(f"{self.name}_job_consecutive_failures", self.consecutive_failures)
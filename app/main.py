@@ -3,16 +3,23 @@ import logging
 
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
-from app.database import async_session
+from app.config import settings
+from app.database import async_session, engine
 from app.events.event_bus import event_bus
-from app.events.events import AlertTriggeredEvent
-from app.events.handlers.notification_handler import handle_alert_triggered
-from app.events.handlers.log_handler import handle_alert_triggered_log
+from app.events.handlers import register_handlers
+from app.events.handlers.notification_handler import shutdown_notifications
+from app.events.outbox import OutboxDispatcher
 from app.jobs.evaluate_alerts import run_evaluation_job
-from app.routers import users, fields, alerts, notifications, weather
+from app.metrics import metrics
+from app.pagination import InvalidCursor
+from app.routers import users, fields, alerts, notifications, weather, jobs
 from app.seeds.seed_data import seed
+from app.services.delivery_service import run_delivery_job
+from app.services.notification_stream import NotificationListener
+from app.services.alert_index import active_alert_index
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,22 +28,51 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Registrar handlers del Observer
-    event_bus.subscribe(AlertTriggeredEvent, handle_alert_triggered)
-    event_bus.subscribe(AlertTriggeredEvent, handle_alert_triggered_log)
+    register_handlers(event_bus)
+    await event_bus.start()
     logger.info("🔔 Event handlers registrados")
 
     # Cargar datos mock
     async with async_session() as session:
         await seed(session)
-
-    # Lanzar background job
-    task = asyncio.create_task(run_evaluation_job())
-    logger.info("🚀 Background job de evaluación iniciado")
+        await active_alert_index.load(session)
+    logger.info(f"📇 Índice de alertas activas cargado ({len(active_alert_index)} alertas)")
+
+    # Lanzar background job (salvo que corra en un worker aparte)
+    task = None
+    if settings.RUN_EVALUATION_JOB_IN_API:
+        task = asyncio.create_task(run_evaluation_job())
+        logger.info("🚀 Background job de evaluación iniciado")
+    else:
+        logger.info("⏭️ Background job deshabilitado en la API (RUN_EVALUATION_JOB_IN_API=false)")
+
+    # Con outbox, cada proceso de la API también es consumidor (SKIP LOCKED)
+    dispatcher = None
+    if settings.EVENT_DELIVERY == "outbox":
+        OutboxDispatcher.check_engine()
+        dispatcher = asyncio.create_task(OutboxDispatcher(event_bus).run_forever())
+
+    # El envío por WhatsApp corre junto al job de evaluación: el rate limit es por proceso
+    delivery = None
+    if settings.WHATSAPP_DELIVERY_ENABLED and settings.RUN_EVALUATION_JOB_IN_API:
+        delivery = asyncio.create_task(run_delivery_job())
+
+    # Notificaciones insertadas por otros procesos, para los streams SSE
+    listener = None
+    if settings.NOTIFICATION_STREAM_LISTEN:
+        listener = asyncio.create_task(NotificationListener().run_forever())
 
     yield
 
-    task.cancel()
-    logger.info("🛑 Background job detenido")
+    background = [t for t in (task, dispatcher, delivery, listener) if t]
+    for t in background:
+        t.cancel()
+    # Espera a que terminen de cancelarse antes de tocar el bus y el engine
+    await asyncio.gather(*background, return_exceptions=True)
+    logger.info("🛑 Tareas en segundo plano detenidas")
+
+    await shutdown_notifications(event_bus)
+    await engine.dispose()
 
 
 app = FastAPI(
@@ -44,11 +80,18 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=400, content={"detail": "Cursor inválido"})
+
+
 app.include_router(users.router)
 app.include_router(fields.router)
 app.include_router(alerts.router)
 app.include_router(notifications.router)
 app.include_router(weather.router)
+app.include_router(jobs.router)
 
 
 @app.get("/")
@@ -58,4 +101,9 @@ async def root():
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+
+@app.get("/metrics")
+async def get_metrics():
+    return metrics.snapshot()
@@ -3,5 +3,10 @@ from app.models.field import Field
 from app.models.weather_data import WeatherData
 from app.models.alert import Alert
 from app.models.notification import Notification
+from app.models.notification_counter import NotificationCounter
+from app.models.alert_trigger import AlertTrigger
+from app.models.evaluation_state import EvaluationState
+from app.models.job_lease import JobLease
+from app.models.event_outbox import EventOutbox
 
-__all__ = ["User", "Field", "WeatherData", "Alert", "Notification"]
\ No newline at end of file
+__all__ = ["User", "Field", "WeatherData", "Alert", "Notification", "NotificationCounter", "AlertTrigger", "EvaluationState", "JobLease", "EventOutbox"]
\ No newline at end of file
@@ -12,6 +12,8 @@ class Alert(Base):
     __tablename__ = "alerts"
     __table_args__ = (
         Index("ix_alert_active_field_event", "is_active", "field_id", "event_type"),
+        Index("ix_alert_updated_at", "updated_at"),
+        Index("ix_alert_user_created", "user_id", "created_at", "id"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -21,6 +23,9 @@ class Alert(Base):
     threshold: Mapped[float] = mapped_column(Float, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
 
     user: Mapped["User"] = relationship(back_populates="alerts")
     field: Mapped["Field"] = relationship(back_populates="alerts")
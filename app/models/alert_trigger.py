@@ -0,0 +1,24 @@
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import Integer, Float, Date, DateTime, ForeignKey, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class AlertTrigger(Base):
+    __tablename__ = "alert_triggers"
+    __table_args__ = (
+        UniqueConstraint("alert_id", "target_date", "band", name="uq_alert_trigger_alert_date_band"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    alert_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("alerts.id", ondelete="CASCADE"), nullable=False
+    )
+    target_date: Mapped[date] = mapped_column(Date, nullable=False)
+    band: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    probability: Mapped[float] = mapped_column(Float, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
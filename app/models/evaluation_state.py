@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from sqlalchemy import String, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+# Watermarks persistidos de la evaluación incremental (una fila por job)
+class EvaluationState(Base):
+    __tablename__ = "evaluation_state"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    weather_watermark: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    alert_watermark: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_full_run_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
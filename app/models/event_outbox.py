@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Identity, Integer, String, DateTime, Index, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+# Outbox transaccional: los eventos se escriben en la misma transacción que la
+# evaluación y los despacha OutboxDispatcher (ver app/events/outbox.py)
+class EventOutbox(Base):
+    __tablename__ = "event_outbox"
+    __table_args__ = (
+        Index("ix_event_outbox_pending", "id", postgresql_where=text("delivered_at IS NULL")),
+        Index("ix_event_outbox_delivered_at", "delivered_at", postgresql_where=text("delivered_at IS NOT NULL")),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    event_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    delivered_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Entregas fallidas (algún handler falló o excedió su timeout): el evento
+    # sigue pendiente y no se vuelve a tomar antes de next_attempt_at
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    next_attempt_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(String(500), nullable=True)
@@ -1,22 +1,111 @@
 import uuid
-from datetime import datetime
+from datetime import date, datetime
+from functools import lru_cache
 
-from sqlalchemy import String, Boolean, DateTime, ForeignKey, func
+from sqlalchemy import (
+    DDL, String, Boolean, CheckConstraint, Date, DateTime, Float, ForeignKey, Index, Integer, event, func, text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
 
+ALERT_MESSAGE_TEMPLATE = (
+    "⚠️ Alerta: {event_type} detectada con {actual_value}% de probabilidad "
+    "(umbral configurado: {threshold}%) para el día {target_date}"
+)
+
+
+# Canal de LISTEN/NOTIFY con los usuarios que recibieron notificaciones nuevas
+NOTIFICATIONS_CHANNEL = "notifications_created"
+
+# Un NOTIFY por sentencia (no por fila), con los user_id separados por coma en
+# grupos de 100 para no pasar el límite de 8000 bytes del payload. Postgres
+# los entrega al hacer commit.
+NOTIFY_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION notifications_notify_created() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        payload text;
+    BEGIN
+        FOR payload IN
+            SELECT string_agg(user_id::text, ',')
+            FROM (
+                SELECT user_id, (row_number() OVER (ORDER BY user_id) - 1) / 100 AS chunk
+                FROM (SELECT DISTINCT user_id FROM new_rows) d
+            ) c
+            GROUP BY chunk
+        LOOP
+            PERFORM pg_notify('notifications_created', payload);
+        END LOOP;
+        RETURN NULL;
+    END $$
+    """,
+    """
+    CREATE OR REPLACE TRIGGER notifications_notify_created AFTER INSERT ON notifications
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notifications_notify_created()
+    """,
+]
+NOTIFY_DROP_DDL = ["DROP FUNCTION IF EXISTS notifications_notify_created() CASCADE"]
+
+
+@lru_cache(maxsize=4096)
+def format_alert_message(event_type: str, actual_value: float, threshold: float, target_date: date) -> str:
+    # Un mismo pronóstico se repite en muchas notificaciones: se cachea el texto
+    return ALERT_MESSAGE_TEMPLATE.format(
+        event_type=event_type, actual_value=actual_value,
+        threshold=threshold, target_date=target_date,
+    )
+
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Cola de entrega: solo las notificaciones que falta enviar
+        Index("ix_notifications_delivery_pending", "created_at", postgresql_where=text("delivery_status = 'pending'")),
+        # Paginación por cursor de GET /notifications/user/{id}
+        Index("ix_notifications_user_created", "user_id", "created_at", "id"),
+        # No leídas: unread_only y el recuento de los contadores al mover la marca de lectura
+        Index("ix_notifications_unread", "user_id", "created_at", "id", postgresql_where=text("is_read = false")),
+        CheckConstraint("message IS NOT NULL OR event_type IS NOT NULL", name="ck_notifications_has_content"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     alert_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("alerts.id"), nullable=False)
-    message: Mapped[str] = mapped_column(String(500), nullable=False)
+    # Datos del disparo; el texto se arma al leer o enviar (ver `text`)
+    event_type: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    actual_value: Mapped[float | None] = mapped_column(Float, nullable=True)
+    threshold: Mapped[float | None] = mapped_column(Float, nullable=True)
+    target_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    # Texto libre: solo para lo que no sale del template (por ejemplo, los digests)
+    message: Mapped[str | None] = mapped_column(String(500), nullable=True)
     is_read: Mapped[bool] = mapped_column(Boolean, default=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # Hora del insert y no del inicio de la transacción (now()): un lote que
+    # confirma después de "marcar todas" no queda por debajo de la marca
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.clock_timestamp())
+
+    # Entrega por WhatsApp: pending -> sent | failed
+    delivery_status: Mapped[str] = mapped_column(String(20), default="pending", server_default="pending")
+    delivery_attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    next_attempt_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    delivered_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    provider_message_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(String(500), nullable=True)
 
     user: Mapped["User"] = relationship(back_populates="notifications")
-    alert: Mapped["Alert"] = relationship(back_populates="notifications")
\ No newline at end of file
+    alert: Mapped["Alert"] = relationship(back_populates="notifications")
+
+    @property
+    def text(self) -> str:
+        if self.message is not None:
+            return self.message
+        return format_alert_message(self.event_type, self.actual_value, self.threshold, self.target_date)
+
+
+for statement in NOTIFY_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in NOTIFY_DROP_DDL:
+    event.listen(Base.metadata, "after_drop", DDL(statement).execute_if(dialect="postgresql"))
@@ -0,0 +1,168 @@
+import uuid
+
+from sqlalchemy import DDL, BigInteger, ForeignKey, Integer, event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+# Los contadores se mantienen con triggers: así cubren todos los caminos de
+# escritura (ORM, INSERT por lotes, COPY y el INSERT ... SELECT del motor SQL).
+# Una notificación cuenta como no leída si is_read = false y es posterior a la
+# marca de lectura del usuario (users.notifications_read_until).
+TRIGGER_DDL = [
+    # Inserts y deletes: triggers por sentencia con tablas de transición, un
+    # upsert por usuario aunque el lote tenga miles de filas
+    """
+    CREATE OR REPLACE FUNCTION notification_counters_on_insert() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO notification_counters (user_id, unread)
+        SELECT n.user_id, count(*)
+        FROM new_rows n JOIN users u ON u.id = n.user_id
+        WHERE NOT n.is_read
+          AND (u.notifications_read_until IS NULL OR n.created_at > u.notifications_read_until)
+        GROUP BY n.user_id
+        ORDER BY n.user_id
+        ON CONFLICT (user_id) DO UPDATE SET unread = notification_counters.unread + EXCLUDED.unread;
+        RETURN NULL;
+    END $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION notification_counters_on_delete() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE notification_counters c SET unread = c.unread - d.unread
+        FROM (
+            SELECT o.user_id, count(*) AS unread
+            FROM old_rows o JOIN users u ON u.id = o.user_id
+            WHERE NOT o.is_read
+              AND (u.notifications_read_until IS NULL OR o.created_at > u.notifications_read_until)
+            GROUP BY o.user_id
+        ) d
+        WHERE c.user_id = d.user_id;
+        RETURN NULL;
+    END $$
+    """,
+    # PATCH /notifications/{id}/read: una fila por vez
+    """
+    CREATE OR REPLACE FUNCTION notification_counters_on_read() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO notification_counters (user_id, unread)
+        SELECT NEW.user_id, CASE WHEN NEW.is_read THEN -1 ELSE 1 END
+        FROM users u
+        WHERE u.id = NEW.user_id
+          AND (u.notifications_read_until IS NULL OR NEW.created_at > u.notifications_read_until)
+        ON CONFLICT (user_id) DO UPDATE SET unread = notification_counters.unread + EXCLUDED.unread;
+        RETURN NULL;
+    END $$
+    """,
+    # Cambio de la marca de lectura: se recuentan las no leídas posteriores a
+    # la nueva marca sobre ix_notifications_unread (en "marcar todas", ninguna).
+    # El lock del contador espera a los inserts en curso del usuario, para que
+    # el recuento los vea.
+    """
+    CREATE OR REPLACE FUNCTION notification_counters_on_watermark() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO notification_counters (user_id) VALUES (NEW.id) ON CONFLICT (user_id) DO NOTHING;
+        PERFORM 1 FROM notification_counters WHERE user_id = NEW.id FOR UPDATE;
+        UPDATE notification_counters SET unread = (
+            SELECT count(*) FROM notifications n
+            WHERE n.user_id = NEW.id AND NOT n.is_read
+              AND (NEW.notifications_read_until IS NULL OR n.created_at > NEW.notifications_read_until)
+        )
+        WHERE user_id = NEW.id;
+        RETURN NULL;
+    END $$
+    """,
+    # Versión de las notificaciones del usuario (ETag de GET /notifications/user/{id}):
+    # cualquier insert, update (lectura, estado de entrega) o delete la incrementa.
+    # Los locks se toman en orden de user_id para que dos lotes no se bloqueen
+    # mutuamente.
+    """
+    CREATE OR REPLACE FUNCTION notification_counters_bump_version() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            PERFORM 1 FROM notification_counters
+            WHERE user_id IN (SELECT user_id FROM old_rows)
+            ORDER BY user_id FOR UPDATE;
+            UPDATE notification_counters SET version = version + 1
+            WHERE user_id IN (SELECT user_id FROM old_rows);
+        ELSE
+            INSERT INTO notification_counters (user_id, version)
+            SELECT DISTINCT user_id, 1 FROM new_rows
+            ORDER BY user_id
+            ON CONFLICT (user_id) DO UPDATE SET version = notification_counters.version + 1;
+        END IF;
+        RETURN NULL;
+    END $$
+    """,
+    """
+    CREATE OR REPLACE TRIGGER notification_counters_insert AFTER INSERT ON notifications
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_on_insert()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER notification_counters_delete AFTER DELETE ON notifications
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_on_delete()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER notification_counters_read AFTER UPDATE OF is_read ON notifications
+    FOR EACH ROW WHEN (OLD.is_read IS DISTINCT FROM NEW.is_read)
+    EXECUTE FUNCTION notification_counters_on_read()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER notification_counters_watermark AFTER UPDATE OF notifications_read_until ON users
+    FOR EACH ROW WHEN (OLD.notifications_read_until IS DISTINCT FROM NEW.notifications_read_until)
+    EXECUTE FUNCTION notification_counters_on_watermark()
+    """,
+    # Una tabla de transición no puede usarse con varios eventos: un trigger por evento
+    """
+    CREATE OR REPLACE TRIGGER notification_versions_insert AFTER INSERT ON notifications
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_bump_version()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER notification_versions_update AFTER UPDATE ON notifications
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_bump_version()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER notification_versions_delete AFTER DELETE ON notifications
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_bump_version()
+    """,
+]
+
+# Los triggers se borran junto con sus funciones
+DROP_DDL = [
+    "DROP FUNCTION IF EXISTS notification_counters_on_insert() CASCADE",
+    "DROP FUNCTION IF EXISTS notification_counters_on_delete() CASCADE",
+    "DROP FUNCTION IF EXISTS notification_counters_on_read() CASCADE",
+    "DROP FUNCTION IF EXISTS notification_counters_on_watermark() CASCADE",
+    "DROP FUNCTION IF EXISTS notification_counters_bump_version() CASCADE",
+]
+
+
+# Notificaciones no leídas por usuario (GET /notifications/user/{id}/unread-count)
+# y versión de sus notificaciones (ETag del listado)
+class NotificationCounter(Base):
+    __tablename__ = "notification_counters"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    unread: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    version: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0", nullable=False)
+
+
+# create_all / drop_all (tests y entornos sin Alembic): los triggers necesitan
+# notifications y users, así que se crean después de todas las tablas
+for statement in TRIGGER_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in DROP_DDL:
+    event.listen(Base.metadata, "after_drop", DDL(statement).execute_if(dialect="postgresql"))
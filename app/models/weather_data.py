@@ -12,6 +12,8 @@ class WeatherData(Base):
     __tablename__ = "weather_data"
     __table_args__ = (
         Index("ix_weather_field_event_date", "field_id", "event_type", "target_date"),
+        Index("ix_weather_created_at", "created_at"),
+        Index("ix_weather_field_date", "field_id", "target_date", "id"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -0,0 +1,91 @@
+import base64
+import binascii
+import json
+import uuid
+from datetime import date, datetime
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import Select, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values: tuple) -> str:
+    """Cursor opaco: los valores de la clave de orden de la última fila, en base64."""
+    payload = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else str(v) for v in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key: tuple) -> tuple:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(raw, list) or len(raw) != len(key):
+            raise InvalidCursor(cursor)
+        return tuple(_parse(value, column.type.python_type) for value, column in zip(raw, key))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursor(cursor) from e
+
+
+def _parse(value: str, python_type: type):
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    return python_type(value)
+
+
+def keyset(query: Select, key: tuple, cursor: str | None = None, descending: bool = False) -> Select:
+    """
+    Ordena por `key` (columnas únicas en conjunto, por ejemplo (created_at, id))
+    y, con cursor, sigue desde la última fila vista con una comparación de
+    tuplas que Postgres resuelve con un índice compuesto sobre la clave, sin
+    recorrer las filas anteriores como hace OFFSET.
+    """
+    query = query.order_by(*(column.desc() if descending else column.asc() for column in key))
+    if cursor:
+        position = tuple_(*decode_cursor(cursor, key))
+        query = query.where(tuple_(*key) < position if descending else tuple_(*key) > position)
+    return query
+
+
+class PageParams:
+    """
+    Parámetros de paginación de los listados. `cursor` es el valor de
+    X-Next-Cursor de la página anterior; `skip` (offset) sigue funcionando
+    durante la deprecación y se responde con el header `Deprecation`.
+    """
+
+    def __init__(
+        self,
+        cursor: str | None = Query(None, description="Valor del header X-Next-Cursor de la página anterior"),
+        skip: int | None = Query(None, ge=0, deprecated=True),
+        limit: int = Query(20, ge=1, le=100),
+    ):
+        if cursor and skip:
+            raise HTTPException(status_code=400, detail="Usar cursor o skip, no ambos")
+        self.cursor = cursor
+        self.skip = skip
+        self.limit = limit
+
+    @property
+    def fetch_limit(self) -> int:
+        # Una fila de más para saber si hay página siguiente
+        return self.limit + 1
+
+    def respond(self, response: Response, rows: list, key: tuple) -> list:
+        """Recorta la fila extra y agrega los headers de paginación."""
+        if self.skip is not None:
+            response.headers["Deprecation"] = "true"
+        if len(rows) <= self.limit:
+            return rows
+        rows = rows[:self.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            tuple(getattr(rows[-1], column.key) for column in key)
+        )
+        return rows
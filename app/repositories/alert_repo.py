@@ -1,12 +1,18 @@
 import uuid
+from datetime import datetime
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.etag import version_columns
 from app.models.alert import Alert
+from app.models.user import User
+from app.pagination import keyset
 
 
 class AlertRepository:
+    PAGE_KEY = (Alert.created_at, Alert.id)
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
@@ -32,14 +38,39 @@ class AlertRepository:
         )
         return list(result.scalars().all())
 
-    async def get_by_user(self, user_id: uuid.UUID, skip: int = 0, limit: int = 20) -> list[Alert]:
+    async def last_change(self) -> datetime | None:
+        """Último updated_at de alerts (indexado): avanza con cada alta o modificación."""
+        return await self.session.scalar(select(func.max(Alert.updated_at)))
+
+    async def get_by_user(
+        self, user_id: uuid.UUID, skip: int | None = None, limit: int = 20, cursor: str | None = None,
+    ) -> list[Alert]:
         result = await self.session.execute(
-            select(Alert)
-            .where(Alert.user_id == user_id)
+            keyset(select(Alert).where(Alert.user_id == user_id), self.PAGE_KEY, cursor)
             .offset(skip).limit(limit)
         )
         return list(result.scalars().all())
 
+    async def version_for_user(self, user_id: uuid.UUID) -> tuple | None:
+        """
+        Versión de las alertas del usuario para el ETag, sobre updated_at.
+        None si el usuario no existe.
+        """
+        result = await self.session.execute(
+            select(*version_columns(Alert.updated_at))
+            .select_from(User)
+            .outerjoin(Alert, Alert.user_id == User.id)
+            .where(User.id == user_id)
+            .group_by(User.id)
+        )
+        row = result.first()
+        return tuple(row) if row else None
+
+    async def version(self, alert_id: uuid.UUID) -> tuple | None:
+        result = await self.session.execute(select(Alert.updated_at).where(Alert.id == alert_id))
+        updated_at = result.scalar_one_or_none()
+        return (updated_at,) if updated_at else None
+
     async def update(self, alert: Alert, **kwargs) -> Alert:
         for key, value in kwargs.items():
             if value is not None:
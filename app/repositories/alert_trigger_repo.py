@@ -0,0 +1,72 @@
+import uuid
+
+from sqlalchemy import text, bindparam, Date, Integer, Float
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+
+# Un único INSERT set-based: el UNIQUE (alert_id, target_date, band) decide
+# qué disparos son nuevos y RETURNING devuelve solo esos. Los disparos de
+# alertas borradas o desactivadas desde la evaluación se descartan, y
+# FOR KEY SHARE impide que las restantes se borren antes del commit (el
+# FK de notifications fallaría con todo el lote).
+_CLAIM_SQL = text("""
+    INSERT INTO alert_triggers (id, alert_id, target_date, band, probability, created_at)
+    SELECT gen_random_uuid(), t.alert_id, t.target_date, t.band, t.probability, now()
+    FROM unnest(:alert_ids, :target_dates, :bands, :probabilities)
+        AS t(alert_id, target_date, band, probability)
+    JOIN alerts a ON a.id = t.alert_id
+    WHERE a.is_active
+    FOR KEY SHARE OF a
+    ON CONFLICT ON CONSTRAINT uq_alert_trigger_alert_date_band DO NOTHING
+    RETURNING alert_id, target_date, band
+""").bindparams(
+    bindparam("alert_ids", type_=ARRAY(UUID(as_uuid=True))),
+    bindparam("target_dates", type_=ARRAY(Date)),
+    bindparam("bands", type_=ARRAY(Integer)),
+    bindparam("probabilities", type_=ARRAY(Float)),
+)
+
+
+def probability_band(probability: float) -> int:
+    """Banda de probabilidad; con NOTIFICATION_REFIRE_BAND_WIDTH=0 hay una sola banda."""
+    width = settings.NOTIFICATION_REFIRE_BAND_WIDTH
+    if width <= 0:
+        return 0
+    return int(probability // width)
+
+
+class AlertTriggerRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def claim(self, triggers: list[dict]) -> list[dict]:
+        """
+        Registra los disparos en el ledger y devuelve solo los que no existían
+        y cuya alerta sigue activa. Cada dict necesita alert_id, target_date y actual_value. No hace commit:
+        se confirma junto con la inserción de las notificaciones.
+        """
+        if not triggers:
+            return []
+
+        bands = [probability_band(t["actual_value"]) for t in triggers]
+        result = await self.session.execute(
+            _CLAIM_SQL,
+            {
+                "alert_ids": [t["alert_id"] for t in triggers],
+                "target_dates": [t["target_date"] for t in triggers],
+                "bands": bands,
+                "probabilities": [t["actual_value"] for t in triggers],
+            },
+        )
+        claimed: set[tuple[uuid.UUID, object, int]] = set(map(tuple, result.all()))
+
+        new_triggers = []
+        for trigger, band in zip(triggers, bands):
+            key = (trigger["alert_id"], trigger["target_date"], band)
+            if key in claimed:
+                # Si el mismo lote trae la clave repetida, solo la primera cuenta
+                claimed.discard(key)
+                new_triggers.append(trigger)
+        return new_triggers
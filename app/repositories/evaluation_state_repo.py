@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.alert import Alert
+from app.models.evaluation_state import EvaluationState
+from app.models.weather_data import WeatherData
+
+
+class EvaluationStateRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_or_create(self, name: str) -> EvaluationState:
+        state = await self.session.get(EvaluationState, name)
+        if state is None:
+            state = EvaluationState(name=name)
+            self.session.add(state)
+        return state
+
+    async def get_latest_changes(self) -> tuple[datetime | None, datetime | None]:
+        """Último created_at de weather_data y último updated_at de alerts (ambos indexados)."""
+        result = await self.session.execute(
+            select(
+                select(func.max(WeatherData.created_at)).scalar_subquery(),
+                select(func.max(Alert.updated_at)).scalar_subquery(),
+            )
+        )
+        weather_hi, alert_hi = result.one()
+        return weather_hi, alert_hi
+
+    async def save(self, state: EvaluationState) -> EvaluationState:
+        self.session.add(state)
+        await self.session.commit()
+        return state
@@ -3,10 +3,15 @@ import uuid
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.etag import version_columns
 from app.models.field import Field
+from app.models.user import User
+from app.pagination import keyset
 
 
 class FieldRepository:
+    PAGE_KEY = (Field.created_at, Field.id)
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
@@ -20,10 +25,31 @@ class FieldRepository:
     async def get_by_id(self, field_id: uuid.UUID) -> Field | None:
         return await self.session.get(Field, field_id)
 
-    async def get_by_user(self, user_id: uuid.UUID, skip: int = 0, limit: int = 20) -> list[Field]:
+    async def version_for_user(self, user_id: uuid.UUID) -> tuple | None:
+        """
+        Versión de los campos del usuario para el ETag (los campos no se
+        modifican: alcanza con created_at). None si el usuario no existe.
+        """
+        result = await self.session.execute(
+            select(*version_columns(Field.created_at))
+            .select_from(User)
+            .outerjoin(Field, Field.user_id == User.id)
+            .where(User.id == user_id)
+            .group_by(User.id)
+        )
+        row = result.first()
+        return tuple(row) if row else None
+
+    async def version(self, field_id: uuid.UUID) -> tuple | None:
+        result = await self.session.execute(select(Field.created_at).where(Field.id == field_id))
+        created_at = result.scalar_one_or_none()
+        return (created_at,) if created_at else None
+
+    async def get_by_user(
+        self, user_id: uuid.UUID, skip: int | None = None, limit: int = 20, cursor: str | None = None,
+    ) -> list[Field]:
         result = await self.session.execute(
-            select(Field)
-            .where(Field.user_id == user_id)
+            keyset(select(Field).where(Field.user_id == user_id), self.PAGE_KEY, cursor)
             .offset(skip).limit(limit)
         )
         return list(result.scalars().all())
\ No newline at end of file
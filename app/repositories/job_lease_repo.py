@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from sqlalchemy import update, func, or_, case
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.job_lease import JobLease
+
+
+class JobLeaseRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self, name: str) -> JobLease | None:
+        return await self.session.get(JobLease, name, populate_existing=True)
+
+    async def try_acquire(self, name: str, holder: str, ttl_seconds: int) -> bool:
+        """
+        Toma o renueva el lease en una sola sentencia atómica. Solo gana si el
+        lease está libre, vencido o ya pertenece a `holder`.
+        """
+        expires_at = func.now() + timedelta(seconds=ttl_seconds)
+        stmt = pg_insert(JobLease).values(
+            name=name, holder=holder,
+            acquired_at=func.now(), heartbeat_at=func.now(), expires_at=expires_at,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[JobLease.name],
+            set_={
+                "holder": stmt.excluded.holder,
+                # Si es una renovación se conserva el momento en que se tomó
+                "acquired_at": case(
+                    (JobLease.holder == stmt.excluded.holder, JobLease.acquired_at),
+                    else_=func.now(),
+                ),
+                "heartbeat_at": func.now(),
+                "expires_at": stmt.excluded.expires_at,
+            },
+            where=or_(
+                JobLease.holder == stmt.excluded.holder,
+                JobLease.holder.is_(None),
+                JobLease.expires_at < func.now(),
+            ),
+        ).returning(JobLease.holder)
+
+        result = await self.session.execute(stmt)
+        acquired = result.scalar_one_or_none() == holder
+        await self.session.commit()
+        return acquired
+
+    async def release(self, name: str, holder: str) -> None:
+        await self.session.execute(
+            update(JobLease)
+            .where(JobLease.name == name, JobLease.holder == holder)
+            .values(holder=None, expires_at=func.now())
+        )
+        await self.session.commit()
+
+    async def mark_run(self, name: str, holder: str) -> None:
+        await self.session.execute(
+            update(JobLease)
+            .where(JobLease.name == name)
+            .values(last_run_at=func.now(), last_run_holder=holder)
+        )
+        await self.session.commit()
+
+    async def request_run(self, name: str) -> None:
+        stmt = pg_insert(JobLease).values(name=name, run_requested_at=func.now())
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[JobLease.name],
+            set_={"run_requested_at": func.now()},
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+    async def consume_run_request(self, name: str, holder: str) -> bool:
+        """Limpia el pedido de ejecución pendiente. Solo lo consume el holder vigente."""
+        result = await self.session.execute(
+            update(JobLease)
+            .where(
+                JobLease.name == name,
+                JobLease.holder == holder,
+                JobLease.run_requested_at.is_not(None),
+            )
+            .values(run_requested_at=None)
+            .returning(JobLease.name)
+        )
+        consumed = result.scalar_one_or_none() is not None
+        await self.session.commit()
+        return consumed
@@ -1,12 +1,25 @@
 import uuid
+from datetime import datetime
 
-from sqlalchemy import select
+from sqlalchemy import select, update, or_, func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.models.notification import Notification
+from app.models.notification_counter import NotificationCounter
+from app.models.user import User
+from app.pagination import keyset
+
+# Columnas de bulk_create; id, is_read, created_at y el estado de entrega
+# toman sus defaults
+_BULK_COLUMNS = ["user_id", "alert_id", "event_type", "actual_value", "threshold", "target_date", "message"]
+_COPY_COLUMNS = ["id", "is_read", *_BULK_COLUMNS]
 
 
 class NotificationRepository:
+    # Clave de paginación: de la más nueva a la más vieja
+    PAGE_KEY = (Notification.created_at, Notification.id)
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
@@ -21,26 +34,160 @@ class NotificationRepository:
         await self.session.refresh(notification)
         return notification
 
-    async def bulk_create(self, notifications_data: list[dict]) -> None:
-        notifications = [Notification(**data) for data in notifications_data]
-        self.session.add_all(notifications)
+    async def bulk_create(self, notifications_data: list[dict], method: str | None = None) -> None:
+        """
+        Inserta las notificaciones y hace commit. El método se elige por
+        cantidad de filas (o se fuerza con `method`):
+        - orm: add_all (el ORM ya agrupa los INSERT con insertmanyvalues), para lotes chicos
+        - copy: COPY del driver asyncpg (copy_records_to_table)
+        """
+        if not notifications_data:
+            return
+
+        method = method or self._bulk_method(len(notifications_data))
+        if method == "copy":
+            await self._bulk_copy(notifications_data)
+        else:
+            self.session.add_all(Notification(**data) for data in notifications_data)
         await self.session.commit()
 
+    @staticmethod
+    def _bulk_method(rows: int) -> str:
+        if rows >= settings.NOTIFICATION_BULK_COPY_THRESHOLD:
+            return "copy"
+        return "orm"
+
+    async def _bulk_copy(self, notifications_data: list[dict]) -> None:
+        # Misma conexión y transacción que la sesión: el COPY se confirma con su commit
+        connection = await self.session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            Notification.__tablename__,
+            columns=_COPY_COLUMNS,
+            records=[
+                (uuid.uuid4(), False, *(data.get(c) for c in _BULK_COLUMNS))
+                for data in notifications_data
+            ],
+        )
+
     async def get_by_user(
         self, user_id: uuid.UUID, unread_only: bool = False,
-        skip: int = 0, limit: int = 20
+        skip: int | None = None, limit: int = 20, cursor: str | None = None,
+        read_until: datetime | None = None,
     ) -> list[Notification]:
+        """`read_until` es la marca de lectura del usuario (users.notifications_read_until)."""
         query = select(Notification).where(Notification.user_id == user_id)
         if unread_only:
             query = query.where(Notification.is_read == False)
+            if read_until is not None:
+                query = query.where(Notification.created_at > read_until)
         result = await self.session.execute(
-            query.order_by(Notification.created_at.desc())
+            keyset(query, self.PAGE_KEY, cursor, descending=True)
             .offset(skip).limit(limit)
         )
         return list(result.scalars().all())
 
+    async def get_after(
+        self, user_id: uuid.UUID, position: tuple | None = None, limit: int = 100,
+    ) -> list[Notification]:
+        """Las posteriores a `position` (created_at, id), de la más vieja a la más nueva."""
+        query = select(Notification).where(Notification.user_id == user_id)
+        if position is not None:
+            query = query.where(tuple_(*self.PAGE_KEY) > tuple_(*position))
+        result = await self.session.execute(query.order_by(*self.PAGE_KEY).limit(limit))
+        return list(result.scalars().all())
+
+    async def latest_position(self, user_id: uuid.UUID) -> tuple | None:
+        """Clave (created_at, id) de la notificación más nueva del usuario."""
+        result = await self.session.execute(
+            select(*self.PAGE_KEY)
+            .where(Notification.user_id == user_id)
+            .order_by(*(column.desc() for column in self.PAGE_KEY))
+            .limit(1)
+        )
+        row = result.first()
+        return tuple(row) if row else None
+
+    async def unread_count(self, user_id: uuid.UUID) -> int | None:
+        """
+        No leídas del usuario desde notification_counters (lookup por primary
+        key, sin importar el tamaño del historial). None si el usuario no existe.
+        """
+        result = await self.session.execute(
+            select(func.coalesce(NotificationCounter.unread, 0))
+            .select_from(User)
+            .outerjoin(NotificationCounter, NotificationCounter.user_id == User.id)
+            .where(User.id == user_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def version_for_user(self, user_id: uuid.UUID) -> tuple | None:
+        """
+        Versión de las notificaciones del usuario para el ETag: el contador que
+        incrementan los triggers en cada insert, update o delete, más la marca
+        de lectura (cambia is_read en la respuesta). None si el usuario no existe.
+        """
+        result = await self.session.execute(
+            select(func.coalesce(NotificationCounter.version, 0), User.notifications_read_until)
+            .select_from(User)
+            .outerjoin(NotificationCounter, NotificationCounter.user_id == User.id)
+            .where(User.id == user_id)
+        )
+        row = result.first()
+        return tuple(row) if row else None
+
     async def mark_as_read(self, notification: Notification) -> Notification:
         notification.is_read = True
         await self.session.commit()
         await self.session.refresh(notification)
-        return notification
\ No newline at end of file
+        return notification
+
+    async def mark_all_read(self, user_id: uuid.UUID, until: datetime | None = None) -> datetime | None:
+        """
+        Mueve la marca de lectura del usuario hasta `until` (por defecto, la
+        notificación más nueva que ya existe) con un solo UPDATE, sin tocar las
+        filas de notifications. La marca nunca retrocede: GREATEST ignora el
+        NULL inicial. Devuelve la marca resultante.
+        """
+        if until is None:
+            until = (
+                select(func.max(Notification.created_at))
+                .where(Notification.user_id == user_id)
+                .scalar_subquery()
+            )
+        result = await self.session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(notifications_read_until=func.greatest(User.notifications_read_until, until))
+            .returning(User.notifications_read_until)
+            .execution_options(synchronize_session=False)
+        )
+        read_until = result.scalar_one_or_none()
+        await self.session.commit()
+        return read_until
+
+    async def claim_for_delivery(self, limit: int) -> list[tuple[Notification, str]]:
+        """
+        Bloquea hasta `limit` notificaciones pendientes de envío cuyo próximo
+        intento ya venció, junto con el teléfono del usuario. SKIP LOCKED deja
+        que varios procesos envíen en paralelo sin repetir filas; el lock se
+        libera con el commit de record_delivery.
+        """
+        result = await self.session.execute(
+            select(Notification, User.phone)
+            .join(User, User.id == Notification.user_id)
+            .where(
+                Notification.delivery_status == "pending",
+                or_(Notification.next_attempt_at.is_(None), Notification.next_attempt_at <= func.now()),
+            )
+            .order_by(Notification.created_at)
+            .limit(limit)
+            .with_for_update(of=Notification, skip_locked=True)
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def record_delivery(self, results: list[dict]) -> None:
+        """Guarda el resultado de cada envío (UPDATE por primary key) y hace commit."""
+        if results:
+            await self.session.execute(update(Notification), results)
+        await self.session.commit()
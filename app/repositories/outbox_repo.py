@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+from sqlalchemy import select, insert, update, delete, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.event_outbox import EventOutbox
+
+
+class OutboxRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add_many(self, events: list) -> None:
+        """Encola los eventos en la transacción actual. No hace commit."""
+        if not events:
+            return
+        await self.session.execute(
+            insert(EventOutbox),
+            [{"event_type": type(e).__name__, "payload": e.to_payload()} for e in events],
+        )
+
+    async def claim_batch(self, limit: int) -> list[EventOutbox]:
+        """
+        Bloquea hasta `limit` eventos pendientes. SKIP LOCKED saltea los que
+        ya tomó otro consumidor, así varios procesos drenan en paralelo. El
+        lock se libera con el commit de mark_delivered (o con el rollback si
+        el consumidor muere, y el lote vuelve a quedar pendiente). Los que
+        fallaron esperan a su next_attempt_at sin frenar a los demás.
+        """
+        result = await self.session.execute(
+            select(EventOutbox)
+            .where(
+                EventOutbox.delivered_at.is_(None),
+                or_(EventOutbox.next_attempt_at.is_(None), EventOutbox.next_attempt_at <= func.now()),
+            )
+            .order_by(EventOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list(result.scalars().all())
+
+    async def mark_failed(self, ids: list[int], error: str, base_seconds: float, max_seconds: float) -> None:
+        """
+        Deja los eventos pendientes con backoff exponencial: base * 2^(intentos
+        previos), hasta max_seconds. No hace commit: se confirma con mark_delivered.
+        """
+        if not ids:
+            return
+        delay = func.least(base_seconds * func.power(2, EventOutbox.attempts), max_seconds)
+        await self.session.execute(
+            update(EventOutbox)
+            .where(EventOutbox.id.in_(ids))
+            .values(
+                attempts=EventOutbox.attempts + 1,
+                next_attempt_at=func.now() + func.make_interval(0, 0, 0, 0, 0, 0, delay),
+                last_error=error[:500],
+            )
+        )
+
+    async def mark_delivered(self, ids: list[int]) -> None:
+        await self.session.execute(
+            update(EventOutbox)
+            .where(EventOutbox.id.in_(ids))
+            .values(delivered_at=func.now())
+        )
+        await self.session.commit()
+
+    async def prune(self, retention_seconds: int, batch_size: int) -> int:
+        """Borra en bloques los eventos entregados hace más de retention_seconds."""
+        expired = (
+            select(EventOutbox.id)
+            .where(EventOutbox.delivered_at < func.now() - timedelta(seconds=retention_seconds))
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(delete(EventOutbox).where(EventOutbox.id.in_(expired)))
+        await self.session.commit()
+        return result.rowcount
+
+    async def count_pending(self) -> int:
+        result = await self.session.execute(
+            select(func.count()).select_from(EventOutbox).where(EventOutbox.delivered_at.is_(None))
+        )
+        return result.scalar_one()
@@ -3,10 +3,14 @@ import uuid
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.etag import version_columns
 from app.models.user import User
+from app.pagination import keyset
 
 
 class UserRepository:
+    PAGE_KEY = (User.created_at, User.id)
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
@@ -20,12 +24,22 @@ class UserRepository:
     async def get_by_id(self, user_id: uuid.UUID) -> User | None:
         return await self.session.get(User, user_id)
 
-    async def get_all(self, skip: int = 0, limit: int = 20) -> list[User]:
+    async def get_all(self, skip: int | None = None, limit: int = 20, cursor: str | None = None) -> list[User]:
         result = await self.session.execute(
-            select(User).offset(skip).limit(limit)
+            keyset(select(User), self.PAGE_KEY, cursor).offset(skip).limit(limit)
         )
         return list(result.scalars().all())
 
+    async def list_version(self) -> tuple:
+        """Versión del listado para el ETag: cambia con altas, cambios y bajas."""
+        result = await self.session.execute(select(*version_columns(User.updated_at)))
+        return tuple(result.one())
+
+    async def version(self, user_id: uuid.UUID) -> tuple | None:
+        result = await self.session.execute(select(User.updated_at).where(User.id == user_id))
+        updated_at = result.scalar_one_or_none()
+        return (updated_at,) if updated_at else None
+
     async def count(self) -> int:
         result = await self.session.execute(select(func.count(User.id)))
         return result.scalar_one()
\ No newline at end of file
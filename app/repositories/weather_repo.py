@@ -4,10 +4,16 @@ from datetime import date
 from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.etag import version_columns
+from app.models.field import Field
 from app.models.weather_data import WeatherData
+from app.pagination import keyset
 
 
 class WeatherRepository:
+    # Pronósticos en orden cronológico por fecha objetivo
+    PAGE_KEY = (WeatherData.target_date, WeatherData.id)
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
@@ -35,10 +41,26 @@ class WeatherRepository:
         )
         return result.scalar_one_or_none()
 
-    async def get_by_field(self, field_id: uuid.UUID, skip: int = 0, limit: int = 20) -> list[WeatherData]:
+    async def version_for_field(self, field_id: uuid.UUID) -> tuple | None:
+        """
+        Versión de los pronósticos del campo para el ETag (solo se insertan:
+        alcanza con created_at). None si el campo no existe.
+        """
+        result = await self.session.execute(
+            select(*version_columns(WeatherData.created_at))
+            .select_from(Field)
+            .outerjoin(WeatherData, WeatherData.field_id == Field.id)
+            .where(Field.id == field_id)
+            .group_by(Field.id)
+        )
+        row = result.first()
+        return tuple(row) if row else None
+
+    async def get_by_field(
+        self, field_id: uuid.UUID, skip: int | None = None, limit: int = 20, cursor: str | None = None,
+    ) -> list[WeatherData]:
         result = await self.session.execute(
-            select(WeatherData)
-            .where(WeatherData.field_id == field_id)
+            keyset(select(WeatherData).where(WeatherData.field_id == field_id), self.PAGE_KEY, cursor)
             .offset(skip).limit(limit)
         )
         return list(result.scalars().all())
\ No newline at end of file
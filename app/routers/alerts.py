@@ -1,9 +1,12 @@
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_session
+from app.etag import not_modified
+from app.pagination import PageParams
+from app.repositories.alert_repo import AlertRepository
 from app.repositories.field_repo import FieldRepository
 from app.repositories.user_repo import UserRepository
 from app.services.alert_service import AlertService
@@ -31,21 +34,33 @@ async def create_alert(data: AlertCreate, session: AsyncSession = Depends(get_se
 @router.get("/user/{user_id}", response_model=list[AlertResponse])
 async def get_user_alerts(
     user_id: uuid.UUID,
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
     session: AsyncSession = Depends(get_session),
 ):
-    user_repo = UserRepository(session)
-    user = await user_repo.get_by_id(user_id)
-    if not user:
+    version = await AlertRepository(session).version_for_user(user_id)
+    if version is None:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    if cached := not_modified(request, response, version):
+        return cached
 
     service = AlertService(session)
-    return await service.get_user_alerts(user_id, skip=skip, limit=limit)
+    rows = await service.get_user_alerts(user_id, skip=page.skip, limit=page.fetch_limit, cursor=page.cursor)
+    return page.respond(response, rows, AlertRepository.PAGE_KEY)
 
 
 @router.get("/{alert_id}", response_model=AlertResponse)
-async def get_alert(alert_id: uuid.UUID, session: AsyncSession = Depends(get_session)):
+async def get_alert(
+    alert_id: uuid.UUID, request: Request, response: Response,
+    session: AsyncSession = Depends(get_session),
+):
+    version = await AlertRepository(session).version(alert_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Alerta no encontrada")
+    if cached := not_modified(request, response, version):
+        return cached
+
     service = AlertService(session)
     alert = await service.get_alert(alert_id)
     if not alert:
@@ -1,9 +1,11 @@
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_session
+from app.etag import not_modified
+from app.pagination import PageParams
 from app.repositories.field_repo import FieldRepository
 from app.repositories.user_repo import UserRepository
 from app.schemas.field import FieldCreate, FieldResponse
@@ -28,22 +30,34 @@ async def create_field(data: FieldCreate, session: AsyncSession = Depends(get_se
 @router.get("/user/{user_id}", response_model=list[FieldResponse])
 async def get_user_fields(
     user_id: uuid.UUID,
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
     session: AsyncSession = Depends(get_session),
 ):
-    user_repo = UserRepository(session)
-    user = await user_repo.get_by_id(user_id)
-    if not user:
+    repo = FieldRepository(session)
+    version = await repo.version_for_user(user_id)
+    if version is None:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    if cached := not_modified(request, response, version):
+        return cached
 
-    repo = FieldRepository(session)
-    return await repo.get_by_user(user_id, skip=skip, limit=limit)
+    rows = await repo.get_by_user(user_id, skip=page.skip, limit=page.fetch_limit, cursor=page.cursor)
+    return page.respond(response, rows, repo.PAGE_KEY)
 
 
 @router.get("/{field_id}", response_model=FieldResponse)
-async def get_field(field_id: uuid.UUID, session: AsyncSession = Depends(get_session)):
+async def get_field(
+    field_id: uuid.UUID, request: Request, response: Response,
+    session: AsyncSession = Depends(get_session),
+):
     repo = FieldRepository(session)
+    version = await repo.version(field_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Campo no encontrado")
+    if cached := not_modified(request, response, version):
+        return cached
+
     field = await repo.get_by_id(field_id)
     if not field:
         raise HTTPException(status_code=404, detail="Campo no encontrado")
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import get_session
+from app.jobs import evaluate_alerts
+from app.jobs.leader import evaluation_leader
+from app.repositories.job_lease_repo import JobLeaseRepository
+from app.schemas.job import JobStatusResponse, JobRunResponse
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get("/evaluation/status", response_model=JobStatusResponse)
+async def get_evaluation_job_status(session: AsyncSession = Depends(get_session)):
+    repo = JobLeaseRepository(session)
+    lease = await repo.get(evaluation_leader.name)
+    return JobStatusResponse(
+        worker=evaluation_leader.holder,
+        is_leader=evaluation_leader.is_leader,
+        lease=lease,
+        running=bool(evaluate_alerts.evaluation_scheduler and evaluate_alerts.evaluation_scheduler.is_running),
+    )
+
+
+@router.post("/evaluation/run", response_model=JobRunResponse, status_code=202)
+async def run_evaluation_job_now(session: AsyncSession = Depends(get_session)):
+    scheduler = evaluate_alerts.evaluation_scheduler
+    if scheduler and (not settings.JOB_LEADER_ELECTION or evaluation_leader.is_leader):
+        status = "triggered" if scheduler.trigger() else "already_running"
+    elif settings.JOB_LEADER_ELECTION:
+        # El líder puede ser otro proceso: se deja el pedido en el lease y lo
+        # toma en su próximo heartbeat (a lo sumo TTL/3 segundos)
+        await JobLeaseRepository(session).request_run(evaluation_leader.name)
+        status = "requested"
+    else:
+        raise HTTPException(status_code=409, detail="El job de evaluación no corre en este proceso")
+
+    return JobRunResponse(status=status, worker=evaluation_leader.holder)
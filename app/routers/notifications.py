@@ -1,13 +1,20 @@
 import uuid
+from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_session
+from app.etag import not_modified
 from app.models.notification import Notification
+from app.pagination import PageParams, decode_cursor
 from app.repositories.notification_repo import NotificationRepository
 from app.repositories.user_repo import UserRepository
-from app.schemas.notification import NotificationResponse
+from app.schemas.notification import (
+    NotificationReadAllResponse, NotificationResponse, NotificationUnreadCountResponse,
+)
+from app.services.notification_stream import NotificationStream
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
@@ -15,18 +22,84 @@ router = APIRouter(prefix="/notifications", tags=["Notifications"])
 @router.get("/user/{user_id}", response_model=list[NotificationResponse])
 async def get_user_notifications(
     user_id: uuid.UUID,
+    request: Request,
+    response: Response,
     unread_only: bool = Query(False),
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
+    page: PageParams = Depends(),
     session: AsyncSession = Depends(get_session),
 ):
+    repo = NotificationRepository(session)
+    version = await repo.version_for_user(user_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    if cached := not_modified(request, response, version):
+        return cached
+
+    _, read_until = version
+    rows = await repo.get_by_user(
+        user_id, unread_only=unread_only, skip=page.skip, limit=page.fetch_limit, cursor=page.cursor,
+        read_until=read_until,
+    )
+    rows = page.respond(response, rows, repo.PAGE_KEY)
+    # Las anteriores a la marca de lectura se informan como leídas aunque su is_read siga en false
+    return [
+        NotificationResponse.model_validate(n).model_copy(update={"is_read": True})
+        if read_until is not None and n.created_at <= read_until else n
+        for n in rows
+    ]
+
+
+@router.get("/user/{user_id}/unread-count", response_model=NotificationUnreadCountResponse)
+async def get_unread_count(
+    user_id: uuid.UUID,
+    session: AsyncSession = Depends(get_session),
+):
+    unread = await NotificationRepository(session).unread_count(user_id)
+    if unread is None:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    return NotificationUnreadCountResponse(user_id=user_id, unread=unread)
+
+
+@router.get("/user/{user_id}/stream")
+async def stream_user_notifications(
+    user_id: uuid.UUID,
+    cursor: str | None = Query(None, description="Seguir después de esta notificación (id de un evento)"),
+    last_event_id: str | None = Header(None, description="Lo envía EventSource al reconectar"),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Server-Sent Events con las notificaciones nuevas del usuario. Al
+    reconectar, Last-Event-ID (o `cursor`) retoma después del último evento
+    recibido; sin ninguno de los dos, el stream empieza desde ahora.
+    """
     user_repo = UserRepository(session)
-    user = await user_repo.get_by_id(user_id)
-    if not user:
+    if not await user_repo.get_by_id(user_id):
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
-    repo = NotificationRepository(session)
-    return await repo.get_by_user(user_id, unread_only=unread_only, skip=skip, limit=limit)
+    resume = last_event_id or cursor
+    position = decode_cursor(resume, NotificationRepository.PAGE_KEY) if resume else None
+    return StreamingResponse(
+        NotificationStream(user_id, position).events(),
+        media_type="text/event-stream",
+        # Sin buffering en proxies (nginx) para que cada evento salga al instante
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/user/{user_id}/read-all", response_model=NotificationReadAllResponse)
+async def mark_all_notifications_read(
+    user_id: uuid.UUID,
+    until: datetime | None = Query(
+        None, description="created_at de la última notificación vista; por defecto, la más nueva",
+    ),
+    session: AsyncSession = Depends(get_session),
+):
+    user_repo = UserRepository(session)
+    if not await user_repo.get_by_id(user_id):
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+
+    read_until = await NotificationRepository(session).mark_all_read(user_id, until)
+    return NotificationReadAllResponse(user_id=user_id, notifications_read_until=read_until)
 
 
 @router.patch("/{notification_id}/read", response_model=NotificationResponse)
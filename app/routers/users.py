@@ -1,10 +1,12 @@
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_session
+from app.etag import not_modified
+from app.pagination import PageParams
 from app.repositories.user_repo import UserRepository
 from app.schemas.user import UserCreate, UserResponse
 
@@ -22,17 +24,31 @@ async def create_user(data: UserCreate, session: AsyncSession = Depends(get_sess
 
 @router.get("/", response_model=list[UserResponse])
 async def get_users(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
     session: AsyncSession = Depends(get_session),
 ):
     repo = UserRepository(session)
-    return await repo.get_all(skip=skip, limit=limit)
+    if cached := not_modified(request, response, await repo.list_version()):
+        return cached
+
+    rows = await repo.get_all(skip=page.skip, limit=page.fetch_limit, cursor=page.cursor)
+    return page.respond(response, rows, repo.PAGE_KEY)
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user(user_id: uuid.UUID, session: AsyncSession = Depends(get_session)):
+async def get_user(
+    user_id: uuid.UUID, request: Request, response: Response,
+    session: AsyncSession = Depends(get_session),
+):
     repo = UserRepository(session)
+    version = await repo.version(user_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    if cached := not_modified(request, response, version):
+        return cached
+
     user = await repo.get_by_id(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
@@ -1,12 +1,20 @@
+import logging
+import time
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_session
+from app.etag import not_modified
+from app.pagination import PageParams
 from app.repositories.field_repo import FieldRepository
 from app.repositories.weather_repo import WeatherRepository
+from app.metrics import metrics
 from app.schemas.weather_data import WeatherDataCreate, WeatherDataResponse
+from app.services.evaluation_service import EvaluationService
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/weather", tags=["Weather Data"])
 
@@ -15,29 +23,53 @@ router = APIRouter(prefix="/weather", tags=["Weather Data"])
 async def create_weather_data(
     data: WeatherDataCreate, session: AsyncSession = Depends(get_session),
 ):
+    received_at = time.perf_counter()
+
     field_repo = FieldRepository(session)
     field = await field_repo.get_by_id(data.field_id)
     if not field:
         raise HTTPException(status_code=404, detail="Campo no encontrado")
 
     repo = WeatherRepository(session)
-    return await repo.create(
+    weather = await repo.create(
         field_id=data.field_id, event_type=data.event_type,
         probability=data.probability, target_date=data.target_date,
     )
 
+    # Evaluación inmediata de las alertas afectadas; el job periódico queda como red de seguridad
+    try:
+        service = EvaluationService(session)
+        triggered = await service.evaluate_forecast(weather)
+        elapsed = time.perf_counter() - received_at
+        metrics.observe("ingest_evaluation_seconds", elapsed)
+        if triggered:
+            # evaluate_forecast vuelve con las notificaciones ya insertadas (en
+            # modo cola, después de esperar al bus); con outbox las crea luego
+            # el dispatcher, así que lo medido es hasta el commit en event_outbox
+            metrics.observe(
+                "ingest_to_outbox_seconds" if service.use_outbox else "ingest_to_notification_seconds",
+                elapsed,
+            )
+    except Exception as e:
+        logger.error(f"❌ Error en evaluación por ingesta: {e}")
+
+    return weather
+
 
 @router.get("/field/{field_id}", response_model=list[WeatherDataResponse])
 async def get_field_weather(
     field_id: uuid.UUID,
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
     session: AsyncSession = Depends(get_session),
 ):
-    field_repo = FieldRepository(session)
-    field = await field_repo.get_by_id(field_id)
-    if not field:
+    repo = WeatherRepository(session)
+    version = await repo.version_for_field(field_id)
+    if version is None:
         raise HTTPException(status_code=404, detail="Campo no encontrado")
+    if cached := not_modified(request, response, version):
+        return cached
 
-    repo = WeatherRepository(session)
-    return await repo.get_by_field(field_id, skip=skip, limit=limit)
\ No newline at end of file
+    rows = await repo.get_by_field(field_id, skip=page.skip, limit=page.fetch_limit, cursor=page.cursor)
+    return page.respond(response, rows, repo.PAGE_KEY)
\ No newline at end of file
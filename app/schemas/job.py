@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class JobLeaseResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    name: str
+    holder: str | None
+    acquired_at: datetime | None
+    heartbeat_at: datetime | None
+    expires_at: datetime | None
+    last_run_at: datetime | None
+    last_run_holder: str | None
+    run_requested_at: datetime | None
+
+
+class JobStatusResponse(BaseModel):
+    worker: str
+    is_leader: bool
+    lease: JobLeaseResponse | None
+    running: bool = False
+
+
+class JobRunResponse(BaseModel):
+    # triggered: se ejecuta ya en este proceso; already_running: hay una en curso;
+    # requested: quedó pedido para el líder
+    status: str
+    worker: str
@@ -1,7 +1,7 @@
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class NotificationResponse(BaseModel):
@@ -10,6 +10,24 @@ class NotificationResponse(BaseModel):
     id: uuid.UUID
     user_id: uuid.UUID
     alert_id: uuid.UUID
-    message: str
+    # Se renderiza desde las columnas estructuradas (Notification.text)
+    message: str = Field(validation_alias="text", serialization_alias="message")
+    event_type: str | None = None
+    actual_value: float | None = None
+    threshold: float | None = None
+    target_date: date | None = None
     is_read: bool
-    created_at: datetime
\ No newline at end of file
+    created_at: datetime
+    delivery_status: str
+    delivered_at: datetime | None = None
+
+
+class NotificationReadAllResponse(BaseModel):
+    user_id: uuid.UUID
+    # None si el usuario todavía no tiene notificaciones
+    notifications_read_until: datetime | None = None
+
+
+class NotificationUnreadCountResponse(BaseModel):
+    user_id: uuid.UUID
+    unread: int
@@ -15,4 +15,5 @@ class UserResponse(BaseModel):
     id: uuid.UUID
     name: str
     phone: str
-    created_at: datetime
\ No newline at end of file
+    created_at: datetime
+    notifications_read_until: datetime | None = None
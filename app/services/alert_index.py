@@ -0,0 +1,135 @@
+import asyncio
+import bisect
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.alert import Alert
+from app.repositories.alert_repo import AlertRepository
+
+
+@dataclass(frozen=True)
+class IndexedAlert:
+    alert_id: uuid.UUID
+    user_id: uuid.UUID
+    field_id: uuid.UUID
+    event_type: str
+    threshold: float
+
+
+class ActiveAlertIndex:
+    """
+    Índice en memoria de las alertas activas: (field_id, event_type) -> umbrales
+    ordenados. Para una probabilidad dada, las alertas con threshold <= probability
+    son un prefijo del arreglo y se obtienen con un bisect en O(log n).
+
+    Se mantiene al día con los hooks de AlertService; los cambios hechos por
+    otros procesos se incorporan con refresh(), que recarga si el último
+    updated_at de alerts avanzó desde la carga. Las bajas no mueven ese
+    máximo: quien use el índice debe confirmar los aciertos contra la base.
+    """
+
+    def __init__(self):
+        self._thresholds: dict[tuple[uuid.UUID, str], list[float]] = {}
+        self._alerts: dict[tuple[uuid.UUID, str], list[IndexedAlert]] = {}
+        self._by_id: dict[uuid.UUID, IndexedAlert] = {}
+        self.loaded = False
+        # max(alerts.updated_at) leído antes de la última carga
+        self.loaded_until: datetime | None = None
+        self._reload_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    async def load(self, session: AsyncSession) -> "ActiveAlertIndex":
+        repo = AlertRepository(session)
+        # Se lee antes que las alertas: un cambio en el medio fuerza otra recarga
+        loaded_until = await repo.last_change()
+        alerts = await repo.get_active_alerts()
+        self.rebuild(alerts)
+        self.loaded_until = loaded_until
+        return self
+
+    async def refresh(self, session: AsyncSession) -> bool:
+        """Recarga el índice si hubo altas o modificaciones posteriores a la última carga."""
+        last_change = await AlertRepository(session).last_change()
+        if not self._is_stale(last_change):
+            return False
+        async with self._reload_lock:
+            # Otra corrida pudo recargar mientras se esperaba el lock
+            if not self._is_stale(last_change):
+                return False
+            await self.load(session)
+        return True
+
+    def _is_stale(self, last_change: datetime | None) -> bool:
+        if last_change is None:
+            return False
+        return self.loaded_until is None or last_change > self.loaded_until
+
+    def rebuild(self, alerts: list[Alert]) -> None:
+        entries = sorted(
+            (self._entry(alert) for alert in alerts if alert.is_active),
+            key=lambda e: e.threshold,
+        )
+        self._thresholds = {}
+        self._alerts = {}
+        self._by_id = {}
+        for entry in entries:
+            key = (entry.field_id, entry.event_type)
+            self._thresholds.setdefault(key, []).append(entry.threshold)
+            self._alerts.setdefault(key, []).append(entry)
+            self._by_id[entry.alert_id] = entry
+        self.loaded = True
+
+    def upsert(self, alert: Alert) -> None:
+        self.remove(alert.id)
+        if not alert.is_active:
+            return
+
+        entry = self._entry(alert)
+        key = (entry.field_id, entry.event_type)
+        thresholds = self._thresholds.setdefault(key, [])
+        position = bisect.bisect_right(thresholds, entry.threshold)
+        thresholds.insert(position, entry.threshold)
+        self._alerts.setdefault(key, []).insert(position, entry)
+        self._by_id[entry.alert_id] = entry
+
+    def remove(self, alert_id: uuid.UUID) -> None:
+        entry = self._by_id.pop(alert_id, None)
+        if entry is None:
+            return
+
+        key = (entry.field_id, entry.event_type)
+        thresholds = self._thresholds[key]
+        alerts = self._alerts[key]
+        position = bisect.bisect_left(thresholds, entry.threshold)
+        while alerts[position].alert_id != alert_id:
+            position += 1
+        del thresholds[position]
+        del alerts[position]
+        if not thresholds:
+            del self._thresholds[key]
+            del self._alerts[key]
+
+    def match(self, field_id: uuid.UUID, event_type: str, probability: float) -> list[IndexedAlert]:
+        key = (field_id, event_type)
+        thresholds = self._thresholds.get(key)
+        if not thresholds:
+            return []
+        return self._alerts[key][:bisect.bisect_right(thresholds, probability)]
+
+    @staticmethod
+    def _entry(alert: Alert) -> IndexedAlert:
+        return IndexedAlert(
+            alert_id=alert.id,
+            user_id=alert.user_id,
+            field_id=alert.field_id,
+            event_type=alert.event_type,
+            threshold=alert.threshold,
+        )
+
+
+active_alert_index = ActiveAlertIndex()
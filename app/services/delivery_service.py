@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.config import settings
+from app.database import async_session
+from app.metrics import metrics
+from app.models.notification import Notification
+from app.repositories.notification_repo import NotificationRepository
+from app.services.rate_limiter import TokenBucket
+from app.services.whatsapp_client import DeliveryError, WhatsAppClient
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationDeliveryService:
+    """
+    Envía por WhatsApp las notificaciones pendientes.
+
+    - Toma lotes con FOR UPDATE SKIP LOCKED y los envía en paralelo, con
+      hasta `concurrency` requests en vuelo sobre el pool del cliente.
+    - Cada request pasa antes por el token bucket del proveedor.
+    - Las fallas transitorias se reintentan con backoff exponencial
+      (next_attempt_at); al agotar max_attempts, o ante un error permanente,
+      la notificación queda en `failed` con el último error.
+
+    El token bucket es por proceso: con varios procesos enviando, el límite
+    del proveedor se reparte entre ellos.
+    """
+
+    def __init__(
+        self, client: WhatsAppClient, rate_limiter: TokenBucket | None = None,
+        batch_size: int | None = None, concurrency: int | None = None,
+        max_attempts: int | None = None, retry_base_seconds: float | None = None,
+        poll_interval: float | None = None,
+    ):
+        self.client = client
+        self.rate_limiter = rate_limiter or TokenBucket(
+            settings.WHATSAPP_RATE_LIMIT_PER_SECOND, settings.WHATSAPP_RATE_LIMIT_BURST,
+        )
+        self.batch_size = batch_size or settings.DELIVERY_BATCH_SIZE
+        self.concurrency = concurrency or settings.DELIVERY_CONCURRENCY
+        self.max_attempts = max_attempts or settings.DELIVERY_MAX_ATTEMPTS
+        self.retry_base_seconds = (
+            settings.DELIVERY_RETRY_BASE_SECONDS if retry_base_seconds is None else retry_base_seconds
+        )
+        self.poll_interval = poll_interval or settings.DELIVERY_POLL_INTERVAL_SECONDS
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def deliver_once(self) -> int:
+        async with async_session() as session:
+            repo = NotificationRepository(session)
+            batch = await repo.claim_for_delivery(self.batch_size)
+            if not batch:
+                return 0
+
+            started = time.perf_counter()
+            results = await asyncio.gather(*(self._send(n, phone) for n, phone in batch))
+            await repo.record_delivery(results)
+
+        metrics.observe("delivery_batch_seconds", time.perf_counter() - started)
+        return len(batch)
+
+    async def _send(self, notification: Notification, phone: str) -> dict:
+        attempts = notification.delivery_attempts + 1
+        async with self._semaphore:
+            waited = await self.rate_limiter.acquire()
+            metrics.observe("delivery_rate_limit_wait_seconds", waited)
+            started = time.perf_counter()
+            try:
+                message_id = await self.client.send(phone, notification.text)
+            except DeliveryError as e:
+                return self._failure(notification, attempts, e)
+            except Exception as e:
+                # Un error inesperado no puede tirar el gather: el resto del
+                # lote ya salió y hay que registrarlo igual
+                logger.exception(f"❌ Error inesperado enviando la notificación {notification.id}")
+                return self._failure(
+                    notification, attempts, DeliveryError(f"{type(e).__name__}: {e}", retryable=True),
+                )
+            finally:
+                metrics.observe("delivery_send_seconds", time.perf_counter() - started)
+
+        metrics.inc("delivery_sent_total")
+        return {
+            "id": notification.id,
+            "delivery_status": "sent",
+            "delivery_attempts": attempts,
+            "next_attempt_at": None,
+            "delivered_at": datetime.now(timezone.utc),
+            "provider_message_id": message_id,
+            "last_error": None,
+        }
+
+    def _failure(self, notification: Notification, attempts: int, error: DeliveryError) -> dict:
+        result = {
+            "id": notification.id,
+            "delivery_status": "failed",
+            "delivery_attempts": attempts,
+            "next_attempt_at": None,
+            "delivered_at": None,
+            "provider_message_id": None,
+            "last_error": str(error)[:500],
+        }
+        if error.retryable and attempts < self.max_attempts:
+            delay = max(self.retry_base_seconds * 2 ** (attempts - 1), error.retry_after or 0)
+            result["delivery_status"] = "pending"
+            result["next_attempt_at"] = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            metrics.inc("delivery_retries_total")
+        else:
+            logger.warning(f"⚠️ Notificación {notification.id} no entregada tras {attempts} intentos: {error}")
+            metrics.inc("delivery_failed_total")
+        return result
+
+    async def run_forever(self) -> None:
+        logger.info(
+            f"📲 Envío de notificaciones por WhatsApp iniciado "
+            f"(lotes de {self.batch_size}, concurrencia {self.concurrency})"
+        )
+        while True:
+            try:
+                delivered = await self.deliver_once()
+            except Exception as e:
+                delivered = 0
+                logger.error(f"❌ Error enviando notificaciones: {e}")
+
+            # Lote completo: probablemente quedan más, se sigue sin esperar
+            if delivered < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+
+async def run_delivery_job() -> None:
+    async with WhatsAppClient() as client:
+        await NotificationDeliveryService(client).run_forever()
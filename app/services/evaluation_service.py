@@ -1,30 +1,200 @@
+import asyncio
 import logging
-from datetime import date, timedelta
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
 
-from sqlalchemy import select, and_
+from sqlalchemy import (
+    select, and_, or_, false, func, cast, literal, Integer, BigInteger, Text,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.events.event_bus import event_bus
-from app.events.events import AlertTriggeredEvent
-from app.events.handlers.notification_handler import flush_notifications
+from app.config import settings
+from app.database import async_session
+from app.events.event_bus import event_bus, QUEUE
+from app.events.events import AlertTriggeredEvent, EvaluationSummaryEvent
+from app.events.handlers.notification_handler import flush_notifications, run_notifications
 from app.models.alert import Alert
+from app.models.alert_trigger import AlertTrigger
+from app.models.evaluation_state import EvaluationState
+from app.models.notification import Notification
 from app.models.weather_data import WeatherData
+from app.repositories.evaluation_state_repo import EvaluationStateRepository
+from app.repositories.notification_repo import NotificationRepository
+from app.repositories.outbox_repo import OutboxRepository
+from app.services.alert_index import active_alert_index
+from app.services.notification_digest import OFF, build_notification_rows, digest_mode
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class EvaluationStats:
+    triggered: int = 0
+    batches: int = 0
+    peak_batch_size: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.triggered / self.elapsed_seconds
+
+
 class EvaluationService:
-    def __init__(self, session: AsyncSession):
+    STATE_NAME = "evaluate_alerts"
+
+    def __init__(
+        self, session: AsyncSession, batch_size: int | None = None,
+        engine: str | None = None, partitions: int | None = None,
+    ):
         self.session = session
+        self.batch_size = batch_size or settings.EVALUATION_BATCH_SIZE
+        self.engine = engine or settings.EVALUATION_ENGINE
+        self.partitions = partitions or settings.EVALUATION_PARTITIONS
+        self.max_concurrency = settings.EVALUATION_MAX_CONCURRENCY
+        # Con "outbox" los disparos se escriben en event_outbox dentro de la
+        # transacción de la evaluación en lugar de emitirse en memoria
+        self.use_outbox = settings.EVENT_DELIVERY == "outbox"
+        # Con digest las notificaciones de una corrida se juntan en un buffer
+        # propio y se insertan en un solo flush al final, para agrupar todos
+        # los disparos de cada usuario
+        self.digest = digest_mode()
+        self.last_stats: EvaluationStats | None = None
 
     async def evaluate_all(self):
         logger.info("Iniciando evaluación de alertas...")
+        triggered = await self._evaluate()
+        if self.use_outbox:
+            await self.session.commit()
+        return triggered
+
+    async def evaluate_forecast(self, weather: WeatherData) -> int:
+        """
+        Evaluación en el momento de la ingesta: solo las alertas del
+        (field_id, event_type) del pronóstico recién guardado. Usa el índice
+        en memoria si está cargado y, si no, una consulta acotada.
+        """
+        today = date.today()
+        if not today <= weather.target_date < today + timedelta(days=7):
+            return 0
+
+        query = select(
+            Alert.id, Alert.user_id, Alert.field_id, Alert.event_type, Alert.threshold,
+        ).where(Alert.is_active == True, Alert.threshold <= weather.probability)
+        if active_alert_index.loaded:
+            await active_alert_index.refresh(self.session)
+            matches = active_alert_index.match(weather.field_id, weather.event_type, weather.probability)
+            # El índice es local al proceso: los aciertos se confirman por PK
+            # en esta transacción, por si otro proceso borró o desactivó la alerta
+            query = query.where(Alert.id.in_([m.alert_id for m in matches])) if matches else None
+        else:
+            query = query.where(
+                Alert.field_id == weather.field_id,
+                Alert.event_type == weather.event_type,
+            )
+        alerts = (await self.session.execute(query)).all() if query is not None else []
+
+        if alerts:
+            with self._notification_scope():
+                await self._publish(self.session, [
+                    AlertTriggeredEvent(
+                        alert_id=alert_id,
+                        user_id=user_id,
+                        field_id=field_id,
+                        event_type=event_type,
+                        threshold=threshold,
+                        actual_value=weather.probability,
+                        target_date=weather.target_date,
+                    )
+                    for alert_id, user_id, field_id, event_type, threshold in alerts
+                ])
+                if self.use_outbox:
+                    await self.session.commit()
+                await self._flush()
+        logger.info(f"Evaluación por ingesta: {len(alerts)} alertas disparadas")
+        return len(alerts)
+
+    async def evaluate_incremental(self):
+        """
+        Evalúa solo los pares alerta/pronóstico que cambiaron desde el último
+        watermark persistido. Si nada cambió, el tick se saltea con una sola
+        consulta. Cada EVALUATION_RECONCILE_INTERVAL_SECONDS (y al cambiar de
+        día, cuando entra una nueva fecha a la ventana) se hace una pasada
+        completa para garantizar consistencia.
+        """
+        state_repo = EvaluationStateRepository(self.session)
+        state = await state_repo.get_or_create(self.STATE_NAME)
+        weather_hi, alert_hi = await state_repo.get_latest_changes()
+        now = datetime.now(timezone.utc)
+
+        if self._needs_full_reconcile(state, now):
+            logger.info("Iniciando evaluación completa (reconciliación)...")
+            triggered = await self._evaluate(
+                WeatherData.created_at <= weather_hi if weather_hi else None,
+            )
+            state.last_full_run_at = now
+        elif not self._has_changes(state, weather_hi, alert_hi):
+            logger.info("Sin cambios desde la última evaluación, se saltea el tick")
+            return 0
+        else:
+            logger.info("Iniciando evaluación incremental...")
+            triggered = await self._evaluate(or_(
+                self._changed_between(WeatherData.created_at, state.weather_watermark, weather_hi),
+                self._changed_between(Alert.updated_at, state.alert_watermark, alert_hi),
+            ))
 
+        state.weather_watermark = weather_hi or state.weather_watermark
+        state.alert_watermark = alert_hi or state.alert_watermark
+        await state_repo.save(state)
+        return triggered
+
+    @staticmethod
+    def _needs_full_reconcile(state: EvaluationState, now: datetime) -> bool:
+        if state.last_full_run_at is None:
+            return True
+        if state.last_full_run_at.astimezone().date() != date.today():
+            return True
+        elapsed = (now - state.last_full_run_at).total_seconds()
+        return elapsed >= settings.EVALUATION_RECONCILE_INTERVAL_SECONDS
+
+    @staticmethod
+    def _has_changes(state: EvaluationState, weather_hi: datetime | None, alert_hi: datetime | None) -> bool:
+        weather_changed = weather_hi is not None and (
+            state.weather_watermark is None or weather_hi > state.weather_watermark
+        )
+        alert_changed = alert_hi is not None and (
+            state.alert_watermark is None or alert_hi > state.alert_watermark
+        )
+        return weather_changed or alert_changed
+
+    @staticmethod
+    def _changed_between(column, low: datetime | None, high: datetime | None):
+        if high is None:
+            return false()
+        if low is None:
+            return column <= high
+        return and_(column > low, column <= high)
+
+    def _build_query(self, *conditions, extra_columns=()):
         today = date.today()
         end_date = today + timedelta(days=7)
 
-        query = (
-            select(Alert, WeatherData)
+        # Solo las columnas necesarias para el evento: evita hidratar objetos ORM
+        return (
+            select(
+                Alert.id,
+                Alert.user_id,
+                Alert.field_id,
+                Alert.event_type,
+                Alert.threshold,
+                WeatherData.probability,
+                WeatherData.target_date,
+                *extra_columns,
+            )
             .join(
                 WeatherData,
                 and_(
@@ -35,29 +205,396 @@ class EvaluationService:
                     WeatherData.target_date < end_date,
                 ),
             )
-            .where(Alert.is_active == True)
+            .where(Alert.is_active == True, *[c for c in conditions if c is not None])
+        )
+
+    async def _evaluate(self, *conditions):
+        if self.engine == "sql":
+            return await self._evaluate_pushdown(*conditions)
+        if self.engine == "numpy":
+            return await self._evaluate_vectorized(*conditions)
+        with self._notification_scope():
+            if self.partitions > 1:
+                return await self._evaluate_parallel(*conditions)
+            return await self._evaluate_stream(*conditions)
+
+    def _notification_scope(self):
+        # Con digest la corrida usa su propio buffer (ver run_notifications);
+        # con outbox las notificaciones las inserta el dispatcher
+        if self.digest != OFF and not self.use_outbox:
+            return run_notifications()
+        return nullcontext()
+
+    async def _evaluate_stream(self, *conditions):
+        started = time.perf_counter()
+        stats = await self._stream(
+            self.session, self._build_query(*conditions), flush_per_batch=self.digest == OFF,
+        )
+        if event_bus.mode == QUEUE or self.digest != OFF:
+            # Los flush por lote solo insertan lo que los workers ya procesaron
+            await self._flush()
+        stats.elapsed_seconds = time.perf_counter() - started
+        self.last_stats = stats
+
+        logger.info(
+            f"Evaluación finalizada. Alertas disparadas: {stats.triggered} | "
+            f"Lotes: {stats.batches} (pico: {stats.peak_batch_size} filas) | "
+            f"{stats.rows_per_second:.0f} filas/s"
+        )
+        return stats.triggered
+
+    async def _evaluate_parallel(self, *conditions):
+        """
+        Divide las alertas activas en EVALUATION_PARTITIONS particiones por hash
+        de field_id. Cada partición corre en su propia sesión (y conexión del
+        pool), con a lo sumo EVALUATION_MAX_CONCURRENCY en simultáneo, y todas
+        las notificaciones se insertan en un único flush al final.
+        """
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_partition(partition: int) -> EvaluationStats:
+            async with semaphore:
+                async with async_session() as session:
+                    query = self._build_query(*conditions, self._partition_filter(partition))
+                    stats = await self._stream(session, query, flush_per_batch=False)
+                    if self.use_outbox:
+                        await session.commit()
+                    return stats
+
+        results = await asyncio.gather(*(run_partition(i) for i in range(self.partitions)))
+        await self._flush()
+
+        stats = EvaluationStats(
+            triggered=sum(r.triggered for r in results),
+            batches=sum(r.batches for r in results),
+            peak_batch_size=max((r.peak_batch_size for r in results), default=0),
+            elapsed_seconds=time.perf_counter() - started,
         )
+        self.last_stats = stats
+
+        logger.info(
+            f"Evaluación paralela finalizada ({self.partitions} particiones). "
+            f"Alertas disparadas: {stats.triggered} | Lotes: {stats.batches} | "
+            f"{stats.rows_per_second:.0f} filas/s"
+        )
+        return stats.triggered
+
+    def _partition_filter(self, partition: int):
+        # hashtext devuelve int4 con signo: se corre a positivo en bigint antes del módulo
+        bucket = func.mod(
+            cast(func.hashtext(cast(Alert.field_id, Text)), BigInteger) + 2147483648,
+            self.partitions,
+        )
+        return bucket == partition
+
+    async def _publish(self, session: AsyncSession, events: list[AlertTriggeredEvent]):
+        if self.use_outbox:
+            await OutboxRepository(session).add_many(events)
+        else:
+            await event_bus.emit_many(events)
+
+    async def _flush(self):
+        # Con outbox las notificaciones las inserta el dispatcher
+        if self.use_outbox:
+            return 0
+        # En modo cola los handlers corren en los workers del bus: antes de
+        # insertar se espera a que procesen todo lo emitido
+        if event_bus.mode == QUEUE:
+            await event_bus.join()
+        return await flush_notifications()
 
-        result = await self.session.execute(query)
-        rows = result.all()
+    async def _stream(self, session: AsyncSession, query, flush_per_batch: bool) -> EvaluationStats:
+        stats = EvaluationStats()
 
-        triggered = 0
-        for alert, weather in rows:
-            await event_bus.emit(
+        # Cursor del lado del servidor: se leen y procesan lotes de batch_size filas
+        result = await session.stream(query.execution_options(yield_per=self.batch_size))
+        async for batch in result.partitions():
+            # Un solo emit por lote: los handlers batch reciben la lista completa
+            await self._publish(session, [
                 AlertTriggeredEvent(
-                    alert_id=alert.id,
-                    user_id=alert.user_id,
-                    field_id=alert.field_id,
-                    event_type=alert.event_type,
-                    threshold=alert.threshold,
-                    actual_value=weather.probability,
-                    target_date=weather.target_date,
+                    alert_id=row.id,
+                    user_id=row.user_id,
+                    field_id=row.field_id,
+                    event_type=row.event_type,
+                    threshold=row.threshold,
+                    actual_value=row.probability,
+                    target_date=row.target_date,
                 )
+                for row in batch
+            ])
+
+            # Bulk insert de las notificaciones del lote
+            if flush_per_batch and not self.use_outbox:
+                await flush_notifications()
+
+            stats.triggered += len(batch)
+            stats.batches += 1
+            stats.peak_batch_size = max(stats.peak_batch_size, len(batch))
+
+        return stats
+
+    async def _evaluate_pushdown(self, *conditions):
+        """
+        Motor SQL: el join, el ledger de disparos y el INSERT de notificaciones
+        se resuelven en una sola sentencia dentro de Postgres. A Python solo
+        vuelven los conteos por tipo de evento.
+        """
+        started = time.perf_counter()
+
+        width = settings.NOTIFICATION_REFIRE_BAND_WIDTH
+        band = (
+            cast(func.floor(WeatherData.probability / width), Integer)
+            if width > 0 else literal(0, Integer)
+        )
+
+        # Un disparo por (alerta, fecha, banda), igual que el ledger
+        matches = (
+            self._build_query(*conditions, extra_columns=(band.label("band"),))
+            .distinct(Alert.id, WeatherData.target_date, band)
+            .order_by(Alert.id, WeatherData.target_date, band, WeatherData.probability.desc())
+            .cte("matches")
+        )
+
+        claimed = (
+            pg_insert(AlertTrigger)
+            .from_select(
+                ["id", "alert_id", "target_date", "band", "probability"],
+                select(
+                    func.gen_random_uuid(), matches.c.id, matches.c.target_date,
+                    matches.c.band, matches.c.probability,
+                ),
+            )
+            .on_conflict_do_nothing(constraint="uq_alert_trigger_alert_date_band")
+            .returning(AlertTrigger.alert_id, AlertTrigger.target_date, AlertTrigger.probability)
+            .cte("claimed")
+        )
+        # Los disparos nuevos se completan con la alerta por PK: unir matches
+        # con claimed (dos CTE, sin índices) es un nested loop cuadrático
+        new_triggers = (
+            select(
+                claimed.c.alert_id, claimed.c.target_date, claimed.c.probability,
+                Alert.user_id, Alert.field_id, Alert.event_type, Alert.threshold,
             )
-            triggered += 1
+            .join(Alert, Alert.id == claimed.c.alert_id)
+            .cte("new_triggers")
+        )
+        matched_counts = (
+            select(matches.c.event_type, func.count().label("matched"))
+            .group_by(matches.c.event_type)
+            .cte("matched_counts")
+        )
+
+        if self.digest != OFF:
+            return await self._evaluate_pushdown_digest(matched_counts, new_triggers, started)
+
+        inserted = (
+            pg_insert(Notification)
+            .from_select(
+                ["id", "user_id", "alert_id", "event_type", "actual_value", "threshold", "target_date", "is_read"],
+                select(
+                    func.gen_random_uuid(), new_triggers.c.user_id, new_triggers.c.alert_id,
+                    new_triggers.c.event_type, new_triggers.c.probability, new_triggers.c.threshold,
+                    new_triggers.c.target_date, false(),
+                ),
+                # El estado de entrega toma los server defaults de la tabla
+                include_defaults=False,
+            )
+            .returning(Notification.event_type)
+            .cte("inserted")
+        )
+        notified_counts = (
+            select(inserted.c.event_type, func.count().label("notified"))
+            .group_by(inserted.c.event_type)
+            .cte("notified_counts")
+        )
+
+        # Conteos agregados por separado: el join final es entre un puñado de
+        # filas (una por tipo de evento)
+        summary = (
+            select(
+                matched_counts.c.event_type,
+                matched_counts.c.matched,
+                func.coalesce(notified_counts.c.notified, 0).label("notified"),
+            )
+            .select_from(matched_counts.outerjoin(
+                notified_counts, notified_counts.c.event_type == matched_counts.c.event_type,
+            ))
+        )
+
+        rows = (await self.session.execute(summary)).all()
+        await self.session.commit()
 
-        # Bulk insert de todas las notificaciones acumuladas
-        await flush_notifications()
+        matched = sum(row.matched for row in rows)
+        notified = sum(row.notified for row in rows)
+        stats = EvaluationStats(
+            triggered=matched,
+            batches=1,
+            peak_batch_size=matched,
+            elapsed_seconds=time.perf_counter() - started,
+        )
+        self.last_stats = stats
+
+        await event_bus.emit(
+            EvaluationSummaryEvent(
+                engine="sql",
+                matched=matched,
+                notified=notified,
+                by_event_type={row.event_type: row.notified for row in rows if row.notified},
+            )
+        )
+
+        logger.info(
+            f"Evaluación SQL finalizada. Alertas disparadas: {matched} | "
+            f"Notificaciones creadas: {notified} | {stats.rows_per_second:.0f} filas/s"
+        )
+        return matched
+
+    async def _evaluate_pushdown_digest(self, matched_counts, new_triggers, started: float):
+        """
+        Motor SQL con NOTIFICATION_DIGEST: el join y el ledger siguen en una
+        sola sentencia, pero en lugar de insertar una notificación por disparo
+        devuelve los disparos nuevos (agregados en arrays por tipo de evento)
+        y el digest se arma en Python.
+        """
+        order = (new_triggers.c.alert_id, new_triggers.c.target_date)
+
+        def collect(column):
+            return func.array_agg(aggregate_order_by(column, *order))
+
+        collected = (
+            select(
+                new_triggers.c.event_type,
+                func.count().label("notified"),
+                collect(new_triggers.c.alert_id).label("alert_ids"),
+                collect(new_triggers.c.user_id).label("user_ids"),
+                collect(new_triggers.c.field_id).label("field_ids"),
+                collect(new_triggers.c.threshold).label("thresholds"),
+                collect(new_triggers.c.probability).label("probabilities"),
+                collect(new_triggers.c.target_date).label("target_dates"),
+            )
+            .group_by(new_triggers.c.event_type)
+            .cte("collected")
+        )
+        summary = (
+            select(
+                matched_counts.c.event_type,
+                matched_counts.c.matched,
+                func.coalesce(collected.c.notified, 0).label("notified"),
+                collected.c.alert_ids,
+                collected.c.user_ids,
+                collected.c.field_ids,
+                collected.c.thresholds,
+                collected.c.probabilities,
+                collected.c.target_dates,
+            )
+            .select_from(matched_counts.outerjoin(
+                collected, collected.c.event_type == matched_counts.c.event_type,
+            ))
+        )
+        rows = (await self.session.execute(summary)).all()
+
+        triggers = [
+            {
+                "user_id": user_id,
+                "alert_id": alert_id,
+                "field_id": field_id,
+                "event_type": row.event_type,
+                "threshold": threshold,
+                "target_date": target_date,
+                "actual_value": probability,
+            }
+            for row in rows if row.notified
+            for alert_id, user_id, field_id, threshold, probability, target_date in zip(
+                row.alert_ids, row.user_ids, row.field_ids,
+                row.thresholds, row.probabilities, row.target_dates,
+            )
+        ]
+        notifications = await build_notification_rows(self.session, triggers, self.digest)
+        # bulk_create confirma también los disparos registrados en el ledger
+        await NotificationRepository(self.session).bulk_create(notifications)
+        await self.session.commit()
+
+        matched = sum(row.matched for row in rows)
+        stats = EvaluationStats(
+            triggered=matched,
+            batches=1,
+            peak_batch_size=matched,
+            elapsed_seconds=time.perf_counter() - started,
+        )
+        self.last_stats = stats
+
+        await event_bus.emit(
+            EvaluationSummaryEvent(
+                engine="sql",
+                matched=matched,
+                notified=len(triggers),
+                by_event_type={row.event_type: row.notified for row in rows if row.notified},
+            )
+        )
+
+        logger.info(
+            f"Evaluación SQL finalizada. Alertas disparadas: {matched} | "
+            f"Notificaciones creadas: {len(notifications)} (digest por {self.digest}) | "
+            f"{stats.rows_per_second:.0f} filas/s"
+        )
+        return matched
+
+    async def _evaluate_vectorized(self, *conditions):
+        """
+        Motor NumPy (ver app/services/vectorized_evaluation.py). Con
+        condiciones (evaluación incremental) solo carga las alertas y
+        pronósticos de los pares que las cumplen; los cruces entre ellos que
+        no cambiaron los descarta el ledger.
+        """
+        # numpy es una dependencia solo de este motor
+        from app.repositories.alert_trigger_repo import AlertTriggerRepository
+        from app.services.vectorized_evaluation import evaluate_vectorized
+
+        started = time.perf_counter()
+        changed = None
+        if any(c is not None for c in conditions):
+            changed = (
+                self._build_query(*conditions)
+                .with_only_columns(Alert.id.label("alert_id"), WeatherData.id.label("weather_id"))
+                .subquery()
+            )
+        triggers = await evaluate_vectorized(self.session, changed)
+
+        ledger = AlertTriggerRepository(self.session)
+        new_triggers = []
+        for i in range(0, len(triggers), self.batch_size):
+            new_triggers.extend(await ledger.claim(triggers[i:i + self.batch_size]))
+
+        repo = NotificationRepository(self.session)
+        notifications = await build_notification_rows(self.session, new_triggers, self.digest)
+        for i in range(0, len(notifications), self.batch_size):
+            await repo.bulk_create(notifications[i:i + self.batch_size])
+        await self.session.commit()
+
+        notified = len(new_triggers)
+        by_event_type: dict[str, int] = {}
+        for t in new_triggers:
+            by_event_type[t["event_type"]] = by_event_type.get(t["event_type"], 0) + 1
+
+        matched = len(triggers)
+        stats = EvaluationStats(
+            triggered=matched,
+            batches=-(-matched // self.batch_size),
+            peak_batch_size=min(matched, self.batch_size),
+            elapsed_seconds=time.perf_counter() - started,
+        )
+        self.last_stats = stats
+
+        await event_bus.emit(
+            EvaluationSummaryEvent(
+                engine="numpy", matched=matched, notified=notified, by_event_type=by_event_type,
+            )
+        )
+
+        logger.info(
+            f"Evaluación NumPy finalizada. Alertas disparadas: {matched} | "
+            f"Notificaciones creadas: {notified} | {stats.rows_per_second:.0f} filas/s"
+        )
+        return matched
 
-        logger.info(f"Evaluación finalizada. Alertas disparadas: {triggered}")
-        return triggered
\ No newline at end of file
@@ -0,0 +1,132 @@
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.field import Field
+
+# Modos de NOTIFICATION_DIGEST
+OFF = "off"
+USER = "user"
+ALERT = "alert"
+
+MAX_MESSAGE_LENGTH = 500
+
+
+@dataclass
+class DigestLine:
+    alert_id: uuid.UUID
+    field_id: uuid.UUID
+    event_type: str
+    threshold: float
+    peak: float = 0.0
+    dates: set = field(default_factory=set)
+
+
+def digest_mode() -> str:
+    mode = settings.NOTIFICATION_DIGEST
+    if mode not in (OFF, USER, ALERT):
+        raise ValueError(f"Modo de digest inválido: {mode}")
+    return mode
+
+
+def group_triggers(triggers: list[dict], mode: str) -> list[list[dict]]:
+    """Agrupa los disparos por usuario (USER) o por alerta (ALERT), en orden de llegada."""
+    groups: dict[tuple, list[dict]] = defaultdict(list)
+    for trigger in triggers:
+        key = (trigger["user_id"],) if mode == USER else (trigger["user_id"], trigger["alert_id"])
+        groups[key].append(trigger)
+    return list(groups.values())
+
+
+def format_digest_message(lines: list[DigestLine], field_names: dict[uuid.UUID, str]) -> str:
+    """
+    Un renglón por alerta con el pico de probabilidad y las fechas. Si no
+    entra en MAX_MESSAGE_LENGTH, los últimos renglones se resumen en "y N más".
+    """
+    total = sum(len(line.dates) for line in lines)
+    header = f"📋 Resumen: {total} alertas disparadas"
+    rows = [
+        f"• {field_names.get(line.field_id, 'Campo')} — {line.event_type} "
+        f"(umbral {line.threshold}%): pico {line.peak}% "
+        f"el {', '.join(str(d) for d in sorted(line.dates))}"
+        for line in lines
+    ]
+
+    message = header
+    for i, row in enumerate(rows):
+        remaining = len(rows) - i
+        more = f"\n• … y {remaining - 1} más" if remaining > 1 else ""
+        if len(message) + 1 + len(row) + len(more) > MAX_MESSAGE_LENGTH:
+            message += f"\n• … y {remaining} más"
+            break
+        message += "\n" + row
+    return message[:MAX_MESSAGE_LENGTH]
+
+
+def _lines(group: list[dict]) -> list[DigestLine]:
+    by_alert: dict[uuid.UUID, DigestLine] = {}
+    for trigger in group:
+        line = by_alert.get(trigger["alert_id"])
+        if line is None:
+            line = by_alert[trigger["alert_id"]] = DigestLine(
+                alert_id=trigger["alert_id"], field_id=trigger["field_id"],
+                event_type=trigger["event_type"], threshold=trigger["threshold"],
+            )
+        line.peak = max(line.peak, trigger["actual_value"])
+        line.dates.add(trigger["target_date"])
+    # Primero las alertas con mayor probabilidad; el resto de la clave hace
+    # que el orden (y la alerta representativa) no dependa del motor
+    return sorted(
+        by_alert.values(),
+        key=lambda line: (-line.peak, line.event_type, line.threshold, str(line.alert_id)),
+    )
+
+
+async def build_notification_rows(
+    session: AsyncSession, triggers: list[dict], mode: str | None = None,
+) -> list[dict]:
+    """
+    Arma las filas de notifications a partir de los disparos nuevos (ya
+    pasados por el ledger). Sin digest, una por disparo; con digest, una por
+    grupo, asociada a la alerta con el pico más alto y con el texto del
+    resumen en `message`. Los grupos de un solo disparo quedan como una
+    notificación común.
+    """
+    mode = mode or digest_mode()
+    if mode == OFF:
+        return [_row(t) for t in triggers]
+
+    groups = group_triggers(triggers, mode)
+    field_ids = {t["field_id"] for group in groups if len(group) > 1 for t in group}
+    field_names = {}
+    if field_ids:
+        result = await session.execute(select(Field.id, Field.name).where(Field.id.in_(field_ids)))
+        field_names = dict(result.all())
+
+    rows = []
+    for group in groups:
+        if len(group) == 1:
+            rows.append(_row(group[0]))
+            continue
+        # Los datos estructurados son los del disparo con el pico más alto
+        lines = _lines(group)
+        peak = max(group, key=lambda t: (t["alert_id"] == lines[0].alert_id, t["actual_value"]))
+        rows.append(_row(peak, message=format_digest_message(lines, field_names)))
+    return rows
+
+
+def _row(trigger: dict, message: str | None = None) -> dict:
+    """Fila de notifications: el texto se renderiza al leer, salvo `message`."""
+    return {
+        "user_id": trigger["user_id"],
+        "alert_id": trigger["alert_id"],
+        "event_type": trigger["event_type"],
+        "actual_value": trigger["actual_value"],
+        "threshold": trigger["threshold"],
+        "target_date": trigger["target_date"],
+        "message": message,
+    }
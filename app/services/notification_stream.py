@@ -0,0 +1,230 @@
+import asyncio
+import functools
+import logging
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager, suppress
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Iterable
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.config import settings
+from app.database import async_session
+from app.metrics import metrics
+from app.models.notification import NOTIFICATIONS_CHANNEL, Notification
+from app.pagination import encode_cursor
+from app.repositories.notification_repo import NotificationRepository
+from app.schemas.notification import NotificationResponse
+
+logger = logging.getLogger(__name__)
+
+# Reintento sugerido al navegador (EventSource) si se corta la conexión
+RETRY_MILLISECONDS = 3000
+FETCH_BATCH_SIZE = 100
+
+
+class NotificationBroker:
+    """
+    Pub/sub en memoria del proceso: un Event por conexión abierta. publish()
+    solo despierta a los suscriptores del usuario; cada uno busca en la base
+    lo nuevo desde su posición, así que varias publicaciones seguidas se
+    resuelven con una sola consulta.
+    """
+
+    def __init__(self):
+        self._subscribers: dict[uuid.UUID, set[asyncio.Event]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return sum(len(events) for events in self._subscribers.values())
+
+    @contextmanager
+    def subscribe(self, user_id: uuid.UUID):
+        wake = asyncio.Event()
+        self._subscribers[user_id].add(wake)
+        metrics.set("notification_stream_subscribers", len(self))
+        try:
+            yield wake
+        finally:
+            self._subscribers[user_id].discard(wake)
+            if not self._subscribers[user_id]:
+                del self._subscribers[user_id]
+            metrics.set("notification_stream_subscribers", len(self))
+
+    def publish(self, user_ids: Iterable[uuid.UUID]) -> int:
+        woken = 0
+        for user_id in set(user_ids):
+            for wake in self._subscribers.get(user_id, ()):
+                wake.set()
+                woken += 1
+        return woken
+
+    def publish_all(self) -> None:
+        for events in self._subscribers.values():
+            for wake in events:
+                wake.set()
+
+
+notification_broker = NotificationBroker()
+
+
+class NotificationStream:
+    """
+    Eventos SSE de las notificaciones nuevas de un usuario.
+
+    - Arranca después de `position` (el Last-Event-ID o cursor del cliente) o,
+      sin posición, después de la notificación más nueva: el historial se pide
+      a GET /notifications/user/{id}.
+    - Cada despertar del broker vuelve a consultar desde la posición menos
+      NOTIFICATION_STREAM_LOOKBACK_SECONDS, salteando lo ya enviado: created_at
+      es el inicio de la transacción, así que un insert que confirma tarde
+      puede quedar detrás de la última notificación enviada.
+    - Sin novedades, manda un comentario cada NOTIFICATION_STREAM_HEARTBEAT_SECONDS
+      para que proxies y balanceadores no corten la conexión.
+
+    Cada consulta usa su propia sesión: la conexión de streaming no retiene
+    una conexión del pool mientras espera.
+    """
+
+    def __init__(
+        self, user_id: uuid.UUID, position: tuple | None = None,
+        broker: NotificationBroker | None = None,
+        heartbeat_seconds: float | None = None, lookback_seconds: float | None = None,
+    ):
+        self.user_id = user_id
+        self.position = position
+        self.broker = notification_broker if broker is None else broker
+        self.heartbeat_seconds = heartbeat_seconds or settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS
+        self.lookback = timedelta(seconds=(
+            settings.NOTIFICATION_STREAM_LOOKBACK_SECONDS if lookback_seconds is None else lookback_seconds
+        ))
+        self._sent: dict[uuid.UUID, datetime] = {}
+        self._floor: tuple | None = None
+
+    async def events(self) -> AsyncIterator[str]:
+        # Suscripto antes de la primera consulta: no se pierde nada en el medio
+        with self.broker.subscribe(self.user_id) as wake:
+            if self.position is None:
+                async with async_session() as session:
+                    self.position = await NotificationRepository(session).latest_position(self.user_id)
+
+            # Lo anterior a la posición inicial el cliente ya lo tiene
+            self._floor = self.position
+            yield f"retry: {RETRY_MILLISECONDS}\n\n"
+            start = self.position
+            while True:
+                wake.clear()
+                for notification in await self._fetch(start):
+                    metrics.inc("notification_stream_events_total")
+                    yield self._event(notification)
+                start = self._lookback_position()
+
+                try:
+                    await asyncio.wait_for(wake.wait(), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+
+    async def _fetch(self, start: tuple | None) -> list[Notification]:
+        new = []
+        async with async_session() as session:
+            repo = NotificationRepository(session)
+            position = start
+            while True:
+                batch = await repo.get_after(self.user_id, position, FETCH_BATCH_SIZE)
+                new += [n for n in batch if n.id not in self._sent]
+                if len(batch) < FETCH_BATCH_SIZE:
+                    break
+                position = (batch[-1].created_at, batch[-1].id)
+
+        for notification in new:
+            self._sent[notification.id] = notification.created_at
+            key = (notification.created_at, notification.id)
+            if self.position is None or key > self.position:
+                self.position = key
+        if self.position is not None:
+            # Solo hace falta recordar lo que entra en la ventana de lookback
+            horizon = self.position[0] - self.lookback
+            self._sent = {id_: created for id_, created in self._sent.items() if created >= horizon}
+        return new
+
+    def _lookback_position(self) -> tuple | None:
+        if self.position is None:
+            return None
+        start = (self.position[0] - self.lookback, uuid.UUID(int=0))
+        return start if self._floor is None else max(start, self._floor)
+
+    @staticmethod
+    def _event(notification: Notification) -> str:
+        data = NotificationResponse.model_validate(notification).model_dump_json(by_alias=True)
+        cursor = encode_cursor((notification.created_at, notification.id))
+        return f"id: {cursor}\nevent: notification\ndata: {data}\n\n"
+
+
+class NotificationListener:
+    """
+    LISTEN sobre el canal que publica el trigger de notifications, en una
+    conexión dedicada (fuera del pool): así los inserts de cualquier proceso
+    (worker de evaluación, otras réplicas de la API, el motor SQL) despiertan
+    a los suscriptores de este proceso.
+    """
+
+    def __init__(
+        self, broker: NotificationBroker | None = None, dsn: str | None = None,
+        reconnect_seconds: float = 5.0, check_seconds: float = 30.0,
+    ):
+        self.broker = notification_broker if broker is None else broker
+        self.dsn = dsn or make_url(settings.DATABASE_URL).set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        self.reconnect_seconds = reconnect_seconds
+        self.check_seconds = check_seconds
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            user_ids = [uuid.UUID(value) for value in payload.split(",")]
+        except ValueError:
+            logger.warning(f"⚠️ Payload inválido en {channel}: {payload[:100]}")
+            return
+        self.broker.publish(user_ids)
+
+    @staticmethod
+    def _on_terminate(closed: asyncio.Future, connection) -> None:
+        if not closed.done():
+            closed.set_result(None)
+
+    async def run_forever(self) -> None:
+        while True:
+            connection = None
+            # Un future por conexión: el aviso tardío de una conexión vieja no
+            # puede cerrar la actual
+            closed = asyncio.get_running_loop().create_future()
+            on_terminate = functools.partial(self._on_terminate, closed)
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                connection.add_termination_listener(on_terminate)
+                await connection.add_listener(NOTIFICATIONS_CHANNEL, self._on_notify)
+                logger.info(f"👂 Escuchando {NOTIFICATIONS_CHANNEL} para el stream de notificaciones")
+
+                # Lo que se insertó mientras no había conexión no llegó por NOTIFY
+                self.broker.publish_all()
+                while not closed.done():
+                    try:
+                        await asyncio.wait_for(asyncio.shield(closed), self.check_seconds)
+                    except asyncio.TimeoutError:
+                        # Una conexión caída sin aviso solo se detecta al usarla
+                        await connection.execute("SELECT 1")
+                logger.warning("⚠️ Se cerró la conexión de LISTEN de notificaciones")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Error en LISTEN de notificaciones: {e}")
+            finally:
+                if connection is not None:
+                    connection.remove_termination_listener(on_terminate)
+                    if not connection.is_closed():
+                        # El UNLISTEN es best effort: close() lo resuelve igual
+                        with suppress(asyncpg.PostgresError, asyncpg.InterfaceError, OSError):
+                            await connection.remove_listener(NOTIFICATIONS_CHANNEL, self._on_notify)
+                        await connection.close()
+            await asyncio.sleep(self.reconnect_seconds)
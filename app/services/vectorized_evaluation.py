@@ -0,0 +1,137 @@
+import uuid
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import Subquery, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.alert import Alert
+from app.models.weather_data import WeatherData
+
+
+def find_crossings(
+    alert_keys: np.ndarray,
+    thresholds: np.ndarray,
+    weather_keys: np.ndarray,
+    probabilities: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Devuelve los pares (índice de alerta, índice de pronóstico) con la misma
+    clave (field_id, event_type) y threshold <= probability.
+
+    Los umbrales y probabilidades se reemplazan por su rango dentro de los
+    valores distintos, así la clave combinada `key * n_valores + rango` es un
+    entero exacto: con las alertas ordenadas por esa clave, las que cruza un
+    pronóstico son el tramo [inicio de su key, key + rango de su probabilidad],
+    que se obtiene con dos searchsorted.
+    """
+    values = np.unique(np.concatenate([thresholds, probabilities]))
+    n_values = np.int64(len(values))
+    threshold_rank = np.searchsorted(values, thresholds)
+    probability_rank = np.searchsorted(values, probabilities)
+
+    alert_sort_key = alert_keys.astype(np.int64) * n_values + threshold_rank
+    order = np.argsort(alert_sort_key, kind="stable")
+    sorted_keys = alert_sort_key[order]
+
+    weather_base = weather_keys.astype(np.int64) * n_values
+    start = np.searchsorted(sorted_keys, weather_base, side="left")
+    end = np.searchsorted(sorted_keys, weather_base + probability_rank, side="right")
+    counts = end - start
+
+    # Expande cada tramo [start, end) en un índice por par
+    total = int(counts.sum())
+    weather_idx = np.repeat(np.arange(len(weather_keys)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    alert_idx = order[np.repeat(start, counts) + offsets]
+    return alert_idx, weather_idx
+
+
+def first_per_trigger(
+    alert_idx: np.ndarray, date_ordinals: np.ndarray, probabilities: np.ndarray,
+) -> np.ndarray:
+    """
+    Posiciones de un disparo por (alerta, fecha, banda), quedándose con el de
+    mayor probabilidad: lo mismo que el DISTINCT ON del motor SQL.
+    """
+    width = settings.NOTIFICATION_REFIRE_BAND_WIDTH
+    bands = (
+        np.floor_divide(probabilities, width).astype(np.int64)
+        if width > 0 else np.zeros(len(probabilities), dtype=np.int64)
+    )
+    order = np.lexsort((-probabilities, bands, date_ordinals, alert_idx))
+    keys = np.stack([alert_idx[order], date_ordinals[order], bands[order]])
+    is_first = np.ones(len(order), dtype=bool)
+    is_first[1:] = np.any(keys[:, 1:] != keys[:, :-1], axis=0)
+    return order[is_first]
+
+
+async def load_columns(session: AsyncSession, changed: Subquery | None = None):
+    """
+    Trae alertas activas y la ventana de 7 días de pronósticos como columnas.
+    (field_id, event_type) se codifica a un entero compartido por ambos lados.
+
+    `changed` (columnas alert_id, weather_id) limita la carga a los pares que
+    cambiaron, como en la evaluación incremental de los otros motores.
+    """
+    today = date.today()
+    alert_query = (
+        select(Alert.id, Alert.user_id, Alert.field_id, Alert.event_type, Alert.threshold)
+        .where(Alert.is_active == True)
+    )
+    weather_query = (
+        select(WeatherData.field_id, WeatherData.event_type, WeatherData.probability, WeatherData.target_date)
+        .where(WeatherData.target_date >= today, WeatherData.target_date < today + timedelta(days=7))
+    )
+    if changed is not None:
+        alert_query = alert_query.where(Alert.id.in_(select(changed.c.alert_id)))
+        weather_query = weather_query.where(WeatherData.id.in_(select(changed.c.weather_id)))
+    alerts = (await session.execute(alert_query)).all()
+    weather = (await session.execute(weather_query)).all()
+
+    codes: dict[tuple[uuid.UUID, str], int] = {}
+    alert_keys = np.fromiter(
+        (codes.setdefault((a.field_id, a.event_type), len(codes)) for a in alerts),
+        dtype=np.int64, count=len(alerts),
+    )
+    # Un pronóstico sin alertas para su clave no puede cruzar: se le asigna -1
+    weather_keys = np.fromiter(
+        (codes.get((w.field_id, w.event_type), -1) for w in weather),
+        dtype=np.int64, count=len(weather),
+    )
+    thresholds = np.fromiter((a.threshold for a in alerts), dtype=np.float64, count=len(alerts))
+    probabilities = np.fromiter((w.probability for w in weather), dtype=np.float64, count=len(weather))
+    date_ordinals = np.fromiter((w.target_date.toordinal() for w in weather), dtype=np.int32, count=len(weather))
+
+    return alerts, weather, alert_keys, thresholds, weather_keys, probabilities, date_ordinals
+
+
+async def evaluate_vectorized(session: AsyncSession, changed: Subquery | None = None) -> list[dict]:
+    """
+    Motor NumPy: todos los cruces de umbral se calculan con operaciones
+    vectorizadas y recién después se arman los disparos, con el mismo
+    formato que acumula handle_alert_triggered.
+    """
+    alerts, weather, alert_keys, thresholds, weather_keys, probabilities, date_ordinals = (
+        await load_columns(session, changed)
+    )
+    if not alerts or not weather:
+        return []
+
+    alert_idx, weather_idx = find_crossings(alert_keys, thresholds, weather_keys, probabilities)
+    keep = first_per_trigger(alert_idx, date_ordinals[weather_idx], probabilities[weather_idx])
+
+    triggers = []
+    for a, w in zip(alert_idx[keep].tolist(), weather_idx[keep].tolist()):
+        alert, forecast = alerts[a], weather[w]
+        triggers.append({
+            "user_id": alert.user_id,
+            "alert_id": alert.id,
+            "field_id": alert.field_id,
+            "event_type": alert.event_type,
+            "threshold": alert.threshold,
+            "target_date": forecast.target_date,
+            "actual_value": forecast.probability,
+        })
+    return triggers
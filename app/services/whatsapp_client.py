@@ -0,0 +1,82 @@
+import httpx
+
+from app.config import settings
+
+
+class DeliveryError(Exception):
+    """
+    Falla al enviar un mensaje. `retryable` distingue lo transitorio
+    (timeouts, 429, 5xx) de lo que no va a funcionar reintentando (4xx).
+    """
+
+    def __init__(self, message: str, retryable: bool, retry_after: float | None = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class WhatsAppClient:
+    """
+    Cliente del proveedor de WhatsApp (API estilo Cloud API: POST /messages).
+    Usa un único httpx.AsyncClient con pool de conexiones keep-alive del
+    tamaño de la concurrencia de envío.
+    """
+
+    def __init__(
+        self, base_url: str | None = None, token: str | None = None,
+        timeout: float | None = None, max_connections: int | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        max_connections = max_connections or settings.DELIVERY_CONCURRENCY
+        self._client = httpx.AsyncClient(
+            base_url=base_url or settings.WHATSAPP_API_URL,
+            headers={"Authorization": f"Bearer {token or settings.WHATSAPP_API_TOKEN}"},
+            timeout=timeout or settings.WHATSAPP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+
+    async def send(self, phone: str, body: str) -> str:
+        """Envía un mensaje de texto y devuelve el id del mensaje en el proveedor."""
+        try:
+            response = await self._client.post("/messages", json={
+                "messaging_product": "whatsapp",
+                "to": phone,
+                "type": "text",
+                "text": {"body": body},
+            })
+        except httpx.HTTPError as e:
+            # Red/timeouts son transitorios; redirecciones o cuerpos que no se
+            # pueden decodificar no se arreglan reintentando
+            raise DeliveryError(
+                f"{type(e).__name__}: {e}", retryable=isinstance(e, httpx.TransportError),
+            ) from e
+
+        if response.status_code == 429 or response.status_code >= 500:
+            raise DeliveryError(
+                f"HTTP {response.status_code}", retryable=True,
+                retry_after=_retry_after(response),
+            )
+        if response.status_code >= 400:
+            raise DeliveryError(f"HTTP {response.status_code}: {response.text[:200]}", retryable=False)
+
+        try:
+            return response.json()["messages"][0]["id"]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise DeliveryError(f"Respuesta inválida del proveedor: {response.text[:200]}", retryable=False) from e
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
@@ -0,0 +1,100 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.models.user import User
+from app.models.field import Field
+from app.schemas.alert import AlertCreate, AlertUpdate
+from app.services.alert_index import ActiveAlertIndex, active_alert_index
+from app.services.alert_service import AlertService
+
+
+def _alert(field_id, threshold, event_type="helada", is_active=True):
+    return SimpleNamespace(
+        id=uuid4(), user_id=uuid4(), field_id=field_id,
+        event_type=event_type, threshold=threshold, is_active=is_active,
+    )
+
+
+def test_match_returns_alerts_below_probability():
+    field_id = uuid4()
+    alerts = [_alert(field_id, t) for t in (80.0, 50.0, 65.0, 90.0)]
+    index = ActiveAlertIndex()
+    index.rebuild(alerts)
+
+    matched = index.match(field_id, "helada", 70.0)
+    assert sorted(a.threshold for a in matched) == [50.0, 65.0]
+
+    # El umbral es inclusivo, igual que en el join SQL (probability >= threshold)
+    assert len(index.match(field_id, "helada", 80.0)) == 3
+    assert index.match(field_id, "lluvia", 99.0) == []
+    assert index.match(uuid4(), "helada", 99.0) == []
+
+
+def test_rebuild_skips_inactive_alerts():
+    field_id = uuid4()
+    index = ActiveAlertIndex()
+    index.rebuild([_alert(field_id, 10.0, is_active=False), _alert(field_id, 20.0)])
+
+    assert len(index) == 1
+    assert [a.threshold for a in index.match(field_id, "helada", 100.0)] == [20.0]
+
+
+def test_upsert_and_remove_keep_order():
+    field_id = uuid4()
+    index = ActiveAlertIndex()
+    first, second = _alert(field_id, 60.0), _alert(field_id, 40.0)
+    index.upsert(first)
+    index.upsert(second)
+    assert [a.threshold for a in index.match(field_id, "helada", 100.0)] == [40.0, 60.0]
+
+    first.threshold = 30.0
+    index.upsert(first)
+    assert [a.threshold for a in index.match(field_id, "helada", 35.0)] == [30.0]
+
+    second.is_active = False
+    index.upsert(second)
+    assert len(index) == 1
+
+    index.remove(first.id)
+    assert len(index) == 0
+    assert index.match(field_id, "helada", 100.0) == []
+
+
+async def test_alert_service_keeps_index_in_sync(session):
+    user = User(name="Index User", phone="+5491100000070")
+    session.add(user)
+    await session.flush()
+    field = Field(name="Index Field", latitude=-31.4, longitude=-64.2, user_id=user.id)
+    session.add(field)
+    await session.flush()
+
+    service = AlertService(session)
+    alert = await service.create_alert(
+        AlertCreate(user_id=user.id, field_id=field.id, event_type="frost", threshold=70.0)
+    )
+    assert [a.alert_id for a in active_alert_index.match(field.id, "frost", 75.0)] == [alert.id]
+
+    await service.update_alert(alert.id, AlertUpdate(threshold=80.0))
+    assert active_alert_index.match(field.id, "frost", 75.0) == []
+
+    await service.delete_alert(alert.id)
+    assert active_alert_index.match(field.id, "frost", 100.0) == []
+
+
+async def test_load_from_repository(session):
+    user = User(name="Index User", phone="+5491100000071")
+    session.add(user)
+    await session.flush()
+    field = Field(name="Index Field", latitude=-31.4, longitude=-64.2, user_id=user.id)
+    session.add(field)
+    await session.flush()
+
+    service = AlertService(session)
+    await service.create_alert(AlertCreate(user_id=user.id, field_id=field.id, event_type="hail", threshold=40.0))
+
+    index = await ActiveAlertIndex().load(session)
+    assert index.loaded
+    assert len(index.match(field.id, "hail", 50.0)) == 1
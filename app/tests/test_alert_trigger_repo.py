@@ -0,0 +1,72 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from datetime import date
+from unittest.mock import patch
+from uuid import uuid4
+
+from app.models.user import User
+from app.models.field import Field
+from app.models.alert import Alert
+from app.repositories.alert_trigger_repo import AlertTriggerRepository
+
+
+async def _setup_alert(session):
+    user = User(name="Ledger User", phone="+5491100000060")
+    session.add(user)
+    await session.flush()
+
+    field = Field(name="Ledger Field", latitude=-31.0, longitude=-64.0, user_id=user.id)
+    session.add(field)
+    await session.flush()
+
+    alert = Alert(user_id=user.id, field_id=field.id, event_type="frost", threshold=50.0)
+    session.add(alert)
+    await session.flush()
+    return alert
+
+
+def _trigger(alert, value, target_date=date(2025, 3, 1)):
+    return {"alert_id": alert.id, "target_date": target_date, "actual_value": value}
+
+
+async def test_claim_returns_only_new_triggers(session):
+    alert = await _setup_alert(session)
+    repo = AlertTriggerRepository(session)
+
+    first = await repo.claim([_trigger(alert, 60.0)])
+    assert len(first) == 1
+
+    second = await repo.claim([_trigger(alert, 62.0), _trigger(alert, 70.0, date(2025, 3, 2))])
+    assert len(second) == 1
+    assert second[0]["target_date"] == date(2025, 3, 2)
+
+
+async def test_claim_deduplicates_within_batch(session):
+    alert = await _setup_alert(session)
+    repo = AlertTriggerRepository(session)
+
+    claimed = await repo.claim([_trigger(alert, 60.0), _trigger(alert, 61.0)])
+    assert len(claimed) == 1
+
+
+async def test_claim_refires_on_new_band(session):
+    alert = await _setup_alert(session)
+    repo = AlertTriggerRepository(session)
+
+    with patch("app.repositories.alert_trigger_repo.settings.NOTIFICATION_REFIRE_BAND_WIDTH", 10):
+        assert len(await repo.claim([_trigger(alert, 61.0)])) == 1
+        assert len(await repo.claim([_trigger(alert, 68.0)])) == 0
+        assert len(await repo.claim([_trigger(alert, 72.0)])) == 1
+
+
+async def test_claim_skips_deleted_and_inactive_alerts(session):
+    alert = await _setup_alert(session)
+    inactive = Alert(user_id=alert.user_id, field_id=alert.field_id, event_type="hail", threshold=50.0, is_active=False)
+    session.add(inactive)
+    await session.flush()
+    repo = AlertTriggerRepository(session)
+
+    deleted = {"alert_id": uuid4(), "target_date": date(2025, 3, 1), "actual_value": 60.0}
+    claimed = await repo.claim([deleted, _trigger(inactive, 60.0), _trigger(alert, 60.0)])
+    assert [t["alert_id"] for t in claimed] == [alert.id]
@@ -0,0 +1,211 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from app.models.user import User
+from app.models.field import Field
+from app.models.alert import Alert
+from app.models.notification import Notification
+from app.repositories.notification_repo import NotificationRepository
+from app.services.delivery_service import NotificationDeliveryService
+from app.services.rate_limiter import TokenBucket
+from app.services.whatsapp_client import DeliveryError, WhatsAppClient
+from app.tests.conftest import get_test_session_factory
+
+
+def _client(handler) -> WhatsAppClient:
+    return WhatsAppClient(
+        base_url="http://provider.test/v1/123", token="secret",
+        transport=httpx.MockTransport(handler),
+    )
+
+
+def _ok(request: httpx.Request) -> httpx.Response:
+    body = json.loads(request.content)
+    return httpx.Response(200, json={"messages": [{"id": f"wamid.{body['to']}"}]})
+
+
+async def _setup_notifications(session, count: int) -> User:
+    user = User(name="Delivery User", phone="+5491100000070")
+    session.add(user)
+    await session.flush()
+    field = Field(name="Delivery Field", latitude=-31.0, longitude=-64.0, user_id=user.id)
+    session.add(field)
+    await session.flush()
+    alert = Alert(user_id=user.id, field_id=field.id, event_type="helada", threshold=50.0)
+    session.add(alert)
+    await session.flush()
+
+    await NotificationRepository(session).bulk_create([
+        {"user_id": user.id, "alert_id": alert.id, "message": f"Mensaje {i}"} for i in range(count)
+    ])
+    return user
+
+
+async def _notifications(session) -> list[Notification]:
+    session.expire_all()
+    result = await session.execute(select(Notification).order_by(Notification.message))
+    return list(result.scalars().all())
+
+
+async def test_whatsapp_client_sends_message():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return _ok(request)
+
+    async with _client(handler) as client:
+        message_id = await client.send("+5491100000070", "Hola")
+
+    assert message_id == "wamid.+5491100000070"
+    assert requests[0].url == "http://provider.test/v1/123/messages"
+    assert requests[0].headers["Authorization"] == "Bearer secret"
+    assert json.loads(requests[0].content)["text"] == {"body": "Hola"}
+
+
+@pytest.mark.parametrize("status, retryable", [(429, True), (503, True), (400, False)])
+async def test_whatsapp_client_classifies_errors(status, retryable):
+    async with _client(lambda request: httpx.Response(status, headers={"Retry-After": "7"})) as client:
+        with pytest.raises(DeliveryError) as error:
+            await client.send("+5491100000070", "Hola")
+
+    assert error.value.retryable is retryable
+    if retryable:
+        assert error.value.retry_after == 7
+
+
+async def test_whatsapp_client_transport_errors_are_retryable():
+    def handler(request):
+        raise httpx.ConnectTimeout("timeout", request=request)
+
+    async with _client(handler) as client:
+        with pytest.raises(DeliveryError) as error:
+            await client.send("+5491100000070", "Hola")
+    assert error.value.retryable is True
+
+
+@pytest.mark.parametrize("response", [
+    {"json": []},
+    {"json": {"messages": None}},
+    {"headers": {"Content-Encoding": "gzip"}, "stream": httpx.ByteStream(b"no es gzip")},
+])
+async def test_whatsapp_client_wraps_unexpected_responses(response):
+    async with _client(lambda request: httpx.Response(200, **response)) as client:
+        with pytest.raises(DeliveryError) as error:
+            await client.send("+5491100000070", "Hola")
+    assert error.value.retryable is False
+
+
+async def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=100, capacity=5)
+
+    started = time.monotonic()
+    await asyncio.gather(*(bucket.acquire() for _ in range(15)))
+
+    # 5 de burst y 10 a 100/s: al menos ~0.1s
+    assert time.monotonic() - started >= 0.09
+
+
+async def test_delivery_sends_pending_notifications(session):
+    await _setup_notifications(session, 5)
+    in_flight = peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return _ok(request)
+
+    async with _client(handler) as client:
+        service = NotificationDeliveryService(client, TokenBucket(0), batch_size=10, concurrency=2)
+        with patch("app.services.delivery_service.async_session", get_test_session_factory()):
+            assert await service.deliver_once() == 5
+            assert await service.deliver_once() == 0
+
+    notifications = await _notifications(session)
+    assert {n.delivery_status for n in notifications} == {"sent"}
+    assert all(n.delivered_at and n.provider_message_id == "wamid.+5491100000070" for n in notifications)
+    assert all(n.delivery_attempts == 1 for n in notifications)
+    assert peak == 2
+
+
+async def test_delivery_retries_with_backoff_then_fails(session):
+    await _setup_notifications(session, 1)
+
+    async with _client(lambda request: httpx.Response(503)) as client:
+        service = NotificationDeliveryService(
+            client, TokenBucket(0), max_attempts=2, retry_base_seconds=0,
+        )
+        with patch("app.services.delivery_service.async_session", get_test_session_factory()):
+            assert await service.deliver_once() == 1
+            [notification] = await _notifications(session)
+            assert notification.delivery_status == "pending"
+            assert notification.delivery_attempts == 1
+            assert notification.next_attempt_at is not None
+            assert notification.last_error == "HTTP 503"
+
+            assert await service.deliver_once() == 1
+
+    [notification] = await _notifications(session)
+    assert notification.delivery_status == "failed"
+    assert notification.delivery_attempts == 2
+
+
+async def test_delivery_waits_for_next_attempt(session):
+    await _setup_notifications(session, 1)
+
+    async with _client(lambda request: httpx.Response(429)) as client:
+        service = NotificationDeliveryService(client, TokenBucket(0), retry_base_seconds=60)
+        with patch("app.services.delivery_service.async_session", get_test_session_factory()):
+            assert await service.deliver_once() == 1
+            # El reintento queda agendado a futuro: no se vuelve a tomar todavía
+            assert await service.deliver_once() == 0
+
+
+async def test_delivery_does_not_retry_permanent_errors(session):
+    await _setup_notifications(session, 1)
+
+    async with _client(lambda request: httpx.Response(400, text="invalid phone")) as client:
+        service = NotificationDeliveryService(client, TokenBucket(0))
+        with patch("app.services.delivery_service.async_session", get_test_session_factory()):
+            assert await service.deliver_once() == 1
+
+    [notification] = await _notifications(session)
+    assert notification.delivery_status == "failed"
+    assert notification.last_error == "HTTP 400: invalid phone"
+
+
+class _BrokenClient:
+    """Cliente que revienta con un error que no es DeliveryError en un mensaje."""
+
+    async def send(self, phone: str, body: str) -> str:
+        if body == "Mensaje 1":
+            raise RuntimeError("boom")
+        await asyncio.sleep(0)
+        return f"wamid.{body}"
+
+
+async def test_delivery_records_batch_when_one_send_raises_unexpectedly(session):
+    await _setup_notifications(session, 3)
+
+    service = NotificationDeliveryService(_BrokenClient(), TokenBucket(0), retry_base_seconds=0)
+    with patch("app.services.delivery_service.async_session", get_test_session_factory()):
+        assert await service.deliver_once() == 3
+
+    sent, broken, other = await _notifications(session)
+    assert (sent.delivery_status, other.delivery_status) == ("sent", "sent")
+    assert sent.provider_message_id == "wamid.Mensaje 0"
+    assert broken.delivery_status == "pending"
+    assert broken.delivery_attempts == 1
+    assert broken.last_error == "RuntimeError: boom"
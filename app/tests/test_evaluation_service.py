@@ -1,10 +1,14 @@
-from datetime import date
+from datetime import date, timedelta
 from unittest.mock import AsyncMock, patch
+from uuid import uuid4
 
+from app.models.weather_data import WeatherData
 from app.repositories.user_repo import UserRepository
 from app.repositories.field_repo import FieldRepository
 from app.repositories.alert_repo import AlertRepository
 from app.repositories.weather_repo import WeatherRepository
+from app.repositories.notification_repo import NotificationRepository
+from app.services.alert_index import ActiveAlertIndex
 from app.services.evaluation_service import EvaluationService
 
 
@@ -33,14 +37,14 @@ async def test_evaluation_triggers_alert(session):
 
     with patch("app.services.evaluation_service.event_bus") as mock_bus, \
          patch("app.services.evaluation_service.flush_notifications", new_callable=AsyncMock) as mock_flush:
-        mock_bus.emit = AsyncMock()
+        mock_bus.emit_many = AsyncMock()
         service = EvaluationService(session)
         triggered = await service.evaluate_all()
 
         assert triggered >= 1
-        mock_bus.emit.assert_called()
+        mock_bus.emit_many.assert_called()
         mock_flush.assert_called_once()
-        event = mock_bus.emit.call_args[0][0]
+        event = mock_bus.emit_many.call_args[0][0][0]
         assert event.event_type == "lluvia"
         assert event.actual_value == 85.0
         assert event.threshold == 70.0
@@ -71,10 +75,638 @@ async def test_evaluation_does_not_trigger_below_threshold(session):
 
     with patch("app.services.evaluation_service.event_bus") as mock_bus, \
          patch("app.services.evaluation_service.flush_notifications", new_callable=AsyncMock) as mock_flush:
-        mock_bus.emit = AsyncMock()
+        mock_bus.emit_many = AsyncMock()
         service = EvaluationService(session)
         triggered = await service.evaluate_all()
 
         assert triggered == 0
-        mock_bus.emit.assert_not_called()
-        mock_flush.assert_called_once()
\ No newline at end of file
+        mock_bus.emit_many.assert_not_called()
+        mock_flush.assert_not_called()
+
+
+async def test_evaluation_streams_in_batches(session):
+    user_repo = UserRepository(session)
+    user = await user_repo.create(name="Test User", phone="+5491100000032")
+
+    field_repo = FieldRepository(session)
+    field = await field_repo.create(
+        user_id=user.id, name="Campo Test",
+        latitude=-34.0, longitude=-58.0,
+    )
+
+    weather_repo = WeatherRepository(session)
+    today = date.today()
+    for i in range(5):
+        await weather_repo.create(
+            field_id=field.id, event_type="helada",
+            probability=80.0 + i, target_date=today + timedelta(days=i),
+        )
+
+    alert_repo = AlertRepository(session)
+    await alert_repo.create(
+        user_id=user.id, field_id=field.id,
+        event_type="helada", threshold=50.0,
+    )
+
+    with patch("app.services.evaluation_service.event_bus") as mock_bus, \
+         patch("app.services.evaluation_service.flush_notifications", new_callable=AsyncMock) as mock_flush:
+        mock_bus.emit_many = AsyncMock()
+        service = EvaluationService(session, batch_size=2)
+        triggered = await service.evaluate_all()
+
+        assert triggered == 5
+        # Un emit_many por lote con todos sus eventos
+        assert [len(c[0][0]) for c in mock_bus.emit_many.call_args_list] == [2, 2, 1]
+        # Un flush por lote: 2 + 2 + 1
+        assert mock_flush.call_count == 3
+        assert service.last_stats.batches == 3
+        assert service.last_stats.peak_batch_size == 2
+
+
+async def test_incremental_evaluation_skips_when_nothing_changed(session):
+    user_repo = UserRepository(session)
+    user = await user_repo.create(name="Test User", phone="+5491100000033")
+
+    field_repo = FieldRepository(session)
+    field = await field_repo.create(
+        user_id=user.id, name="Campo Test",
+        latitude=-34.0, longitude=-58.0,
+    )
+
+    weather_repo = WeatherRepository(session)
+    today = date.today()
+    await weather_repo.create(
+        field_id=field.id, event_type="lluvia",
+        probability=85.0, target_date=today,
+    )
+
+    alert_repo = AlertRepository(session)
+    await alert_repo.create(
+        user_id=user.id, field_id=field.id,
+        event_type="lluvia", threshold=70.0,
+    )
+
+    with patch("app.services.evaluation_service.event_bus") as mock_bus, \
+         patch("app.services.evaluation_service.flush_notifications", new_callable=AsyncMock):
+        mock_bus.emit_many = AsyncMock()
+        service = EvaluationService(session)
+
+        # Primera ejecución: reconciliación completa
+        assert await service.evaluate_incremental() == 1
+
+        # Sin cambios: no se vuelve a consultar el join
+        mock_bus.emit_many.reset_mock()
+        assert await service.evaluate_incremental() == 0
+        mock_bus.emit_many.assert_not_called()
+
+        # Nuevo pronóstico: solo se evalúa la fila nueva
+        await weather_repo.create(
+            field_id=field.id, event_type="lluvia",
+            probability=90.0, target_date=today + timedelta(days=1),
+        )
+        assert await service.evaluate_incremental() == 1
+        event = mock_bus.emit_many.call_args[0][0][0]
+        assert event.actual_value == 90.0
+
+
+async def test_incremental_evaluation_picks_up_alert_changes(session):
+    user_repo = UserRepository(session)
+    user = await user_repo.create(name="Test User", phone="+5491100000034")
+
+    field_repo = FieldRepository(session)
+    field = await field_repo.create(
+        user_id=user.id, name="Campo Test",
+        latitude=-34.0, longitude=-58.0,
+    )
+
+    weather_repo = WeatherRepository(session)
+    await weather_repo.create(
+        field_id=field.id, event_type="granizo",
+        probability=60.0, target_date=date.today(),
+    )
+
+    alert_repo = AlertRepository(session)
+    alert = await alert_repo.create(
+        user_id=user.id, field_id=field.id,
+        event_type="granizo", threshold=80.0,
+    )
+
+    with patch("app.services.evaluation_service.event_bus") as mock_bus, \
+         patch("app.services.evaluation_service.flush_notifications", new_callable=AsyncMock):
+        mock_bus.emit_many = AsyncMock()
+        service = EvaluationService(session)
+        assert await service.evaluate_incremental() == 0
+
+        await alert_repo.update(alert, threshold=50.0)
+        assert await service.evaluate_incremental() == 1
+
+
+async def test_sql_engine_inserts_notifications_in_database(session):
+    user_repo = UserRepository(session)
+    user = await user_repo.create(name="Test User", phone="+5491100000035")
+
+    field_repo = FieldRepository(session)
+    field = await field_repo.create(
+        user_id=user.id, name="Campo Test",
+        latitude=-34.0, longitude=-58.0,
+    )
+
+    weather_repo = WeatherRepository(session)
+    today = date.today()
+    await weather_repo.create(
+        field_id=field.id, event_type="lluvia",
+        probability=85.0, target_date=today,
+    )
+    await weather_repo.create(
+        field_id=field.id, event_type="lluvia",
+        probability=72.5, target_date=today + timedelta(days=1),
+    )
+
+    alert_repo = AlertRepository(session)
+    await alert_repo.create(
+        user_id=user.id, field_id=field.id,
+        event_type="lluvia", threshold=70.0,
+    )
+
+    with patch("app.services.evaluation_service.event_bus") as mock_bus:
+        mock_bus.emit = AsyncMock()
+        service = EvaluationService(session, engine="sql")
+        assert await service.evaluate_all() == 2
+
+        summary = mock_bus.emit.call_args[0][0]
+        assert summary.notified == 2
+        assert summary.by_event_type == {"lluvia": 2}
+
+        # El ledger evita volver a insertar en el siguiente tick
+        assert await service.evaluate_all() == 2
+        assert mock_bus.emit.call_args[0][0].notified == 0
+
+    notifications = await NotificationRepository(session).get_by_user(user.id)
+    assert len(notifications) == 2
+    assert (
+        f"⚠️ Alerta: lluvia detectada con 85.0% de probabilidad "
+        f"(umbral configurado: 70.0%) para el día {today}"
+    ) in [n.text for n in notifications]
+    assert any("72.5%" in n.text for n in notifications)
+    # Se guardan los datos del disparo, no el texto
+    assert all(n.message is None and n.event_type == "lluvia" for n in notifications)
+    # El INSERT ... SELECT también pasa por el trigger de los contadores
+    assert await NotificationRepository(session).unread_count(user.id) == 2
+
+
+async def test_evaluate_forecast_only_matches_its_key(session):
+    user_repo = UserRepository(session)
+    user = await user_repo.create(name="Test User", phone="+5491100000036")
+
+    field_repo = FieldRepository(session)
+    field = await field_repo.create(
+        user_id=user.id, name="Campo Test",
+        latitude=-34.0, longitude=-58.0,
+    )
+
+    alert_repo = AlertRepository(session)
+    await alert_repo.create(user_id=user.id, field_id=field.id, event_type="helada", threshold=60.0)
+    await alert_repo.create(user_id=user.id, field_id=field.id, event_type="helada", threshold=95.0)
+    await alert_repo.create(user_id=user.id, field_id=field.id, event_type="lluvia", threshold=10.0)
+
+    weather_repo = WeatherRepository(session)
+    weather = await weather_repo.create(
+        field_id=field.id, event_type="helada",
+        probability=70.0, target_date=date.today(),
+    )
+
+    for use_index in (False, True):
+        index = ActiveAlertIndex()
+        if use_index:
+            await index.load(session)
+
+        with patch("app.services.evaluation_service.active_alert_index", index), \
+             patch("app.services.evaluation_service.event_bus") as mock_bus, \
+             patch("app.services.evaluation_service.flush_notifications", new_callable=AsyncMock) as mock_flush:
+            mock_bus.emit_many = AsyncMock()
+            triggered = await EvaluationService(session).evaluate_forecast(weather)
+
+            assert triggered == 1
+            event = mock_bus.emit_many.call_args[0][0][0]
+            assert event.threshold == 60.0
+            mock_flush.assert_called_once()
+
+
+async def test_evaluate_forecast_sees_alert_changes_from_other_processes(session):
+    user = await UserRepository(session).create(name="Test User", phone="+5491100000039")
+    field = await FieldRepository(session).create(
+        user_id=user.id, name="Campo Test",
+        latitude=-34.0, longitude=-58.0,
+    )
+    alert_repo = AlertRepository(session)
+    deactivated = await alert_repo.create(user_id=user.id, field_id=field.id, event_type="helada", threshold=50.0)
+    deleted = await alert_repo.create(user_id=user.id, field_id=field.id, event_type="helada", threshold=55.0)
+    weather = await WeatherRepository(session).create(
+        field_id=field.id, event_type="helada",
+        probability=70.0, target_date=date.today(),
+    )
+    index = await ActiveAlertIndex().load(session)
+
+    async def triggered_alert_ids():
+        with patch("app.services.evaluation_service.active_alert_index", index), \
+             patch("app.services.evaluation_service.event_bus") as mock_bus, \
+             patch("app.services.evaluation_service.flush_notifications", new_callable=AsyncMock):
+            mock_bus.emit_many = AsyncMock()
+            await EvaluationService(session).evaluate_forecast(weather)
+        return {e.alert_id for call in mock_bus.emit_many.call_args_list for e in call[0][0]}
+
+    # Cambios hechos sin pasar por los hooks del índice (otro proceso). Un
+    # delete no mueve max(updated_at): el acierto se descarta al confirmarlo
+    await alert_repo.delete(deleted)
+    assert await triggered_alert_ids() == {deactivated.id}
+    assert len(index) == 2
+
+    await alert_repo.update(deactivated, is_active=False)
+    created = await alert_repo.create(user_id=user.id, field_id=field.id, event_type="helada", threshold=60.0)
+    assert await triggered_alert_ids() == {created.id}
+    assert [a.alert_id for a in index.match(field.id, "helada", 100.0)] == [created.id]
+
+
+async def test_evaluate_forecast_ignores_dates_outside_window(session):
+    weather = WeatherData(
+        field_id=uuid4(), event_type="helada",
+        probability=99.0, target_date=date.today() + timedelta(days=10),
+    )
+    with patch("app.services.evaluation_service.event_bus") as mock_bus:
+        mock_bus.emit_many = AsyncMock()
+        assert await EvaluationService(session).evaluate_forecast(weather) == 0
+        mock_bus.emit_many.assert_not_called()
+
+
+async def test_parallel_evaluation_matches_single_partition(session):
+    from app.tests.conftest import get_test_session_factory
+
+    user_repo = UserRepository(session)
+    user = await user_repo.create(name="Test User", phone="+5491100000037")
+
+    field_repo = FieldRepository(session)
+    weather_repo = WeatherRepository(session)
+    alert_repo = AlertRepository(session)
+    for i in range(6):
+        field = await field_repo.create(
+            user_id=user.id, name=f"Campo {i}",
+            latitude=-34.0, longitude=-58.0,
+        )
+        await weather_repo.create(
+            field_id=field.id, event_type="lluvia",
+            probability=80.0, target_date=date.today(),
+        )
+        await alert_repo.create(
+            user_id=user.id, field_id=field.id,
+            event_type="lluvia", threshold=50.0,
+        )
+
+    with patch("app.services.evaluation_service.async_session", get_test_session_factory()), \
+         patch("app.services.evaluation_service.event_bus") as mock_bus, \
+         patch("app.services.evaluation_service.flush_notifications", new_callable=AsyncMock) as mock_flush:
+        mock_bus.emit_many = AsyncMock()
+        service = EvaluationService(session, partitions=4)
+        triggered = await service.evaluate_all()
+
+        assert triggered == 6
+        assert sum(len(c[0][0]) for c in mock_bus.emit_many.call_args_list) == 6
+        # Todas las particiones se consolidan en un único flush
+        mock_flush.assert_called_once()
+
+
+async def test_numpy_engine_matches_sql_engine(session):
+    from sqlalchemy import delete
+    from app.models.alert_trigger import AlertTrigger
+    from app.models.notification import Notification
+
+    user_repo = UserRepository(session)
+    user = await user_repo.create(name="Test User", phone="+5491100000041")
+
+    field_repo = FieldRepository(session)
+    field = await field_repo.create(
+        user_id=user.id, name="Campo Test",
+        latitude=-34.0, longitude=-58.0,
+    )
+
+    weather_repo = WeatherRepository(session)
+    today = date.today()
+    for event_type, probability, days in [
+        ("lluvia", 85.0, 0), ("lluvia", 72.5, 1), ("lluvia", 40.0, 2),
+        ("helada", 70.0, 0), ("granizo", 99.0, 0), ("lluvia", 95.0, 9),
+    ]:
+        await weather_repo.create(
+            field_id=field.id, event_type=event_type,
+            probability=probability, target_date=today + timedelta(days=days),
+        )
+
+    alert_repo = AlertRepository(session)
+    for event_type, threshold in [("lluvia", 70.0), ("lluvia", 80.0), ("helada", 70.0), ("granizo", 50.0)]:
+        await alert_repo.create(
+            user_id=user.id, field_id=field.id,
+            event_type=event_type, threshold=threshold,
+        )
+    inactive = await alert_repo.create(
+        user_id=user.id, field_id=field.id, event_type="lluvia", threshold=10.0,
+    )
+    await alert_repo.update(inactive, is_active=False)
+
+    notification_repo = NotificationRepository(session)
+    outputs = {}
+    for engine in ("numpy", "sql"):
+        with patch("app.services.evaluation_service.event_bus") as mock_bus:
+            mock_bus.emit = AsyncMock()
+            assert await EvaluationService(session, engine=engine).evaluate_all() == 5
+            assert mock_bus.emit.call_args[0][0].by_event_type == {"lluvia": 3, "helada": 1, "granizo": 1}
+
+        notifications = await notification_repo.get_by_user(user.id)
+        outputs[engine] = sorted((n.alert_id, n.text) for n in notifications)
+        await session.execute(delete(Notification))
+        await session.execute(delete(AlertTrigger))
+        await session.commit()
+
+    assert outputs["numpy"] == outputs["sql"]
+
+
+async def test_incremental_numpy_tick_only_loads_changed_pairs(session):
+    from app.services import vectorized_evaluation
+
+    user_repo = UserRepository(session)
+    user = await user_repo.create(name="Test User", phone="+5491100000046")
+
+    field_repo = FieldRepository(session)
+    weather_repo = WeatherRepository(session)
+    alert_repo = AlertRepository(session)
+    today = date.today()
+    fields = []
+    for name in ("Campo A", "Campo B"):
+        field = await field_repo.create(user_id=user.id, name=name, latitude=-34.0, longitude=-58.0)
+        await weather_repo.create(field_id=field.id, event_type="lluvia", probability=85.0, target_date=today)
+        await alert_repo.create(user_id=user.id, field_id=field.id, event_type="lluvia", threshold=70.0)
+        fields.append(field)
+
+    loaded = []
+
+    async def spy(session, changed=None):
+        columns = await load_columns(session, changed)
+        loaded.append((len(columns[0]), len(columns[1])))
+        return columns
+
+    load_columns = vectorized_evaluation.load_columns
+    with patch("app.services.evaluation_service.event_bus") as mock_bus, \
+         patch.object(vectorized_evaluation, "load_columns", spy):
+        mock_bus.emit = AsyncMock()
+        service = EvaluationService(session, engine="numpy")
+
+        # Primera ejecución: reconciliación completa
+        assert await service.evaluate_incremental() == 2
+
+        await weather_repo.create(
+            field_id=fields[1].id, event_type="lluvia",
+            probability=90.0, target_date=today + timedelta(days=1),
+        )
+        assert await service.evaluate_incremental() == 1
+
+    # Solo la alerta y el pronóstico nuevos del campo B
+    assert loaded == [(2, 2), (1, 1)]
+
+
+async def test_digest_creates_one_notification_per_user_in_every_engine(session):
+    from sqlalchemy import delete
+    from app.events.event_bus import EventBus
+    from app.events.handlers import register_handlers
+    from app.models.alert_trigger import AlertTrigger
+    from app.models.notification import Notification
+    from app.tests.conftest import get_test_session_factory
+
+    user_repo = UserRepository(session)
+    user = await user_repo.create(name="Test User", phone="+5491100000044")
+
+    field_repo = FieldRepository(session)
+    weather_repo = WeatherRepository(session)
+    alert_repo = AlertRepository(session)
+    for i in range(3):
+        field = await field_repo.create(
+            user_id=user.id, name=f"Campo {i}",
+            latitude=-34.0, longitude=-58.0,
+        )
+        for days in range(4):
+            await weather_repo.create(
+                field_id=field.id, event_type="helada",
+                probability=60.0 + 10 * i + days, target_date=date.today() + timedelta(days=days),
+            )
+        await alert_repo.create(
+            user_id=user.id, field_id=field.id,
+            event_type="helada", threshold=50.0,
+        )
+
+    bus = EventBus()
+    register_handlers(bus)
+    notification_repo = NotificationRepository(session)
+    outputs = {}
+    with patch("app.services.evaluation_service.settings.NOTIFICATION_DIGEST", "user"), \
+         patch("app.services.evaluation_service.event_bus", bus), \
+         patch("app.events.handlers.notification_handler.async_session", get_test_session_factory()):
+        for engine in ("python", "sql", "numpy"):
+            assert await EvaluationService(session, engine=engine, batch_size=5).evaluate_all() == 12
+
+            notifications = await notification_repo.get_by_user(user.id)
+            outputs[engine] = [(n.alert_id, n.text) for n in notifications]
+            await session.execute(delete(Notification))
+            await session.execute(delete(AlertTrigger))
+            await session.commit()
+
+    # 12 disparos, un solo mensaje, el mismo en los tres motores
+    assert len(outputs["python"]) == 1
+    assert outputs["python"] == outputs["sql"] == outputs["numpy"]
+    assert outputs["python"][0][1].startswith("📋 Resumen: 12 alertas disparadas")
+
+
+async def test_digest_run_is_not_split_by_shared_batcher_flushes(session):
+    from sqlalchemy import delete
+    from app.events.event_bus import EventBus, DIRECT, QUEUE
+    from app.events.handlers import register_handlers
+    from app.events.handlers.notification_handler import notification_batcher
+    from app.models.alert_trigger import AlertTrigger
+    from app.models.notification import Notification
+    from app.tests.conftest import get_test_session_factory
+
+    user = await UserRepository(session).create(name="Test User", phone="+5491100000045")
+    field = await FieldRepository(session).create(
+        user_id=user.id, name="Campo Test",
+        latitude=-34.0, longitude=-58.0,
+    )
+    weather_repo = WeatherRepository(session)
+    for days in range(5):
+        await weather_repo.create(
+            field_id=field.id, event_type="helada",
+            probability=70.0 + days, target_date=date.today() + timedelta(days=days),
+        )
+    await AlertRepository(session).create(
+        user_id=user.id, field_id=field.id,
+        event_type="helada", threshold=50.0,
+    )
+
+    notification_repo = NotificationRepository(session)
+    # El batcher compartido se vaciaría a las 3 filas y cada lote trae 2
+    with patch("app.services.evaluation_service.settings.NOTIFICATION_DIGEST", "user"), \
+         patch.object(notification_batcher, "max_batch_size", 3), \
+         patch("app.events.handlers.notification_handler.async_session", get_test_session_factory()):
+        for mode in (DIRECT, QUEUE):
+            bus = EventBus(mode=mode, queue_size=1, workers=2)
+            register_handlers(bus)
+            await bus.start()
+            try:
+                with patch("app.services.evaluation_service.event_bus", bus):
+                    assert await EvaluationService(session, batch_size=2).evaluate_all() == 5
+            finally:
+                await bus.stop()
+
+            notifications = await notification_repo.get_by_user(user.id)
+            assert len(notifications) == 1, mode
+            assert notifications[0].text.startswith("📋 Resumen: 5 alertas disparadas")
+            assert len(notification_batcher) == 0
+            await session.execute(delete(Notification))
+            await session.execute(delete(AlertTrigger))
+            await session.commit()
+
+
+async def test_evaluation_with_queued_event_bus_waits_for_handlers(session):
+    from app.events.event_bus import EventBus, QUEUE
+    from app.events.handlers import register_handlers
+    from app.tests.conftest import get_test_session_factory
+
+    user_repo = UserRepository(session)
+    user = await user_repo.create(name="Test User", phone="+5491100000042")
+
+    field_repo = FieldRepository(session)
+    field = await field_repo.create(
+        user_id=user.id, name="Campo Test",
+        latitude=-34.0, longitude=-58.0,
+    )
+
+    weather_repo = WeatherRepository(session)
+    alert_repo = AlertRepository(session)
+    for i in range(3):
+        await weather_repo.create(
+            field_id=field.id, event_type="helada",
+            probability=80.0, target_date=date.today() + timedelta(days=i),
+        )
+    await alert_repo.create(
+        user_id=user.id, field_id=field.id,
+        event_type="helada", threshold=50.0,
+    )
+
+    bus = EventBus(mode=QUEUE, queue_size=1, workers=2)
+    register_handlers(bus)
+    await bus.start()
+    try:
+        with patch("app.services.evaluation_service.event_bus", bus), \
+             patch("app.events.handlers.notification_handler.async_session", get_test_session_factory()):
+            assert await EvaluationService(session, batch_size=1).evaluate_all() == 3
+    finally:
+        await bus.stop()
+
+    notifications = await NotificationRepository(session).get_by_user(user.id)
+    assert len(notifications) == 3
+
+
+async def test_outbox_delivery_writes_events_and_dispatcher_notifies(session):
+    from app.events.event_bus import EventBus
+    from app.events.handlers import register_handlers
+    from app.events.outbox import OutboxDispatcher
+    from app.repositories.outbox_repo import OutboxRepository
+    from app.tests.conftest import get_test_session_factory
+
+    user_repo = UserRepository(session)
+    user = await user_repo.create(name="Test User", phone="+5491100000043")
+
+    field_repo = FieldRepository(session)
+    field = await field_repo.create(
+        user_id=user.id, name="Campo Test",
+        latitude=-34.0, longitude=-58.0,
+    )
+
+    weather_repo = WeatherRepository(session)
+    for i in range(3):
+        await weather_repo.create(
+            field_id=field.id, event_type="granizo",
+            probability=90.0, target_date=date.today() + timedelta(days=i),
+        )
+    await AlertRepository(session).create(
+        user_id=user.id, field_id=field.id,
+        event_type="granizo", threshold=60.0,
+    )
+
+    with patch("app.services.evaluation_service.settings.EVENT_DELIVERY", "outbox"), \
+         patch("app.services.evaluation_service.event_bus") as mock_bus:
+        mock_bus.emit_many = AsyncMock()
+        assert await EvaluationService(session).evaluate_all() == 3
+        mock_bus.emit_many.assert_not_called()
+
+    outbox = OutboxRepository(session)
+    assert await outbox.count_pending() == 3
+
+    bus = EventBus()
+    register_handlers(bus)
+    factory = get_test_session_factory()
+    with patch("app.events.outbox.async_session", factory), \
+         patch("app.events.handlers.notification_handler.async_session", factory):
+        dispatcher = OutboxDispatcher(bus, batch_size=2)
+        assert await dispatcher.dispatch_once() == 2
+        assert await dispatcher.dispatch_once() == 1
+        assert await dispatcher.dispatch_once() == 0
+
+    assert await outbox.count_pending() == 0
+    notifications = await NotificationRepository(session).get_by_user(user.id)
+    assert len(notifications) == 3
+
+
+async def test_outbox_keeps_events_with_failed_handlers_pending(session):
+    from sqlalchemy import select, update
+    from app.events.event_bus import EventBus
+    from app.events.events import AlertTriggeredEvent
+    from app.events.outbox import OutboxDispatcher
+    from app.models.event_outbox import EventOutbox
+    from app.repositories.outbox_repo import OutboxRepository
+    from app.tests.conftest import get_test_session_factory
+
+    events = [
+        AlertTriggeredEvent(
+            alert_id=uuid4(), user_id=uuid4(), field_id=uuid4(), event_type="granizo",
+            threshold=60.0, actual_value=90.0, target_date=date.today(),
+        )
+        for _ in range(3)
+    ]
+    outbox = OutboxRepository(session)
+    await outbox.add_many(events)
+    await session.commit()
+
+    broken = {events[0].alert_id}
+
+    async def fails_for_first(event):
+        if event.alert_id in broken:
+            raise RuntimeError("proveedor caído")
+
+    bus = EventBus()
+    bus.subscribe(AlertTriggeredEvent, fails_for_first)
+    with patch("app.events.outbox.async_session", get_test_session_factory()), \
+         patch("app.events.outbox.flush_notifications", new_callable=AsyncMock):
+        dispatcher = OutboxDispatcher(bus, batch_size=10)
+        assert await dispatcher.dispatch_once() == 3
+        # El fallido espera su backoff: no se vuelve a tomar enseguida
+        assert await dispatcher.dispatch_once() == 0
+
+        pending = (await session.execute(
+            select(EventOutbox).where(EventOutbox.delivered_at.is_(None))
+        )).scalars().all()
+        assert [row.payload["alert_id"] for row in pending] == [str(events[0].alert_id)]
+        assert pending[0].attempts == 1
+        assert "proveedor caído" in pending[0].last_error
+
+        # Vencido el backoff se reintenta y, si el handler anda, se entrega
+        await session.execute(update(EventOutbox).values(next_attempt_at=None))
+        await session.commit()
+        broken.clear()
+        assert await dispatcher.dispatch_once() == 1
+
+    assert await outbox.count_pending() == 0
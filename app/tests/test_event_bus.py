@@ -47,4 +47,166 @@ async def test_event_bus_no_handlers():
         actual_value=90.0, target_date=date.today(),
     )
 
-    await bus.emit(event)
\ No newline at end of file
+    await bus.emit(event)
+
+
+def _event():
+    return AlertTriggeredEvent(
+        alert_id=uuid4(), user_id=uuid4(), field_id=uuid4(),
+        event_type="lluvia", threshold=70.0,
+        actual_value=85.0, target_date=date.today(),
+    )
+
+
+async def test_event_bus_isolates_handler_errors():
+    bus = EventBus()
+    async def failing(event):
+        raise RuntimeError("boom")
+
+    handler = AsyncMock()
+    bus.subscribe(AlertTriggeredEvent, failing)
+    bus.subscribe(AlertTriggeredEvent, handler)
+
+    event = _event()
+    failures = await bus.emit(event)
+
+    handler.assert_called_once_with(event)
+    assert len(failures) == 1
+    assert failures[0].handler == "failing"
+    assert isinstance(failures[0].error, RuntimeError)
+
+
+async def test_event_bus_runs_concurrent_handlers_in_parallel():
+    import asyncio
+    import time
+    from app.events.event_bus import CONCURRENT, handler_mode
+
+    bus = EventBus()
+
+    @handler_mode(CONCURRENT)
+    async def slow_a(event):
+        await asyncio.sleep(0.1)
+
+    @handler_mode(CONCURRENT)
+    async def slow_b(event):
+        await asyncio.sleep(0.1)
+
+    bus.subscribe(AlertTriggeredEvent, slow_a)
+    bus.subscribe(AlertTriggeredEvent, slow_b)
+
+    started = time.perf_counter()
+    assert await bus.emit(_event()) == []
+    assert time.perf_counter() - started < 0.18
+
+
+async def test_event_bus_handler_timeout_is_reported():
+    import asyncio
+    from app.events.event_bus import CONCURRENT
+
+    bus = EventBus()
+
+    async def hangs(event):
+        await asyncio.sleep(10)
+
+    handler = AsyncMock()
+    bus.subscribe(AlertTriggeredEvent, hangs, mode=CONCURRENT, timeout=0.05)
+    bus.subscribe(AlertTriggeredEvent, handler)
+
+    failures = await bus.emit(_event())
+
+    handler.assert_called_once()
+    assert [f.handler for f in failures] == ["hangs"]
+    assert isinstance(failures[0].error, asyncio.TimeoutError)
+
+
+async def test_emit_many_calls_batch_handlers_once():
+    from app.events.event_bus import batch_handler
+
+    bus = EventBus()
+    received = []
+
+    @batch_handler
+    async def collect(events):
+        received.append(events)
+
+    single = AsyncMock()
+    bus.subscribe(AlertTriggeredEvent, collect)
+    bus.subscribe(AlertTriggeredEvent, single)
+
+    events = [_event() for _ in range(3)]
+    assert await bus.emit_many(events) == []
+
+    # El handler batch recibe el lote entero; el de a un evento, cada ítem
+    assert received == [events]
+    assert [c.args[0] for c in single.call_args_list] == events
+
+
+async def test_emit_passes_single_event_list_to_batch_handler():
+    bus = EventBus()
+    handler = AsyncMock()
+    bus.subscribe(AlertTriggeredEvent, handler, batch=True)
+
+    event = _event()
+    await bus.emit(event)
+
+    handler.assert_called_once_with([event])
+
+
+async def test_queue_mode_dispatches_through_workers():
+    import asyncio
+    from app.events.event_bus import QUEUE
+
+    bus = EventBus(mode=QUEUE, queue_size=10, workers=2)
+    received = []
+
+    async def handler(event):
+        await asyncio.sleep(0.01)
+        received.append(event)
+
+    bus.subscribe(AlertTriggeredEvent, handler)
+    await bus.start()
+    try:
+        events = [_event() for _ in range(5)]
+        await bus.emit_many(events[:3])
+        await bus.emit(events[3])
+        await bus.emit(events[4])
+        assert len(received) < 5
+
+        await bus.join()
+        assert sorted(map(id, received)) == sorted(map(id, events))
+    finally:
+        await bus.stop()
+    assert not bus.running
+
+
+async def test_queue_mode_applies_backpressure_and_drains_on_stop():
+    import asyncio
+    from app.events.event_bus import QUEUE
+    from app.metrics import metrics
+
+    metrics.reset()
+    bus = EventBus(mode=QUEUE, queue_size=1, workers=1)
+    release = asyncio.Event()
+    received = []
+
+    async def handler(event):
+        await release.wait()
+        received.append(event)
+
+    bus.subscribe(AlertTriggeredEvent, handler)
+    await bus.start()
+
+    await bus.emit(_event())  # lo toma el worker y queda bloqueado
+    await asyncio.sleep(0)
+    await bus.emit(_event())  # ocupa el único lugar de la cola
+
+    blocked = asyncio.create_task(bus.emit(_event()))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+
+    release.set()
+    await blocked
+    await bus.stop()
+
+    assert len(received) == 3
+    assert metrics.snapshot()["summaries"]["event_bus_backpressure_seconds"]["count"] == 1
@@ -1,6 +1,7 @@
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
+import asyncio
 import pytest
 import logging
 from uuid import uuid4
@@ -10,16 +11,27 @@ from unittest.mock import patch, AsyncMock, MagicMock
 from app.events.events import AlertTriggeredEvent
 from app.events.handlers.notification_handler import (
     handle_alert_triggered,
+    handle_alerts_triggered,
     flush_notifications,
-    _pending_notifications,
+    notification_batcher,
+    shutdown_notifications,
+    NotificationBatcher,
 )
 
 
+def _ledger_claiming_all():
+    ledger = MagicMock()
+    ledger.claim = AsyncMock(side_effect=lambda rows: list(rows))
+    return ledger
+
+
 @pytest.fixture(autouse=True)
-def clear_pending():
-    _pending_notifications.clear()
+async def clear_pending():
+    notification_batcher.clear()
     yield
-    _pending_notifications.clear()
+    notification_batcher.clear()
+    # Deja que el timer cancelado termine dentro del loop del test
+    await asyncio.sleep(0)
 
 
 async def test_handle_alert_triggered_appends_to_pending():
@@ -35,12 +47,12 @@ async def test_handle_alert_triggered_appends_to_pending():
 
     await handle_alert_triggered(event)
 
-    assert len(_pending_notifications) == 1
-    notif = _pending_notifications[0]
+    assert len(notification_batcher) == 1
+    notif = notification_batcher.pending[0]
     assert notif["user_id"] == event.user_id
     assert notif["alert_id"] == event.alert_id
-    assert "frost" in notif["message"]
-    assert "90.0%" in notif["message"]
+    assert notif["event_type"] == "frost"
+    assert notif["actual_value"] == 90.0
 
 
 async def test_handle_alert_triggered_accumulates_multiple():
@@ -56,7 +68,27 @@ async def test_handle_alert_triggered_accumulates_multiple():
         )
         await handle_alert_triggered(event)
 
-    assert len(_pending_notifications) == 3
+    assert len(notification_batcher) == 3
+
+
+async def test_handle_alerts_triggered_builds_batch_payload():
+    events = [
+        AlertTriggeredEvent(
+            alert_id=uuid4(),
+            user_id=uuid4(),
+            field_id=uuid4(),
+            event_type="frost",
+            threshold=50.0,
+            actual_value=60.0 + i,
+            target_date=date(2025, 1, 15),
+        )
+        for i in range(3)
+    ]
+
+    await handle_alerts_triggered(events)
+
+    assert [n["alert_id"] for n in notification_batcher.pending] == [e.alert_id for e in events]
+    assert notification_batcher.pending[2]["actual_value"] == 62.0
 
 
 async def test_flush_notifications_calls_bulk_create():
@@ -70,7 +102,7 @@ async def test_flush_notifications_calls_bulk_create():
         target_date=date(2025, 2, 10),
     )
     await handle_alert_triggered(event)
-    assert len(_pending_notifications) == 1
+    assert len(notification_batcher) == 1
 
     mock_repo_instance = AsyncMock()
     mock_repo_instance.bulk_create = AsyncMock()
@@ -84,26 +116,28 @@ async def test_flush_notifications_calls_bulk_create():
     )
 
     import app.repositories.notification_repo as repo_mod
+    import app.repositories.alert_trigger_repo as ledger_mod
     import app.events.handlers.notification_handler as handler_mod
 
     original_class = repo_mod.NotificationRepository
+    original_ledger = ledger_mod.AlertTriggerRepository
     original_session = handler_mod.async_session
 
     repo_mod.NotificationRepository = MagicMock(return_value=mock_repo_instance)
+    ledger_mod.AlertTriggerRepository = MagicMock(return_value=_ledger_claiming_all())
     handler_mod.async_session = mock_async_session
 
     try:
         count = await flush_notifications()
     finally:
         repo_mod.NotificationRepository = original_class
+        ledger_mod.AlertTriggerRepository = original_ledger
         handler_mod.async_session = original_session
 
     assert count == 1
     mock_repo_instance.bulk_create.assert_called_once()
 
-    # Re-importar para ver el estado actual del módulo
-    from app.events.handlers.notification_handler import _pending_notifications as current
-    assert len(current) == 0
+    assert len(notification_batcher) == 0
 
 
 async def test_flush_notifications_empty_noop():
@@ -131,7 +165,8 @@ async def test_flush_notifications_logs(caplog):
     mock_session_cm.__aenter__ = AsyncMock(return_value=mock_session)
     mock_session_cm.__aexit__ = AsyncMock(return_value=False)
 
-    with patch("app.events.handlers.notification_handler.async_session", return_value=mock_session_cm):
+    with patch("app.events.handlers.notification_handler.async_session", return_value=mock_session_cm), \
+         patch("app.repositories.alert_trigger_repo.AlertTriggerRepository", return_value=_ledger_claiming_all()):
         import app.repositories.notification_repo as repo_mod
         original_class = repo_mod.NotificationRepository
         repo_mod.NotificationRepository = MagicMock(return_value=mock_repo_instance)
@@ -141,4 +176,140 @@ async def test_flush_notifications_logs(caplog):
         finally:
             repo_mod.NotificationRepository = original_class
 
-    assert any("Bulk insert" in record.message for record in caplog.records)
\ No newline at end of file
+    assert any("Bulk insert" in record.message for record in caplog.records)
+
+
+async def test_flush_notifications_skips_already_notified():
+    event = AlertTriggeredEvent(
+        alert_id=uuid4(),
+        user_id=uuid4(),
+        field_id=uuid4(),
+        event_type="hail",
+        threshold=50.0,
+        actual_value=65.0,
+        target_date=date(2025, 2, 10),
+    )
+    await handle_alert_triggered(event)
+
+    mock_repo_instance = AsyncMock()
+    mock_ledger = MagicMock()
+    mock_ledger.claim = AsyncMock(return_value=[])
+
+    mock_session_cm = AsyncMock()
+    mock_session_cm.__aenter__ = AsyncMock(return_value=AsyncMock())
+    mock_session_cm.__aexit__ = AsyncMock(return_value=False)
+
+    with patch("app.events.handlers.notification_handler.async_session", return_value=mock_session_cm), \
+         patch("app.repositories.alert_trigger_repo.AlertTriggerRepository", return_value=mock_ledger), \
+         patch("app.repositories.notification_repo.NotificationRepository", return_value=mock_repo_instance):
+        count = await flush_notifications()
+
+    assert count == 0
+    mock_repo_instance.bulk_create.assert_called_once_with([])
+
+
+class _RecordingBatcher(NotificationBatcher):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.inserted = []
+
+    async def _insert(self, pending):
+        await asyncio.sleep(0.01)
+        self.inserted.append(list(pending))
+        return len(pending)
+
+
+def _rows(n):
+    return [{"user_id": uuid4(), "alert_id": uuid4(), "message": "m"} for _ in range(n)]
+
+
+async def test_batcher_flushes_on_size_threshold():
+    batcher = _RecordingBatcher(max_batch_size=3, max_delay_seconds=0)
+    await batcher.add_many(_rows(2))
+    assert batcher.inserted == []
+
+    await batcher.add_many(_rows(2))
+    assert [len(batch) for batch in batcher.inserted] == [4]
+    assert len(batcher) == 0
+    assert batcher.stats.flushes == 1
+    assert batcher.stats.peak_batch_size == 4
+
+
+async def test_batcher_flushes_on_time_threshold():
+    batcher = _RecordingBatcher(max_batch_size=100, max_delay_seconds=0.05)
+    await batcher.add_many(_rows(2))
+    assert batcher.inserted == []
+
+    await asyncio.sleep(0.1)
+    assert [len(batch) for batch in batcher.inserted] == [2]
+
+
+class _FailingBatcher(NotificationBatcher):
+    def __init__(self, error, **kwargs):
+        super().__init__(**kwargs)
+        self.error = error
+
+    async def _insert(self, pending):
+        raise self.error
+
+
+async def test_batcher_drops_rows_after_max_attempts():
+    batcher = _FailingBatcher(RuntimeError("insert or update violates foreign key"), max_delay_seconds=0, max_attempts=2)
+    await batcher.add_many(_rows(2))
+
+    with pytest.raises(RuntimeError):
+        await batcher.flush()
+    assert len(batcher) == 2
+
+    # Las filas nuevas no heredan los intentos de las que fallaron antes
+    await batcher.add_many(_rows(1))
+    with pytest.raises(RuntimeError):
+        await batcher.flush()
+    assert len(batcher) == 1
+    assert batcher.pending[0]["flush_attempts"] == 1
+
+
+async def test_batcher_keeps_rows_when_flush_is_cancelled():
+    batcher = _FailingBatcher(asyncio.CancelledError(), max_delay_seconds=0, max_attempts=1)
+    await batcher.add_many(_rows(3))
+
+    with pytest.raises(asyncio.CancelledError):
+        await batcher.flush()
+    assert len(batcher) == 3
+
+
+async def test_batcher_concurrent_flushes_do_not_lose_or_duplicate_rows():
+    batcher = _RecordingBatcher(max_batch_size=100, max_delay_seconds=0)
+    rows = _rows(6)
+
+    async def producer(chunk):
+        await batcher.add_many(chunk)
+        await batcher.flush()
+
+    await asyncio.gather(producer(rows[:2]), producer(rows[2:4]), producer(rows[4:]))
+
+    inserted = [row for batch in batcher.inserted for row in batch]
+    assert sorted(map(id, inserted)) == sorted(map(id, rows))
+    assert batcher.stats.rows == 6
+
+
+async def test_shutdown_drains_queue_and_flushes_notifications():
+    from app.events.event_bus import EventBus, QUEUE
+
+    bus = EventBus(mode=QUEUE, queue_size=10, workers=1)
+    bus.subscribe(AlertTriggeredEvent, handle_alerts_triggered)
+    await bus.start()
+    await bus.emit_many([
+        AlertTriggeredEvent(
+            alert_id=uuid4(), user_id=uuid4(), field_id=uuid4(), event_type="hail",
+            threshold=50.0, actual_value=65.0, target_date=date(2025, 2, 10),
+        )
+        for _ in range(2)
+    ])
+
+    with patch.object(notification_batcher, "_insert", AsyncMock(side_effect=lambda rows: len(rows))) as insert:
+        await shutdown_notifications(bus)
+
+    assert not bus.running
+    assert len(insert.call_args[0][0]) == 2
+    assert len(notification_batcher) == 0
@@ -15,4 +15,59 @@ async def test_evaluation_job_calls_service(session):
         service = EvaluationService(session)
         await service.evaluate_all()
 
-        mock_eval.assert_called_once()
\ No newline at end of file
+        mock_eval.assert_called_once()
+
+
+async def test_evaluation_tick_skips_without_lease():
+    from app.jobs import evaluate_alerts
+
+    with patch.object(evaluate_alerts.evaluation_leader, "try_acquire", new_callable=AsyncMock, return_value=False), \
+         patch("app.jobs.evaluate_alerts.evaluate_once", new_callable=AsyncMock) as mock_eval:
+        await evaluate_alerts.evaluation_tick()
+
+    mock_eval.assert_not_called()
+
+
+async def test_evaluation_job_releases_lease_on_cancel():
+    import asyncio
+    from app.jobs import evaluate_alerts
+
+    with patch.object(evaluate_alerts.evaluation_leader, "run_heartbeat", new_callable=AsyncMock), \
+         patch.object(evaluate_alerts.evaluation_leader, "release", new_callable=AsyncMock) as mock_release, \
+         patch("app.jobs.scheduler.JobScheduler.run_forever", new_callable=AsyncMock, side_effect=asyncio.CancelledError):
+        with pytest.raises(asyncio.CancelledError):
+            await evaluate_alerts.run_evaluation_job()
+
+    mock_release.assert_called_once()
+    assert evaluate_alerts.evaluation_scheduler is None
+    assert evaluate_alerts.evaluation_leader.on_run_requested is None
+
+
+async def test_evaluation_job_releases_lease_after_heartbeat_stops():
+    import asyncio
+    from app.jobs import evaluate_alerts
+
+    events = []
+
+    async def heartbeat():
+        try:
+            await asyncio.sleep(10)
+        finally:
+            # Renovación en vuelo al momento de cancelar
+            await asyncio.sleep(0.01)
+            events.append("heartbeat")
+
+    async def run_forever():
+        await asyncio.sleep(0.01)
+        raise asyncio.CancelledError
+
+    async def release():
+        events.append("release")
+
+    with patch.object(evaluate_alerts.evaluation_leader, "run_heartbeat", heartbeat), \
+         patch.object(evaluate_alerts.evaluation_leader, "release", release), \
+         patch("app.jobs.scheduler.JobScheduler.run_forever", side_effect=run_forever):
+        with pytest.raises(asyncio.CancelledError):
+            await evaluate_alerts.run_evaluation_job()
+
+    assert events == ["heartbeat", "release"]
@@ -0,0 +1,64 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from sqlalchemy import update, func, text
+
+from app.models.job_lease import JobLease
+from app.repositories.job_lease_repo import JobLeaseRepository
+
+
+async def test_first_worker_acquires_lease(session):
+    repo = JobLeaseRepository(session)
+    assert await repo.try_acquire("job", "worker-a", ttl_seconds=30) is True
+    assert await repo.try_acquire("job", "worker-b", ttl_seconds=30) is False
+
+    lease = await repo.get("job")
+    assert lease.holder == "worker-a"
+
+
+async def test_holder_renews_without_changing_acquired_at(session):
+    repo = JobLeaseRepository(session)
+    await repo.try_acquire("job", "worker-a", ttl_seconds=30)
+    first = await repo.get("job")
+    acquired_at, expires_at = first.acquired_at, first.expires_at
+
+    assert await repo.try_acquire("job", "worker-a", ttl_seconds=60) is True
+    renewed = await repo.get("job")
+    assert renewed.acquired_at == acquired_at
+    assert renewed.expires_at > expires_at
+
+
+async def test_expired_lease_is_taken_over(session):
+    repo = JobLeaseRepository(session)
+    await repo.try_acquire("job", "worker-a", ttl_seconds=30)
+    await session.execute(
+        update(JobLease).values(expires_at=func.now() - text("interval '1 second'"))
+    )
+    await session.commit()
+
+    assert await repo.try_acquire("job", "worker-b", ttl_seconds=30) is True
+    assert (await repo.get("job")).holder == "worker-b"
+
+
+async def test_release_and_mark_run(session):
+    repo = JobLeaseRepository(session)
+    await repo.try_acquire("job", "worker-a", ttl_seconds=30)
+    await repo.mark_run("job", "worker-a")
+    await repo.release("job", "worker-a")
+
+    lease = await repo.get("job")
+    assert lease.holder is None
+    assert lease.last_run_holder == "worker-a"
+    assert lease.last_run_at is not None
+    assert await repo.try_acquire("job", "worker-b", ttl_seconds=30) is True
+
+
+async def test_run_request_is_consumed_only_by_holder(session):
+    repo = JobLeaseRepository(session)
+    await repo.try_acquire("job", "worker-a", ttl_seconds=30)
+    await repo.request_run("job")
+
+    assert await repo.consume_run_request("job", "worker-b") is False
+    assert await repo.consume_run_request("job", "worker-a") is True
+    assert await repo.consume_run_request("job", "worker-a") is False
+    assert (await repo.get("job")).run_requested_at is None
@@ -0,0 +1,83 @@
+from datetime import date, timedelta
+from uuid import uuid4
+
+from app.models.user import User
+from app.models.field import Field
+from app.services.notification_digest import (
+    ALERT, OFF, USER, MAX_MESSAGE_LENGTH, DigestLine, build_notification_rows, format_digest_message,
+)
+
+
+def _trigger(user_id, alert_id, field_id, probability, days, event_type="helada"):
+    return {
+        "user_id": user_id, "alert_id": alert_id, "field_id": field_id,
+        "event_type": event_type, "threshold": 50.0, "actual_value": probability,
+        "target_date": date.today() + timedelta(days=days),
+    }
+
+
+async def _field(session, name):
+    user = User(name=f"Digest {name}", phone=f"+54911{uuid4().int % 10**8:08d}")
+    session.add(user)
+    await session.flush()
+    field = Field(name=name, latitude=-31.0, longitude=-64.0, user_id=user.id)
+    session.add(field)
+    await session.flush()
+    return field
+
+
+async def test_digest_groups_triggers_by_user(session):
+    north, south = await _field(session, "Campo Norte"), await _field(session, "Campo Sur")
+    user, other = uuid4(), uuid4()
+    frost, hail = uuid4(), uuid4()
+    triggers = [
+        _trigger(user, frost, north.id, 70.0, 0),
+        _trigger(user, frost, north.id, 85.0, 1),
+        _trigger(user, hail, south.id, 90.0, 2, event_type="granizo"),
+        _trigger(other, uuid4(), south.id, 60.0, 0),
+    ]
+
+    rows = await build_notification_rows(session, triggers, USER)
+
+    assert len(rows) == 2
+    digest = next(r for r in rows if r["user_id"] == user)
+    # La alerta representativa es la del pico más alto
+    assert digest["alert_id"] == hail
+    assert digest["message"].splitlines() == [
+        "📋 Resumen: 3 alertas disparadas",
+        f"• Campo Sur — granizo (umbral 50.0%): pico 90.0% el {date.today() + timedelta(days=2)}",
+        f"• Campo Norte — helada (umbral 50.0%): pico 85.0% el {date.today()}, {date.today() + timedelta(days=1)}",
+    ]
+    assert (digest["event_type"], digest["actual_value"]) == ("granizo", 90.0)
+    # Un grupo de un solo disparo queda como una notificación común
+    single = next(r for r in rows if r["user_id"] == other)
+    assert single["message"] is None
+    assert single["actual_value"] == 60.0
+
+
+async def test_digest_by_alert_and_off(session):
+    field = await _field(session, "Campo Norte")
+    user, frost, hail = uuid4(), uuid4(), uuid4()
+    triggers = [
+        _trigger(user, frost, field.id, 70.0, 0),
+        _trigger(user, frost, field.id, 85.0, 1),
+        _trigger(user, hail, field.id, 90.0, 0, event_type="granizo"),
+    ]
+
+    assert sorted(r["alert_id"] == frost for r in await build_notification_rows(session, triggers, ALERT)) == [False, True]
+    assert len(await build_notification_rows(session, triggers, OFF)) == 3
+
+
+def test_digest_message_is_truncated():
+    lines = [
+        DigestLine(alert_id=uuid4(), field_id=uuid4(), event_type="helada", threshold=50.0,
+                   peak=80.0, dates={date.today() + timedelta(days=d) for d in range(7)})
+        for _ in range(20)
+    ]
+
+    message = format_digest_message(lines, {})
+
+    assert len(message) <= MAX_MESSAGE_LENGTH
+    assert message.splitlines()[-1].startswith("• … y ")
+    shown = len(message.splitlines()) - 2
+    assert message.splitlines()[-1] == f"• … y {20 - shown} más"
@@ -61,4 +61,145 @@ async def test_mark_as_read(session):
     assert notif.is_read is False
 
     updated = await repo.mark_as_read(notif)
-    assert updated.is_read is True
\ No newline at end of file
+    assert updated.is_read is True
+
+async def test_mark_all_read_moves_watermark_forward(session):
+    user, alert = await _setup_alert(session)
+    repo = NotificationRepository(session)
+    old = await repo.create(user_id=user.id, alert_id=alert.id, message="Vieja")
+    await repo.create(user_id=user.id, alert_id=alert.id, message="Nueva")
+
+    # Hasta la vieja: la nueva sigue sin leer
+    assert await repo.mark_all_read(user.id, until=old.created_at) == old.created_at
+    unread = await repo.get_by_user(user.id, unread_only=True, read_until=old.created_at)
+    assert [n.message for n in unread] == ["Nueva"]
+
+    # Sin `until` llega a la más nueva; la marca no retrocede
+    read_until = await repo.mark_all_read(user.id)
+    assert await repo.get_by_user(user.id, unread_only=True, read_until=read_until) == []
+    assert await repo.mark_all_read(user.id, until=old.created_at) == read_until
+
+
+async def test_mark_all_read_keeps_notifications_committed_late_unread(session):
+    import asyncio
+    from sqlalchemy import text
+    from app.models.notification import Notification
+    from app.tests.conftest import get_test_session_factory
+
+    user, alert = await _setup_alert(session)
+    await session.commit()
+    repo = NotificationRepository(session)
+
+    async with get_test_session_factory()() as batch:
+        # Transacción de lote que empieza antes de la notificación que el usuario ve
+        await batch.execute(text("SELECT 1"))
+        await repo.create(user_id=user.id, alert_id=alert.id, message="Vista")
+
+        batch.add(Notification(user_id=user.id, alert_id=alert.id, message="Tardía"))
+        await batch.flush()
+        # "Marcar todas" corre mientras el lote todavía no confirmó
+        mark = asyncio.create_task(repo.mark_all_read(user.id))
+        await asyncio.sleep(0.1)
+        await batch.commit()
+        read_until = await mark
+
+    unread = await repo.get_by_user(user.id, unread_only=True, read_until=read_until)
+    assert [n.message for n in unread] == ["Tardía"]
+    assert await repo.unread_count(user.id) == 1
+
+
+@pytest.mark.parametrize("method", ["orm", "copy"])
+async def test_bulk_create_methods_insert_all_rows(session, method):
+    user, alert = await _setup_alert(session)
+    repo = NotificationRepository(session)
+    await repo.bulk_create(
+        [{"user_id": user.id, "alert_id": alert.id, "message": f"Notif {i}"} for i in range(5)],
+        method=method,
+    )
+
+    notifications = await repo.get_by_user(user.id, limit=10)
+    assert sorted(n.message for n in notifications) == [f"Notif {i}" for i in range(5)]
+    assert all(n.is_read is False and n.created_at is not None for n in notifications)
+
+
+@pytest.mark.parametrize("method", ["orm", "copy"])
+async def test_bulk_create_stores_structured_fields(session, method):
+    from datetime import date
+
+    user, alert = await _setup_alert(session)
+    repo = NotificationRepository(session)
+    await repo.bulk_create(
+        [{
+            "user_id": user.id, "alert_id": alert.id, "event_type": "frost",
+            "actual_value": 85.0, "threshold": 80.0, "target_date": date(2025, 1, 15),
+        }],
+        method=method,
+    )
+
+    [notification] = await repo.get_by_user(user.id)
+    assert notification.message is None
+    assert notification.text == (
+        "⚠️ Alerta: frost detectada con 85.0% de probabilidad "
+        "(umbral configurado: 80.0%) para el día 2025-01-15"
+    )
+
+
+@pytest.mark.parametrize("method", ["orm", "copy"])
+async def test_unread_counter_is_maintained_by_triggers(session, method):
+    user, alert = await _setup_alert(session)
+    repo = NotificationRepository(session)
+    assert await repo.unread_count(user.id) == 0
+
+    await repo.bulk_create(
+        [{"user_id": user.id, "alert_id": alert.id, "message": f"Notif {i}"} for i in range(5)],
+        method=method,
+    )
+    assert await repo.unread_count(user.id) == 5
+
+    [first, *_] = await repo.get_by_user(user.id)
+    await repo.mark_as_read(first)
+    assert await repo.unread_count(user.id) == 4
+
+    await repo.mark_all_read(user.id)
+    assert await repo.unread_count(user.id) == 0
+
+    await repo.create(user_id=user.id, alert_id=alert.id, message="Nueva")
+    assert await repo.unread_count(user.id) == 1
+
+    # Borrar la alerta borra sus notificaciones (y las descuenta)
+    await session.delete(alert)
+    await session.commit()
+    assert await repo.unread_count(user.id) == 0
+
+
+async def test_notification_version_bumps_on_every_write(session):
+    user, alert = await _setup_alert(session)
+    repo = NotificationRepository(session)
+    versions = [await repo.version_for_user(user.id)]
+
+    await repo.bulk_create([{"user_id": user.id, "alert_id": alert.id, "message": "Nueva"}], method="copy")
+    versions.append(await repo.version_for_user(user.id))
+
+    # El estado de entrega también forma parte de la respuesta
+    [notification] = await repo.get_by_user(user.id)
+    await repo.record_delivery([{"id": notification.id, "delivery_status": "sent"}])
+    versions.append(await repo.version_for_user(user.id))
+
+    await session.delete(alert)
+    await session.commit()
+    versions.append(await repo.version_for_user(user.id))
+
+    assert [version for version, _ in versions] == [0, 1, 2, 3]
+
+
+async def test_unread_count_unknown_user(session):
+    import uuid
+    assert await NotificationRepository(session).unread_count(uuid.uuid4()) is None
+
+
+def test_bulk_method_is_chosen_by_row_count():
+    from app.config import settings
+
+    assert NotificationRepository._bulk_method(1) == "orm"
+    assert NotificationRepository._bulk_method(settings.NOTIFICATION_BULK_COPY_THRESHOLD - 1) == "orm"
+    assert NotificationRepository._bulk_method(settings.NOTIFICATION_BULK_COPY_THRESHOLD) == "copy"
@@ -0,0 +1,164 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import asyncio
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.engine import make_url
+
+from app.models.user import User
+from app.models.field import Field
+from app.models.alert import Alert
+from app.repositories.notification_repo import NotificationRepository
+from app.services.notification_stream import NotificationBroker, NotificationListener, NotificationStream
+from app.tests.conftest import TEST_DATABASE_URL, get_test_session_factory
+
+
+async def _setup_alert(session):
+    user = User(name="Stream User", phone="+5491100000080")
+    session.add(user)
+    await session.flush()
+    field = Field(name="Stream Field", latitude=-31.0, longitude=-64.0, user_id=user.id)
+    session.add(field)
+    await session.flush()
+    alert = Alert(user_id=user.id, field_id=field.id, event_type="helada", threshold=50.0)
+    session.add(alert)
+    await session.commit()
+    return user, alert
+
+
+async def _insert(user, alert, *messages):
+    async with get_test_session_factory()() as session:
+        await NotificationRepository(session).bulk_create([
+            {"user_id": user.id, "alert_id": alert.id, "message": message} for message in messages
+        ])
+
+
+async def _next_notification(events) -> str:
+    # Los heartbeats pueden intercalarse mientras se espera
+    while (event := await anext(events)) == ": ping\n\n":
+        pass
+    return event
+
+
+def _data(event: str) -> dict:
+    lines = dict(line.split(": ", 1) for line in event.strip().split("\n"))
+    assert lines["event"] == "notification"
+    return json.loads(lines["data"])
+
+
+async def test_broker_wakes_only_subscribers_of_the_user():
+    broker = NotificationBroker()
+    user_a, user_b = object(), object()
+
+    with broker.subscribe(user_a) as wake_a, broker.subscribe(user_b) as wake_b:
+        assert len(broker) == 2
+        assert broker.publish([user_a, user_a]) == 1
+        assert wake_a.is_set() and not wake_b.is_set()
+
+    assert len(broker) == 0
+    assert broker.publish([user_a]) == 0
+
+
+async def test_stream_sends_new_notifications_and_heartbeats(session):
+    user, alert = await _setup_alert(session)
+    await _insert(user, alert, "Historial")
+    broker = NotificationBroker()
+
+    with patch("app.services.notification_stream.async_session", get_test_session_factory()):
+        events = NotificationStream(user.id, broker=broker, heartbeat_seconds=0.05).events()
+        try:
+            assert (await anext(events)).startswith("retry:")
+
+            # Sin cursor arranca desde ahora: el historial no se reenvía
+            assert await anext(events) == ": ping\n\n"
+
+            pending = asyncio.ensure_future(anext(events))
+            await asyncio.sleep(0.01)
+            await _insert(user, alert, "Nueva")
+            broker.publish([user.id])
+            event = await asyncio.wait_for(pending, 1)
+            if event == ": ping\n\n":
+                event = await _next_notification(events)
+        finally:
+            await events.aclose()
+
+    assert _data(event)["message"] == "Nueva"
+    assert event.startswith("id: ")
+
+
+async def test_stream_resumes_after_last_event_id(session):
+    user, alert = await _setup_alert(session)
+    await _insert(user, alert, "Primera")
+    await _insert(user, alert, "Segunda")
+    await _insert(user, alert, "Tercera")
+    repo = NotificationRepository(session)
+    first, *_ = await repo.get_after(user.id)
+
+    with patch("app.services.notification_stream.async_session", get_test_session_factory()):
+        events = NotificationStream(
+            user.id, (first.created_at, first.id), broker=NotificationBroker(), heartbeat_seconds=0.05,
+        ).events()
+        try:
+            await anext(events)
+            sent = [_data(await _next_notification(events))["message"] for _ in range(2)]
+            assert await anext(events) == ": ping\n\n"
+        finally:
+            await events.aclose()
+
+    assert sent == ["Segunda", "Tercera"]
+
+
+async def test_stream_picks_up_late_commits_within_lookback(session):
+    user, alert = await _setup_alert(session)
+    broker = NotificationBroker()
+
+    with patch("app.services.notification_stream.async_session", get_test_session_factory()):
+        events = NotificationStream(
+            user.id, broker=broker, heartbeat_seconds=0.05, lookback_seconds=60,
+        ).events()
+        try:
+            await anext(events)
+            await _insert(user, alert, "Enviada")
+            broker.publish([user.id])
+            assert _data(await _next_notification(events))["message"] == "Enviada"
+
+            # Confirmada después pero con created_at anterior a la última enviada
+            async with get_test_session_factory()() as other:
+                repo = NotificationRepository(other)
+                [sent] = await repo.get_after(user.id)
+                await repo.bulk_create([{"user_id": user.id, "alert_id": alert.id, "message": "Tardía"}])
+                [late] = await repo.get_after(user.id, (sent.created_at, sent.id))
+                late.created_at = sent.created_at - timedelta(seconds=1)
+                await other.commit()
+
+            broker.publish([user.id])
+            assert _data(await _next_notification(events))["message"] == "Tardía"
+            # Lo ya enviado no se repite
+            broker.publish([user.id])
+            assert await anext(events) == ": ping\n\n"
+        finally:
+            await events.aclose()
+
+
+async def test_listener_wakes_subscribers_on_insert_from_any_connection(session):
+    user, alert = await _setup_alert(session)
+    broker = NotificationBroker()
+    dsn = make_url(TEST_DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+    listener = asyncio.create_task(NotificationListener(broker, dsn=dsn).run_forever())
+
+    try:
+        with broker.subscribe(user.id) as wake:
+            # Al conectar despierta a todos por si hubo inserts sin escuchar
+            await asyncio.wait_for(wake.wait(), 5)
+            wake.clear()
+
+            await _insert(user, alert, "Desde otro proceso")
+            await asyncio.wait_for(wake.wait(), 5)
+    finally:
+        listener.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await listener
@@ -0,0 +1,62 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from datetime import date
+from uuid import uuid4
+
+from sqlalchemy import update, func, text
+
+from app.events.events import AlertTriggeredEvent
+from app.models.event_outbox import EventOutbox
+from app.repositories.outbox_repo import OutboxRepository
+from app.tests.conftest import get_test_session_factory
+
+
+def _event(value: float = 85.0):
+    return AlertTriggeredEvent(
+        alert_id=uuid4(), user_id=uuid4(), field_id=uuid4(),
+        event_type="lluvia", threshold=70.0,
+        actual_value=value, target_date=date(2025, 1, 15),
+    )
+
+
+async def test_payload_round_trip():
+    event = _event()
+    assert AlertTriggeredEvent.from_payload(event.to_payload()) == event
+
+
+async def test_concurrent_consumers_skip_locked_rows(session):
+    repo = OutboxRepository(session)
+    await repo.add_many([_event(80.0 + i) for i in range(5)])
+    await session.commit()
+
+    first = await repo.claim_batch(3)
+    assert len(first) == 3
+
+    # Otro consumidor, en otra conexión, no ve las filas bloqueadas
+    async with get_test_session_factory()() as other_session:
+        second = await OutboxRepository(other_session).claim_batch(10)
+        assert {row.id for row in second}.isdisjoint(row.id for row in first)
+        assert len(second) == 2
+        await other_session.rollback()
+
+    await repo.mark_delivered([row.id for row in first])
+    assert await repo.count_pending() == 2
+
+
+async def test_prune_deletes_only_expired_delivered_rows(session):
+    repo = OutboxRepository(session)
+    await repo.add_many([_event() for _ in range(3)])
+    await session.commit()
+
+    rows = await repo.claim_batch(2)
+    await repo.mark_delivered([row.id for row in rows])
+    await session.execute(
+        update(EventOutbox)
+        .where(EventOutbox.id == rows[0].id)
+        .values(delivered_at=func.now() - text("interval '2 hours'"))
+    )
+    await session.commit()
+
+    assert await repo.prune(retention_seconds=3600, batch_size=100) == 1
+    assert await repo.count_pending() == 1
@@ -4,6 +4,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 import pytest
 import httpx
 from uuid import uuid4
+from datetime import date
+from unittest.mock import AsyncMock, patch
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
 from app.main import app
@@ -265,6 +267,62 @@ async def test_get_weather_by_field_pagination(client):
     assert len(resp.json()) == 2
 
 
+async def test_create_weather_evaluates_alerts_on_ingest(client):
+    user_id, field_id = await create_alert_data(client, phone="+5491100000082")
+    await client.post("/alerts/", json={
+        "user_id": str(user_id), "field_id": str(field_id),
+        "event_type": "frost", "threshold": 70.0,
+    })
+
+    with patch("app.services.evaluation_service.event_bus") as mock_bus, \
+         patch("app.services.evaluation_service.flush_notifications", new_callable=AsyncMock) as mock_flush:
+        mock_bus.emit_many = AsyncMock()
+        resp = await client.post("/weather/", json={
+            "field_id": str(field_id),
+            "event_type": "frost",
+            "probability": 85.0,
+            "target_date": str(date.today()),
+        })
+
+    assert resp.status_code == 201
+    event = mock_bus.emit_many.call_args[0][0][0]
+    assert event.actual_value == 85.0
+    mock_flush.assert_called_once()
+
+    resp = await client.get("/metrics")
+    assert resp.json()["summaries"]["ingest_to_notification_seconds"]["count"] >= 1
+
+
+async def test_ingest_metrics_cover_every_evaluation_and_delivery_mode(client):
+    from app.metrics import metrics
+
+    user_id, field_id = await create_alert_data(client, phone="+5491100000089")
+    await client.post("/alerts/", json={
+        "user_id": str(user_id), "field_id": str(field_id),
+        "event_type": "frost", "threshold": 70.0,
+    })
+    metrics.reset()
+
+    async def ingest(probability: float):
+        resp = await client.post("/weather/", json={
+            "field_id": str(field_id),
+            "event_type": "frost",
+            "probability": probability,
+            "target_date": str(date.today()),
+        })
+        assert resp.status_code == 201
+
+    # Sin disparos también se mide la evaluación
+    await ingest(10.0)
+    with patch("app.services.evaluation_service.settings.EVENT_DELIVERY", "outbox"):
+        await ingest(85.0)
+
+    summaries = (await client.get("/metrics")).json()["summaries"]
+    assert summaries["ingest_evaluation_seconds"]["count"] == 2
+    assert summaries["ingest_to_outbox_seconds"]["count"] == 1
+    assert "ingest_to_notification_seconds" not in summaries
+
+
 async def test_get_weather_by_field_not_found(client):
     resp = await client.get(f"/weather/field/{FAKE_ID}")
     assert resp.status_code == 404
@@ -444,6 +502,74 @@ async def test_get_notifications_pagination(client):
     assert len(resp.json()) == 1
 
 
+async def test_notifications_cursor_pagination_walks_all_pages(client):
+    user_id, field_id = await create_alert_data(client, phone="+5491100000162")
+    alert_resp = await client.post("/alerts/", json={
+        "user_id": str(user_id), "field_id": str(field_id),
+        "event_type": "frost", "threshold": 50.0,
+    })
+
+    from app.repositories.notification_repo import NotificationRepository
+    async with async_session_factory() as sess:
+        # Mismo created_at para todas (misma transacción): desempata el id
+        await NotificationRepository(sess).bulk_create([
+            {"user_id": user_id, "alert_id": alert_resp.json()["id"], "message": f"Notificación {i}"}
+            for i in range(5)
+        ])
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        resp = await client.get(f"/notifications/user/{user_id}", params=params)
+        assert resp.status_code == 200
+        assert "Deprecation" not in resp.headers
+        seen += [n["id"] for n in resp.json()]
+        pages += 1
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert len(seen) == len(set(seen)) == 5
+
+
+async def test_offset_pagination_is_deprecated_but_supported(client):
+    for i in range(3):
+        await create_user(client, phone=f"+549110000018{i}")
+
+    resp = await client.get("/users/", params={"skip": 1, "limit": 1})
+    assert resp.status_code == 200
+    assert resp.headers["Deprecation"] == "true"
+    assert len(resp.json()) == 1
+
+    # El cursor de una página por offset continúa con keyset
+    resp = await client.get("/users/", params={"cursor": resp.headers["X-Next-Cursor"], "limit": 5})
+    assert len(resp.json()) == 1
+
+
+async def test_cursor_pagination_rejects_invalid_cursor(client):
+    resp = await client.get("/users/", params={"cursor": "no-es-un-cursor"})
+    assert resp.status_code == 400
+
+    resp = await client.get("/users/", params={"cursor": "abc", "skip": 2})
+    assert resp.status_code == 400
+
+
+async def test_weather_cursor_pagination_orders_by_target_date(client):
+    field_id = await create_field(client, phone="+5491100000190")
+    for day in (3, 1, 2):
+        await client.post("/weather/", json={
+            "field_id": str(field_id), "event_type": "frost",
+            "probability": 10.0, "target_date": f"2025-01-0{day}",
+        })
+
+    resp = await client.get(f"/weather/field/{field_id}", params={"limit": 2})
+    assert [w["target_date"] for w in resp.json()] == ["2025-01-01", "2025-01-02"]
+    resp = await client.get(f"/weather/field/{field_id}", params={"cursor": resp.headers["X-Next-Cursor"]})
+    assert [w["target_date"] for w in resp.json()] == ["2025-01-03"]
+    assert "X-Next-Cursor" not in resp.headers
+
+
 async def test_notification_mark_as_read_not_found(client):
     resp = await client.patch(f"/notifications/{FAKE_ID}/read")
     assert resp.status_code == 404
@@ -464,4 +590,197 @@ async def test_notification_mark_as_read(client):
         "target_date": "2025-01-15"
     })
     resp = await client.get(f"/notifications/user/{user_id}")
-    assert resp.status_code == 200
\ No newline at end of file
+    assert resp.status_code == 200
+
+
+async def test_notifications_render_message_from_structured_fields(client):
+    from datetime import date
+
+    user_id, field_id = await create_alert_data(client, phone="+5491100000171")
+    alert_resp = await client.post("/alerts/", json={
+        "user_id": str(user_id),
+        "field_id": str(field_id),
+        "event_type": "frost",
+        "threshold": 50.0,
+    })
+
+    from app.repositories.notification_repo import NotificationRepository
+    async with async_session_factory() as sess:
+        await NotificationRepository(sess).bulk_create([{
+            "user_id": user_id, "alert_id": alert_resp.json()["id"], "event_type": "frost",
+            "actual_value": 72.5, "threshold": 50.0, "target_date": date(2025, 1, 15),
+        }])
+
+    resp = await client.get(f"/notifications/user/{user_id}")
+    [notification] = resp.json()
+    assert notification["message"] == (
+        "⚠️ Alerta: frost detectada con 72.5% de probabilidad "
+        "(umbral configurado: 50.0%) para el día 2025-01-15"
+    )
+    assert notification["actual_value"] == 72.5
+    assert notification["target_date"] == "2025-01-15"
+
+async def test_notifications_read_all_watermark(client):
+    user_id, field_id = await create_alert_data(client, phone="+5491100000172")
+    alert_resp = await client.post("/alerts/", json={
+        "user_id": str(user_id), "field_id": str(field_id),
+        "event_type": "frost", "threshold": 50.0,
+    })
+
+    from app.repositories.notification_repo import NotificationRepository
+    async with async_session_factory() as sess:
+        await NotificationRepository(sess).bulk_create([
+            {"user_id": user_id, "alert_id": alert_resp.json()["id"], "message": f"Notificación {i}"}
+            for i in range(3)
+        ])
+
+    resp = await client.get(f"/notifications/user/{user_id}/unread-count")
+    assert resp.json()["unread"] == 3
+
+    resp = await client.post(f"/notifications/user/{user_id}/read-all")
+    assert resp.status_code == 200
+    assert resp.json()["notifications_read_until"] is not None
+    resp = await client.get(f"/notifications/user/{user_id}/unread-count")
+    assert resp.json()["unread"] == 0
+
+    resp = await client.get(f"/notifications/user/{user_id}", params={"unread_only": True})
+    assert resp.json() == []
+    resp = await client.get(f"/notifications/user/{user_id}")
+    assert [n["is_read"] for n in resp.json()] == [True, True, True]
+
+    # Lo que llega después de la marca sigue sin leer
+    async with async_session_factory() as sess:
+        await NotificationRepository(sess).bulk_create([
+            {"user_id": user_id, "alert_id": alert_resp.json()["id"], "message": "Nueva"}
+        ])
+    resp = await client.get(f"/notifications/user/{user_id}", params={"unread_only": True})
+    assert [n["message"] for n in resp.json()] == ["Nueva"]
+
+
+async def test_notifications_read_all_user_not_found(client):
+    resp = await client.post(f"/notifications/user/{FAKE_ID}/read-all")
+    assert resp.status_code == 404
+
+
+async def test_notifications_stream_validates_user_and_cursor(client):
+    resp = await client.get(f"/notifications/user/{FAKE_ID}/stream")
+    assert resp.status_code == 404
+
+    user_id = await create_user(client, phone="+5491100000173")
+    resp = await client.get(f"/notifications/user/{user_id}/stream", headers={"Last-Event-ID": "roto"})
+    assert resp.status_code == 400
+
+
+async def test_notifications_unread_count_user_not_found(client):
+    resp = await client.get(f"/notifications/user/{FAKE_ID}/unread-count")
+    assert resp.status_code == 404
+
+# ─── CONDITIONAL GET ───
+
+async def test_list_returns_304_until_collection_changes(client):
+    user_id, field_id = await create_alert_data(client, phone="+5491100000200")
+    alert_resp = await client.post("/alerts/", json={
+        "user_id": str(user_id), "field_id": str(field_id),
+        "event_type": "frost", "threshold": 50.0,
+    })
+
+    resp = await client.get(f"/alerts/user/{user_id}")
+    etag = resp.headers["ETag"]
+    resp = await client.get(f"/alerts/user/{user_id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["ETag"] == etag
+
+    # Otra página u otro filtro es otra representación
+    resp = await client.get(f"/alerts/user/{user_id}", params={"limit": 5}, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+
+    await client.patch(f"/alerts/{alert_resp.json()['id']}", json={"threshold": 60.0})
+    resp = await client.get(f"/alerts/user/{user_id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json()[0]["threshold"] == 60.0
+    assert resp.headers["ETag"] != etag
+
+    resp = await client.get(f"/alerts/user/{FAKE_ID}", headers={"If-None-Match": etag})
+    assert resp.status_code == 404
+
+
+async def test_detail_and_insert_only_lists_support_if_none_match(client):
+    field_id = await create_field(client, phone="+5491100000201")
+
+    for url in (f"/fields/{field_id}", f"/weather/field/{field_id}", "/users/"):
+        resp = await client.get(url)
+        resp = await client.get(url, headers={"If-None-Match": f'W/{resp.headers["ETag"]}'})
+        assert resp.status_code == 304, url
+
+    resp = await client.get(f"/weather/field/{field_id}")
+    etag = resp.headers["ETag"]
+    await client.post("/weather/", json={
+        "field_id": str(field_id), "event_type": "frost",
+        "probability": 10.0, "target_date": "2025-01-01",
+    })
+    resp = await client.get(f"/weather/field/{field_id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert len(resp.json()) == 1
+
+
+async def test_notifications_etag_changes_on_read(client):
+    user_id, field_id = await create_alert_data(client, phone="+5491100000202")
+    alert_resp = await client.post("/alerts/", json={
+        "user_id": str(user_id), "field_id": str(field_id),
+        "event_type": "frost", "threshold": 50.0,
+    })
+
+    from app.repositories.notification_repo import NotificationRepository
+    async with async_session_factory() as sess:
+        await NotificationRepository(sess).bulk_create([
+            {"user_id": user_id, "alert_id": alert_resp.json()["id"], "message": f"Notificación {i}"}
+            for i in range(2)
+        ])
+
+    url = f"/notifications/user/{user_id}"
+    resp = await client.get(url)
+    etag = resp.headers["ETag"]
+    assert (await client.get(url, headers={"If-None-Match": etag})).status_code == 304
+
+    # Leer una notificación suelta cambia la versión (trigger de update)
+    await client.patch(f"/notifications/{resp.json()[0]['id']}/read")
+    resp = await client.get(url, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    etag = resp.headers["ETag"]
+
+    # Y también mover la marca de lectura
+    await client.post(f"/notifications/user/{user_id}/read-all")
+    resp = await client.get(url, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert all(n["is_read"] for n in resp.json())
+
+# ─── JOBS ───
+
+async def test_evaluation_job_status(client):
+    resp = await client.get("/jobs/evaluation/status")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["worker"]
+    assert data["is_leader"] is False
+    assert data["lease"] is None
+
+async def test_run_evaluation_job_is_requested_for_leader(client):
+    resp = await client.post("/jobs/evaluation/run")
+    assert resp.status_code == 202
+    assert resp.json()["status"] == "requested"
+
+    status = await client.get("/jobs/evaluation/status")
+    assert status.json()["lease"]["run_requested_at"] is not None
+
+async def test_run_evaluation_job_triggers_local_scheduler(client):
+    from app.jobs import evaluate_alerts
+    from app.jobs.scheduler import JobScheduler
+
+    scheduler = JobScheduler("evaluation", AsyncMock(), interval_seconds=60)
+    with patch.object(evaluate_alerts, "evaluation_scheduler", scheduler), \
+         patch("app.routers.jobs.settings.JOB_LEADER_ELECTION", False):
+        resp = await client.post("/jobs/evaluation/run")
+
+    assert resp.status_code == 202
+    assert resp.json()["status"] == "triggered"
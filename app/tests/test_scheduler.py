@@ -0,0 +1,104 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import asyncio
+import pytest
+
+from app.jobs.scheduler import JobScheduler
+from app.metrics import metrics
+
+
+async def _run_for(scheduler: JobScheduler, seconds: float):
+    task = asyncio.create_task(scheduler.run_forever())
+    await asyncio.sleep(seconds)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+async def test_fixed_rate_does_not_drift_with_slow_runs():
+    loop = asyncio.get_running_loop()
+    starts = []
+
+    async def job():
+        starts.append(loop.time())
+        await asyncio.sleep(0.03)
+
+    await _run_for(JobScheduler("test", job, interval_seconds=0.1), 0.45)
+
+    # Con fixed-delay serían ~0.13s entre ejecuciones; con fixed-rate, 0.1s
+    assert len(starts) == 5
+    assert starts[-1] - starts[0] == pytest.approx(0.4, abs=0.03)
+
+
+async def test_skips_tick_while_previous_run_is_active():
+    metrics.reset()
+    calls = 0
+
+    async def job():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.25)
+
+    await _run_for(JobScheduler("test", job, interval_seconds=0.1), 0.35)
+
+    # Ticks en 0.1 y 0.2 se saltean; el de 0.3 corre porque la primera terminó
+    assert calls == 2
+    assert metrics.snapshot()["counters"]["test_job_skipped_total"] == 2
+
+
+async def test_backoff_after_consecutive_failures():
+    metrics.reset()
+    calls = 0
+
+    async def job():
+        nonlocal calls
+        calls += 1
+        raise RuntimeError("db caída")
+
+    scheduler = JobScheduler("test", job, interval_seconds=0.05, max_backoff_seconds=1)
+    await _run_for(scheduler, 0.4)
+
+    # Sin backoff serían 8 intentos; con 0.1s, 0.2s... entran 3
+    assert calls == 3
+    assert scheduler.consecutive_failures == 3
+    assert metrics.snapshot()["counters"]["test_job_failures_total"] == 3
+
+
+async def test_trigger_runs_immediately():
+    calls = 0
+
+    async def job():
+        nonlocal calls
+        calls += 1
+
+    scheduler = JobScheduler("test", job, interval_seconds=60)
+    task = asyncio.create_task(scheduler.run_forever())
+    await asyncio.sleep(0.01)
+    assert calls == 1
+
+    assert scheduler.trigger() is True
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert calls == 2
+
+
+async def test_cancel_waits_for_running_job_cleanup():
+    cleaned_up = False
+
+    async def job():
+        nonlocal cleaned_up
+        try:
+            await asyncio.sleep(10)
+        finally:
+            await asyncio.sleep(0.01)
+            cleaned_up = True
+
+    scheduler = JobScheduler("test", job, interval_seconds=60)
+    await _run_for(scheduler, 0.01)
+
+    assert cleaned_up
+    assert not scheduler.is_running
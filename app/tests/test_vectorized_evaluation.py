@@ -0,0 +1,42 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import numpy as np
+
+from app.services.vectorized_evaluation import find_crossings, first_per_trigger
+
+
+def test_find_crossings_matches_brute_force():
+    rng = np.random.default_rng(7)
+    alert_keys = rng.integers(0, 50, size=2_000)
+    thresholds = rng.choice(np.arange(0, 100, 0.5), size=2_000)
+    weather_keys = rng.integers(-1, 50, size=3_000)
+    probabilities = rng.choice(np.arange(0, 100, 0.5), size=3_000)
+
+    alert_idx, weather_idx = find_crossings(alert_keys, thresholds, weather_keys, probabilities)
+
+    expected = {
+        (a, w)
+        for w in range(len(weather_keys))
+        for a in np.flatnonzero((alert_keys == weather_keys[w]) & (thresholds <= probabilities[w]))
+    }
+    assert set(zip(alert_idx.tolist(), weather_idx.tolist())) == expected
+    assert len(alert_idx) == len(expected)
+
+
+def test_find_crossings_includes_equal_threshold():
+    alert_idx, weather_idx = find_crossings(
+        np.array([0, 0]), np.array([72.5, 72.50001]), np.array([0]), np.array([72.5]),
+    )
+    assert alert_idx.tolist() == [0]
+    assert weather_idx.tolist() == [0]
+
+
+def test_first_per_trigger_keeps_highest_probability():
+    alert_idx = np.array([0, 0, 0, 1])
+    date_ordinals = np.array([10, 10, 11, 10])
+    probabilities = np.array([80.0, 90.0, 70.0, 60.0])
+
+    keep = first_per_trigger(alert_idx, date_ordinals, probabilities)
+
+    assert sorted(keep.tolist()) == [1, 2, 3]
@@ -0,0 +1,114 @@
+"""
+Benchmark: ActiveAlertIndex (bisect en memoria) vs. la consulta SQL equivalente
+para matchear un pronóstico contra las alertas activas.
+
+    python -m benchmarks.bench_alert_index --sizes 10000 100000 1000000
+    python -m benchmarks.bench_alert_index --sizes 10000 100000 --sql
+"""
+import argparse
+import asyncio
+import random
+import uuid
+from types import SimpleNamespace
+
+from sqlalchemy import select
+
+from app.models.alert import Alert
+from app.models.weather_data import WeatherData
+from app.services.alert_index import ActiveAlertIndex
+from benchmarks.common import Timer, bench_database, populate
+
+EVENT_TYPES = ("helada", "granizo", "lluvia")
+
+
+def bench_index(size: int, fields: int, lookups: int) -> dict:
+    rng = random.Random(size)
+    field_ids = [uuid.uuid4() for _ in range(fields)]
+    alerts = [
+        SimpleNamespace(
+            id=uuid.uuid4(), user_id=uuid.uuid4(),
+            field_id=field_ids[i % fields], event_type=EVENT_TYPES[i % 3],
+            threshold=rng.uniform(0, 100), is_active=True,
+        )
+        for i in range(size)
+    ]
+
+    index = ActiveAlertIndex()
+    with Timer() as build:
+        index.rebuild(alerts)
+
+    queries = [(rng.choice(field_ids), rng.choice(EVENT_TYPES), rng.uniform(0, 100)) for _ in range(lookups)]
+    matched = 0
+    with Timer() as lookup:
+        for field_id, event_type, probability in queries:
+            matched += len(index.match(field_id, event_type, probability))
+
+    return {"build_s": build.elapsed, "lookup_us": lookup.elapsed / lookups * 1e6, "matched": matched}
+
+
+async def bench_sql(size: int, fields: int, lookups: int) -> dict:
+    async with bench_database() as session_factory:
+        async with session_factory() as session:
+            await populate(session, alerts=size, fields=fields)
+
+            forecasts = (await session.execute(
+                select(WeatherData.field_id, WeatherData.event_type, WeatherData.probability)
+                .limit(lookups)
+            )).all()
+
+            # Carga del índice desde la base, como en el lifespan
+            with Timer() as load:
+                index = await ActiveAlertIndex().load(session)
+
+            matched = 0
+            with Timer() as query:
+                for forecast in forecasts:
+                    result = await session.execute(
+                        select(Alert.id).where(
+                            Alert.is_active == True,
+                            Alert.field_id == forecast.field_id,
+                            Alert.event_type == forecast.event_type,
+                            Alert.threshold <= forecast.probability,
+                        )
+                    )
+                    matched += len(result.all())
+
+            index_matched = 0
+            with Timer() as lookup:
+                for forecast in forecasts:
+                    index_matched += len(index.match(forecast.field_id, forecast.event_type, forecast.probability))
+
+            assert matched == index_matched, "El índice y el SQL deben devolver los mismos matches"
+            return {
+                "load_s": load.elapsed,
+                "sql_us": query.elapsed / len(forecasts) * 1e6,
+                "index_us": lookup.elapsed / len(forecasts) * 1e6,
+            }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--alerts-per-field", type=int, default=10)
+    parser.add_argument("--lookups", type=int, default=1_000)
+    parser.add_argument("--sql", action="store_true", help="Comparar contra Postgres (usa la base de test)")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        fields = max(1, size // args.alerts_per_field)
+        result = bench_index(size, fields, args.lookups * 100)
+        line = (
+            f"{size:>9} alertas | índice: build {result['build_s']:.3f}s, "
+            f"match {result['lookup_us']:.2f}µs"
+        )
+        if args.sql:
+            sql = await bench_sql(size, fields, args.lookups)
+            line += (
+                f" | SQL: {sql['sql_us']:.0f}µs por pronóstico "
+                f"(índice sobre los mismos datos: {sql['index_us']:.2f}µs, carga {sql['load_s']:.2f}s)"
+            )
+        print(line)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
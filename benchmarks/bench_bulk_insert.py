@@ -0,0 +1,55 @@
+"""
+Benchmark: NotificationRepository.bulk_create con los métodos ORM y COPY
+para distintos tamaños de lote. Los tamaños chicos sirven para ubicar
+NOTIFICATION_BULK_COPY_THRESHOLD.
+
+    python -m benchmarks.bench_bulk_insert --sizes 5 20 100 1000 10000 100000
+"""
+import argparse
+import asyncio
+import itertools
+
+from sqlalchemy import select, text
+
+from app.models.alert import Alert
+from app.repositories.notification_repo import NotificationRepository
+from benchmarks.common import Timer, bench_database, populate
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--methods", nargs="+", default=["orm", "copy"])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    async with bench_database() as session_factory:
+        async with session_factory() as session:
+            await populate(session, alerts=1000, fields=100)
+            alerts = (await session.execute(select(Alert.user_id, Alert.id))).all()
+
+        for size in args.sizes:
+            rows = [
+                {"user_id": user_id, "alert_id": alert_id, "message": f"⚠️ Alerta de benchmark {i}"}
+                for i, (user_id, alert_id) in zip(range(size), itertools.cycle(alerts))
+            ]
+            baseline = None
+            for method in args.methods:
+                best = float("inf")
+                for _ in range(args.repeat):
+                    async with session_factory() as session:
+                        await session.execute(text("TRUNCATE notifications"))
+                        await session.commit()
+                        with Timer() as timer:
+                            await NotificationRepository(session).bulk_create(rows, method=method)
+                    best = min(best, timer.elapsed)
+
+                baseline = baseline or best
+                print(
+                    f"{size:>7} filas | {method:>4} | {best:.3f}s | "
+                    f"{size / best:,.0f} filas/s | speedup x{baseline / best:.1f}"
+                )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+"""
+Benchmark: evaluación particionada en paralelo (EVALUATION_PARTITIONS) con
+distinta cantidad de particiones K, sobre el mismo conjunto de datos.
+
+    python -m benchmarks.bench_parallel_evaluation --alerts 200000 --partitions 1 2 4 8
+"""
+import argparse
+import asyncio
+
+from app.database import async_session
+from app.services.evaluation_service import EvaluationService
+from benchmarks.common import Timer, bench_database, populate
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alerts", type=int, default=200_000)
+    parser.add_argument("--alerts-per-field", type=int, default=10)
+    parser.add_argument("--partitions", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--max-concurrency", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pool_size = max(args.partitions) + 1
+    async with bench_database(pool_size=pool_size) as session_factory:
+        # Las particiones abren sesiones con app.database.async_session: se apunta a la base de test
+        async_session.configure(bind=session_factory.kw["bind"])
+
+        async with session_factory() as session:
+            await populate(session, alerts=args.alerts, fields=max(1, args.alerts // args.alerts_per_field))
+
+        # Sin handlers suscritos: se mide el join + streaming + emisión de eventos
+        baseline = None
+        for partitions in args.partitions:
+            best = float("inf")
+            triggered = 0
+            for _ in range(args.repeat):
+                async with session_factory() as session:
+                    service = EvaluationService(session, partitions=partitions)
+                    service.max_concurrency = args.max_concurrency or partitions
+                    with Timer() as timer:
+                        triggered = await service.evaluate_all()
+                best = min(best, timer.elapsed)
+
+            baseline = baseline or best
+            print(
+                f"K={partitions:>2} | {triggered} disparos en {best:.2f}s | "
+                f"{triggered / best:,.0f} filas/s | speedup x{baseline / best:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+"""
+Benchmark: motor NumPy (EVALUATION_ENGINE=numpy) contra el motor SQL sobre el
+mismo conjunto de datos. Cada corrida parte sin notificaciones ni ledger, así
+ambos motores insertan la misma cantidad de filas.
+
+    python -m benchmarks.bench_vectorized_evaluation --alerts 200000
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import delete
+
+from app.models.alert_trigger import AlertTrigger
+from app.models.notification import Notification
+from app.services import vectorized_evaluation
+from app.services.evaluation_service import EvaluationService
+from benchmarks.common import Timer, bench_database, populate
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alerts", type=int, default=200_000)
+    parser.add_argument("--alerts-per-field", type=int, default=10)
+    parser.add_argument("--engines", nargs="+", default=["sql", "numpy"])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    async with bench_database() as session_factory:
+        async with session_factory() as session:
+            await populate(session, alerts=args.alerts, fields=max(1, args.alerts // args.alerts_per_field))
+
+        for engine in args.engines:
+            best = float("inf")
+            triggered = 0
+            for _ in range(args.repeat):
+                async with session_factory() as session:
+                    await session.execute(delete(Notification))
+                    await session.execute(delete(AlertTrigger))
+                    await session.commit()
+
+                    with Timer() as timer:
+                        triggered = await EvaluationService(session, engine=engine).evaluate_all()
+                best = min(best, timer.elapsed)
+            print(f"{engine:>6} | {triggered} disparos en {best:.2f}s | {triggered / best:,.0f} filas/s")
+
+        # Solo el cálculo de cruces, sin la lectura de columnas ni los INSERT
+        async with session_factory() as session:
+            _, _, alert_keys, thresholds, weather_keys, probabilities, _ = (
+                await vectorized_evaluation.load_columns(session)
+            )
+        with Timer() as timer:
+            alert_idx, _ = vectorized_evaluation.find_crossings(alert_keys, thresholds, weather_keys, probabilities)
+        print(
+            f"find_crossings | {len(thresholds)} alertas x {len(probabilities)} pronósticos -> "
+            f"{len(alert_idx)} cruces en {timer.elapsed * 1000:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+"""
+Benchmark: throughput de NotificationDeliveryService contra un proveedor de
+WhatsApp simulado (benchmarks.mock_whatsapp_provider, en otro proceso) para
+distintos niveles de concurrencia. Incluye el claim de lotes con SKIP LOCKED
+y el registro del estado de entrega en la base.
+
+    python -m benchmarks.bench_whatsapp_delivery --notifications 2000 --concurrency 1 10 50 100
+"""
+import argparse
+import asyncio
+import itertools
+import subprocess
+import sys
+from unittest.mock import patch
+
+import httpx
+from sqlalchemy import select, text
+
+from app.models.alert import Alert
+from app.repositories.notification_repo import NotificationRepository
+from app.services.delivery_service import NotificationDeliveryService
+from app.services.rate_limiter import TokenBucket
+from app.services.whatsapp_client import WhatsAppClient
+from benchmarks.common import Timer, bench_database, populate
+
+
+async def wait_for_provider(url: str) -> None:
+    async with httpx.AsyncClient() as client:
+        for _ in range(100):
+            try:
+                await client.post(f"{url}/messages", json={})
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("El proveedor simulado no respondió")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notifications", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--latency", type=float, default=0.05, help="latencia simulada del proveedor")
+    parser.add_argument("--rate", type=float, default=0, help="token bucket del cliente (0 = sin límite)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8089)
+    args = parser.parse_args()
+
+    url = f"http://127.0.0.1:{args.port}/v1/bench"
+    provider = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.mock_whatsapp_provider",
+        "--port", str(args.port), "--latency", str(args.latency),
+    ])
+    try:
+        await wait_for_provider(url)
+        async with bench_database() as session_factory:
+            async with session_factory() as session:
+                await populate(session, alerts=1000, fields=100)
+                alerts = (await session.execute(select(Alert.user_id, Alert.id))).all()
+            rows = [
+                {"user_id": user_id, "alert_id": alert_id, "message": f"⚠️ Alerta de benchmark {i}"}
+                for i, (user_id, alert_id) in zip(range(args.notifications), itertools.cycle(alerts))
+            ]
+
+            print(f"{args.notifications} notificaciones, latencia del proveedor {args.latency * 1000:.0f}ms")
+            baseline = None
+            for concurrency in args.concurrency:
+                async with session_factory() as session:
+                    await session.execute(text("TRUNCATE notifications"))
+                    await session.commit()
+                    await NotificationRepository(session).bulk_create(rows)
+
+                async with WhatsAppClient(base_url=url, token="bench", max_connections=concurrency) as client:
+                    service = NotificationDeliveryService(
+                        client, TokenBucket(args.rate, max(1, int(args.rate))),
+                        batch_size=args.batch_size, concurrency=concurrency,
+                    )
+                    with patch("app.services.delivery_service.async_session", session_factory), Timer() as timer:
+                        sent = 0
+                        while delivered := await service.deliver_once():
+                            sent += delivered
+
+                baseline = baseline or timer.elapsed
+                print(
+                    f"concurrencia {concurrency:>4} | {sent} enviadas | {timer.elapsed:.2f}s | "
+                    f"{sent / timer.elapsed:,.0f} msg/s | speedup x{baseline / timer.elapsed:.1f}"
+                )
+    finally:
+        provider.terminate()
+        provider.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+import time
+from contextlib import asynccontextmanager
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.database import Base
+from app.models import *  # noqa: F401,F403  registra todas las tablas en Base.metadata
+
+# Igual que los tests: los benchmarks corren contra la base de test, nunca contra la real
+BENCH_DATABASE_URL = settings.TEST_DATABASE_URL or (
+    settings.DATABASE_URL.rsplit("/", 1)[0] + "/agrobot_test"
+)
+
+
+@asynccontextmanager
+async def bench_database(pool_size: int | None = None):
+    """Crea el esquema en la base de test y lo elimina al terminar."""
+    if pool_size:
+        engine = create_async_engine(BENCH_DATABASE_URL, pool_size=pool_size, max_overflow=0)
+    else:
+        engine = create_async_engine(BENCH_DATABASE_URL, poolclass=NullPool)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+async def populate(session: AsyncSession, alerts: int, fields: int, forecast_days: int = 7):
+    """
+    Genera datos sintéticos con generate_series: un usuario por campo, tres tipos
+    de evento, `forecast_days` días de pronóstico y `alerts` alertas repartidas
+    entre los campos. Los valores son deterministas (hash del índice).
+    """
+    await session.execute(text("""
+        INSERT INTO users (id, name, phone, created_at)
+        SELECT gen_random_uuid(), 'Bench ' || i, '+54' || lpad(i::text, 12, '0'), now()
+        FROM generate_series(1, :fields) AS i
+    """), {"fields": fields})
+    await session.execute(text("""
+        INSERT INTO fields (id, user_id, name, latitude, longitude, created_at)
+        SELECT gen_random_uuid(), u.id, 'Campo ' || u.name, -34.0, -58.0, now()
+        FROM users u
+    """))
+    await session.execute(text("""
+        INSERT INTO weather_data (id, field_id, event_type, probability, target_date, created_at)
+        SELECT gen_random_uuid(), f.id, e.event_type,
+               (abs(hashtext(f.id::text || e.event_type || d::text)::bigint) % 1000) / 10.0,
+               current_date + d, now()
+        FROM fields f
+        CROSS JOIN (VALUES ('helada'), ('granizo'), ('lluvia')) AS e(event_type)
+        CROSS JOIN generate_series(0, :days - 1) AS d
+    """), {"days": forecast_days})
+    await session.execute(text("""
+        WITH numbered AS (
+            SELECT f.id, f.user_id, row_number() OVER (ORDER BY f.id) - 1 AS n FROM fields f
+        )
+        INSERT INTO alerts (id, user_id, field_id, event_type, threshold, is_active, created_at, updated_at)
+        SELECT gen_random_uuid(), nb.user_id, nb.id,
+               (ARRAY['helada', 'granizo', 'lluvia'])[1 + i % 3],
+               (abs(hashtext(i::text)::bigint) % 1000) / 10.0,
+               true, now(), now()
+        FROM generate_series(0, :alerts - 1) AS i
+        JOIN numbered nb ON nb.n = i % :fields
+    """), {"alerts": alerts, "fields": fields})
+    await session.commit()
+    await session.execute(text("ANALYZE"))
+
+
+class Timer:
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.started
@@ -0,0 +1,59 @@
+"""
+Proveedor de WhatsApp simulado para benchmarks y pruebas locales: responde
+POST /{phone_number_id}/messages con un id de mensaje después de una latencia
+fija, y devuelve 429 si se supera el rate limit configurado.
+
+    python -m benchmarks.mock_whatsapp_provider --port 8089 --latency 0.05
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+
+import uvicorn
+
+
+def create_app(latency: float, rate_limit: float = 0):
+    counter = itertools.count()
+    window = {"second": 0, "count": 0}
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        while (await receive()).get("more_body"):
+            pass
+
+        status, body = 200, {"messages": [{"id": f"wamid.mock.{next(counter)}"}]}
+        if rate_limit:
+            second = int(time.monotonic())
+            if window["second"] != second:
+                window.update(second=second, count=0)
+            window["count"] += 1
+            if window["count"] > rate_limit:
+                status, body = 429, {"error": {"message": "rate limit"}}
+
+        await asyncio.sleep(latency)
+        await send({
+            "type": "http.response.start", "status": status,
+            "headers": [(b"content-type", b"application/json")],
+        })
+        await send({"type": "http.response.body", "body": json.dumps(body).encode()})
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.05, help="segundos por request")
+    parser.add_argument("--rate-limit", type=float, default=0, help="requests/s antes de responder 429 (0 = sin límite)")
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(args.latency, args.rate_limit),
+        host="127.0.0.1", port=args.port, log_level="warning", backlog=4096,
+    )
+
+
+if __name__ == "__main__":
+    main()